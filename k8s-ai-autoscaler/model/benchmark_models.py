@@ -0,0 +1,155 @@
+import argparse
+import multiprocessing as mp
+import os
+import pickle
+import sys
+import time
+import numpy as np
+import pandas as pd
+import torch
+# network definitions live in hf_deploy/networks.py, shared with the service
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "hf_deploy"))
+from networks import ACTION_MODELS
+from sequence_dataset import SequenceDataset
+from convert_dataset import FEATURES, LABEL, open_converted
+
+# ===============================
+# ACTION MODEL BENCHMARK
+# ===============================
+# Every model in networks.ACTION_MODELS whose weights exist is run on the
+# same last --windows windows of the data, scaled with scaler.pkl as in
+# training, and reported side by side:
+#
+#   accuracy       vs the dataset's labels
+#   agree lstm     share of windows where it picks the LSTM's action
+#   single p50/p99 one window per call, the predictor's common case
+#   batch  p50/p99 one MicroBatcher-sized batch per call
+#   seq/s          windows per second in those batches
+#   weights / RSS  parameter bytes, and peak RSS growth while loading + running
+#
+# Each model runs in its own forked process so the RSS numbers don't
+# carry over from one model to the next.
+
+SEQ_LEN = 10
+
+parser = argparse.ArgumentParser(description="Accuracy, latency and memory of every action model")
+parser.add_argument("--data", default="k8s_autoscale_training_dataset.csv",
+                    help="CSV, or a directory from convert_dataset.py")
+parser.add_argument("--windows", type=int, default=5000, help="taken from the end of the data")
+parser.add_argument("--batch-size", type=int, default=64)
+parser.add_argument("--repeats", type=int, default=500, help="single-window calls timed per model")
+parser.add_argument("--threads", type=int, default=1)
+parser.add_argument("--models", nargs="+", choices=sorted(ACTION_MODELS), default=list(ACTION_MODELS))
+args = parser.parse_args()
+
+# ===============================
+# LOAD + SCALE THE SAME WINDOWS FOR EVERY MODEL
+# ===============================
+scaler = pickle.load(open("scaler.pkl", "rb"))
+rows = args.windows + SEQ_LEN
+
+if os.path.isdir(args.data):
+    X, y, _ = open_converted(args.data)
+    raw, labels = np.asarray(X[-rows:], dtype=np.float64), np.asarray(y[-rows:])
+else:
+    encoders = pickle.load(open("label_encoders.pkl", "rb"))
+    df = pd.read_csv(args.data).tail(rows)
+    for col in encoders:
+        df[col] = encoders[col].transform(df[col])
+    raw, labels = df[FEATURES].values.astype(np.float64), df[LABEL].values
+
+windows, targets = SequenceDataset(
+    scaler.transform(raw).astype(np.float32), SEQ_LEN, labels=labels
+)[np.arange(len(raw) - SEQ_LEN)]
+targets = targets.numpy()
+
+
+def rss_mb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def percentiles(times):
+    return np.percentile(times, 50), np.percentile(times, 99)
+
+
+def bench(name):
+    """Runs in a forked child: → dict of this model's numbers."""
+    torch.set_num_threads(args.threads)
+    try:
+        # reset the peak-RSS mark to what the fork inherited (Linux)
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+    base = rss_mb("VmRSS")
+
+    model_class, model_file = ACTION_MODELS[name]
+    model = model_class()
+    model.load_state_dict(torch.load(model_file, map_location="cpu"))
+    model.eval()
+
+    with torch.no_grad():
+        for _ in range(20):
+            model(windows[:1])
+            model(windows[:args.batch_size])
+
+        single = []
+        for i in range(min(args.repeats, len(windows))):
+            t = time.perf_counter()
+            model(windows[i:i + 1])
+            single.append((time.perf_counter() - t) * 1000)
+
+        batched, preds = [], []
+        for i in range(0, len(windows), args.batch_size):
+            t = time.perf_counter()
+            out = model(windows[i:i + args.batch_size])
+            batched.append((time.perf_counter() - t) * 1000)
+            preds.append(out.argmax(dim=1).numpy())
+
+    return {
+        "preds": np.concatenate(preds),
+        "single": percentiles(single),
+        "batch": percentiles(batched),
+        "seq_s": len(windows) / (sum(batched) / 1000),
+        "weights_kb": sum(p.numel() * p.element_size() for p in model.parameters()) / 1024,
+        "rss_mb": rss_mb("VmHWM") - base,
+    }
+
+
+if __name__ == "__main__":
+    models = [name for name in args.models if os.path.exists(ACTION_MODELS[name][1])]
+    for name in sorted(set(args.models) - set(models)):
+        print(f"⚠ {ACTION_MODELS[name][1]} not found, skipping {name} (model_train.py --model {name})")
+
+    print(f"\n⏱ Benchmarking {', '.join(models)} on {len(windows):,} windows, {args.threads} thread(s)\n")
+
+    # fork: children inherit the windows, the parent never runs torch ops
+    ctx = mp.get_context("fork")
+    results = {}
+    for name in models:
+        with ctx.Pool(1) as pool:
+            results[name] = pool.apply(bench, (name,))
+
+    reference = results.get("lstm")
+    print("=================================== ACTION MODELS ===================================")
+    print(f"{'model':<6} {'acc':>7} {'agree lstm':>10} {'1 p50 ms':>9} {'1 p99 ms':>9} "
+          f"{f'{args.batch_size} p50 ms':>10} {f'{args.batch_size} p99 ms':>10} {'seq/s':>9} {'weights KB':>10} {'RSS MB':>7}")
+
+    for name, r in results.items():
+        acc = (r["preds"] == targets).mean()
+        agree = f"{(r['preds'] == reference['preds']).mean():.2%}" if reference else "-"
+        print(f"{name:<6} {acc:>7.2%} {agree:>10} {r['single'][0]:>9.3f} {r['single'][1]:>9.3f} "
+              f"{r['batch'][0]:>10.3f} {r['batch'][1]:>10.3f} {r['seq_s']:>9,.0f} "
+              f"{r['weights_kb']:>10.1f} {r['rss_mb']:>7.1f}")
+
+    print("=====================================================================================")
+    if reference:
+        for name, r in results.items():
+            if name != "lstm":
+                print(f"{name}: {reference['single'][0] / r['single'][0]:.1f}× faster per window, "
+                      f"{r['seq_s'] / reference['seq_s']:.1f}× the batched throughput of the lstm")
+    print()
@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# ===============================
+# CSV → MEMORY-MAPPED .npy DATASET
+# ===============================
+# model_train.py --data <dir> trains straight from this, so months of
+# metrics never have to fit in RAM and no epoch parses CSV:
+#
+#   <dir>/features.npy   (rows × features) float32, raw values, row-major so
+#                        a training window is one contiguous read
+#   <dir>/action.npy     (rows,) int64 label codes
+#   <dir>/meta.json      feature names, classes of every categorical column
+#                        (sorted, as LabelEncoder does) and the per-feature
+#                        mean / variance for StandardScaler
+#
+# The CSV is read twice in chunks: once for the row count and classes,
+# once to fill the memmaps. The mean / variance are merged chunk by chunk
+# (Chan et al.), so memory stays at one chunk whatever the size.
+
+FEATURES = [
+    "cpu_percent",
+    "memory_percent",
+    "latency_ms",
+    "error_count",
+    "request_rate",
+    "active_pods",
+    "predicted_load",
+    "service",
+    "service_type"
+]
+CATEGORICAL = ["service", "service_type", "action"]
+LABEL = "action"
+
+FEATURES_FILE = "features.npy"
+LABELS_FILE = "action.npy"
+META_FILE = "meta.json"
+
+
+class RunningStats:
+    """Column mean / population variance merged one chunk at a time."""
+
+    def __init__(self, n_cols):
+        self.n = 0
+        self.mean = np.zeros(n_cols)
+        self.m2 = np.zeros(n_cols)
+
+    def update(self, chunk):
+        k = len(chunk)
+        if k == 0:
+            return
+        mean = chunk.mean(axis=0)
+        m2 = ((chunk - mean) ** 2).sum(axis=0)
+        delta = mean - self.mean
+        total = self.n + k
+        self.mean += delta * k / total
+        self.m2 += m2 + delta ** 2 * self.n * k / total
+        self.n = total
+
+    @property
+    def var(self):
+        return self.m2 / max(self.n, 1)
+
+
+def encode(chunk, classes):
+    """Categorical columns → codes of the sorted classes (LabelEncoder order)."""
+    for col in CATEGORICAL:
+        codes = pd.Categorical(chunk[col], categories=classes[col]).codes
+        chunk[col] = codes.astype(np.int64)
+    return chunk
+
+
+def convert(csv_path, out_dir, chunk_rows=1_000_000):
+    os.makedirs(out_dir, exist_ok=True)
+
+    # ---------- pass 1: rows + classes ----------
+    rows = 0
+    seen = {col: set() for col in CATEGORICAL}
+    for chunk in pd.read_csv(csv_path, usecols=CATEGORICAL, chunksize=chunk_rows):
+        rows += len(chunk)
+        for col in CATEGORICAL:
+            seen[col].update(chunk[col].astype(str).unique())
+    classes = {col: sorted(values) for col, values in seen.items()}
+
+    # ---------- pass 2: fill the memmaps ----------
+    X = np.lib.format.open_memmap(
+        os.path.join(out_dir, FEATURES_FILE), mode="w+", dtype=np.float32, shape=(rows, len(FEATURES))
+    )
+    y = np.lib.format.open_memmap(
+        os.path.join(out_dir, LABELS_FILE), mode="w+", dtype=np.int64, shape=(rows,)
+    )
+    stats = RunningStats(len(FEATURES))
+
+    start = 0
+    for chunk in pd.read_csv(csv_path, usecols=FEATURES + [LABEL], chunksize=chunk_rows,
+                             dtype={col: str for col in CATEGORICAL}):
+        chunk = encode(chunk, classes)
+        values = chunk[FEATURES].to_numpy(dtype=np.float64)
+        stats.update(values)
+
+        end = start + len(chunk)
+        X[start:end] = values
+        y[start:end] = chunk[LABEL].to_numpy()
+        start = end
+        print(f"   {end:,}/{rows:,} rows")
+
+    X.flush()
+    y.flush()
+
+    meta = {
+        "rows": rows,
+        "features": FEATURES,
+        "classes": classes,
+        "mean": stats.mean.tolist(),
+        "var": stats.var.tolist(),
+        "source": os.path.basename(csv_path),
+    }
+    with open(os.path.join(out_dir, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def open_converted(path):
+    """→ (features memmap, labels memmap, meta) of a convert() directory, read-only."""
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+    X = np.load(os.path.join(path, FEATURES_FILE), mmap_mode="r")
+    y = np.load(os.path.join(path, LABELS_FILE), mmap_mode="r")
+    return X, y, meta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a training CSV to memory-mapped .npy files")
+    parser.add_argument("csv", nargs="?", default="k8s_autoscale_training_dataset.csv")
+    parser.add_argument("--out", help="output directory (default: the CSV name without .csv)")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    out = args.out or os.path.splitext(args.csv)[0]
+    print(f"\n📦 Converting {args.csv} → {out}/\n")
+    meta = convert(args.csv, out, args.chunk_rows)
+
+    print(f"\n✅ {meta['rows']:,} rows × {len(meta['features'])} features")
+    print(f"- {os.path.join(out, FEATURES_FILE)}")
+    print(f"- {os.path.join(out, LABELS_FILE)}")
+    print(f"- {os.path.join(out, META_FILE)}")
@@ -0,0 +1,163 @@
+import os
+import sys
+import time
+import pickle
+import numpy as np
+import pandas as pd
+import torch
+import torch.nn as nn
+# network definitions live in hf_deploy/networks.py, shared with the service
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "hf_deploy"))
+from networks import HealthcareLSTM
+
+print("\n📦 EXPORTING INFERENCE ENGINES...\n")
+
+SEQ_LEN = 10
+N_FEATURES = 9
+PARITY_WINDOWS = 5000
+
+# engine → (max |Δlogit| vs eager, min share of windows with eager's action).
+# Float engines only reorder the same float32 math; int8 rounds the weights,
+# so it gets a logit budget and an action-agreement floor instead.
+PARITY = {
+    "torchscript": (1e-4, 1.0),
+    "onnx": (1e-4, 0.999),
+    "int8": (2.0, 0.97),
+}
+
+features = [
+    "cpu_percent",
+    "memory_percent",
+    "latency_ms",
+    "error_count",
+    "request_rate",
+    "active_pods",
+    "predicted_load",
+    "service",
+    "service_type"
+]
+
+# ===============================
+# LOAD EAGER MODEL
+# ===============================
+torch.set_num_threads(int(os.environ.get("EXPORT_THREADS", "1")))
+
+model = HealthcareLSTM()
+model.load_state_dict(torch.load("best_lstm_model.pth", map_location="cpu"))
+model.eval()
+
+example = torch.zeros(1, SEQ_LEN, N_FEATURES)
+
+# ===============================
+# TORCHSCRIPT
+# ===============================
+torch.jit.script(model).save("best_lstm_model.torchscript.pt")
+print("✅ best_lstm_model.torchscript.pt")
+
+# ===============================
+# INT8 (dynamic quantized LSTM + Linear weights)
+# ===============================
+quantized = torch.ao.quantization.quantize_dynamic(
+    model, {nn.LSTM, nn.Linear}, dtype=torch.qint8
+)
+torch.jit.script(quantized).save("best_lstm_model.int8.pt")
+print("✅ best_lstm_model.int8.pt")
+
+# ===============================
+# ONNX (dynamic batch axis)
+# ===============================
+torch.onnx.export(
+    model, (example,), "best_lstm_model.onnx",
+    input_names=["x"], output_names=["logits"],
+    dynamic_axes={"x": {0: "batch"}, "logits": {0: "batch"}},
+    dynamo=False
+)
+print("✅ best_lstm_model.onnx")
+
+# ===============================
+# PARITY CHECK ON BUNDLED CSV
+# ===============================
+df = pd.read_csv("k8s_autoscale_training_dataset.csv").head(PARITY_WINDOWS + SEQ_LEN)
+
+scaler = pickle.load(open("scaler.pkl", "rb"))
+encoders = pickle.load(open("label_encoders.pkl", "rb"))
+
+for col in ["service", "service_type"]:
+    df[col] = encoders[col].transform(df[col])
+
+# ===============================
+# SKLEARN-FREE PREPROCESSING FOR THE PREDICTOR
+# ===============================
+np.savez(
+    "preprocess.npz",
+    mean=scaler.mean_,
+    scale=scaler.scale_,
+    **{f"{col}_classes": np.array([str(c) for c in encoders[col].classes_]) for col in encoders}
+)
+print("✅ preprocess.npz")
+
+# serving-side pre/post processing must match sklearn exactly
+from preprocess import load_preprocess
+
+prep = load_preprocess("preprocess.npz")
+raw = df[features].values.astype(np.float64)
+
+expected = scaler.transform(raw).astype(np.float32)
+assert np.array_equal(prep.transform(raw.copy()), expected), "preprocess.npz scaling != sklearn"
+
+labels = np.arange(len(prep.actions)).repeat(3)
+assert prep.decode(labels) == list(encoders["action"].inverse_transform(labels)), "action decode != sklearn"
+print("✅ preprocess parity with sklearn: exact")
+
+X = scaler.transform(df[features].values).astype(np.float32)
+windows = np.lib.stride_tricks.sliding_window_view(X, (SEQ_LEN, N_FEATURES))[:, 0]
+windows = torch.from_numpy(np.ascontiguousarray(windows[:PARITY_WINDOWS]))
+
+engines = {
+    "eager": model,
+    "torchscript": torch.jit.load("best_lstm_model.torchscript.pt"),
+    "int8": torch.jit.load("best_lstm_model.int8.pt"),
+}
+
+try:
+    import onnxruntime as ort
+    opts = ort.SessionOptions()
+    opts.intra_op_num_threads = torch.get_num_threads()
+    session = ort.InferenceSession("best_lstm_model.onnx", opts, providers=["CPUExecutionProvider"])
+    engines["onnx"] = lambda t: torch.from_numpy(session.run(None, {"x": t.numpy()})[0])
+except ImportError:
+    print("⚠ onnxruntime not installed, skipping ONNX parity")
+
+with torch.no_grad():
+    reference = model(windows)
+    ref_pred = reference.argmax(dim=1)
+
+    print("\n================ PARITY vs EAGER =================")
+    print(f"{'engine':<12} {'agree':>8} {'max|Δlogit|':>12} {'p50 ms':>8} {'p99 ms':>8}")
+
+    failed = []
+
+    for name, engine in engines.items():
+        out = engine(windows)
+        agree = (out.argmax(dim=1) == ref_pred).float().mean().item()
+        diff = (out - reference).abs().max().item()
+
+        # single-window latency, the predictor's common case
+        times = []
+        for i in range(500):
+            t = time.perf_counter()
+            engine(windows[i:i + 1])
+            times.append((time.perf_counter() - t) * 1000)
+
+        print(f"{name:<12} {agree:>8.2%} {diff:>12.2e} {np.percentile(times, 50):>8.3f} {np.percentile(times, 99):>8.3f}")
+
+        max_diff, min_agree = PARITY.get(name, (0.0, 1.0))
+        if diff > max_diff or agree < min_agree:
+            failed.append(f"{name}: agree {agree:.2%} (min {min_agree:.2%}), "
+                          f"max|Δlogit| {diff:.2e} (max {max_diff:.0e})")
+
+print("==================================================\n")
+assert not failed, "engine parity vs eager failed: " + ", ".join(failed)
+print("✅ engine parity within tolerance")
+print("predictor.py picks these up from hf_deploy/ or model/.")
+print("Select one with PREDICTOR_ENGINE=eager / torchscript / onnx / int8.")
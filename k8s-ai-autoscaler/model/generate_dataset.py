@@ -1,138 +1,259 @@
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
 import pandas as pd
-import random
+from multiprocessing import Pool
+from convert_dataset import FEATURES, FEATURES_FILE, LABELS_FILE, META_FILE, RunningStats
 
-print("\n🧠 Generating AI Autoscaler Dataset...\n")
+# criticality comes from the autoscaler's table, so the model learns the
+# rules for the priority each service is actually managed with
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "hf_deploy"))
+from services import PRIORITIES, priority_of
 
-rows = []
+# =============================
+# TEMPORAL DATASET GENERATOR (vectorized)
+# =============================
+# Every service gets its own minute-by-minute time series instead of
+# independent random rows, so a 10-step training window is 10 real
+# consecutive minutes of one service:
+#
+#   diurnal cycle  : request rate between a night and a peak level per service
+#   pods           : follow the load a few minutes late (like an autoscaler)
+#   cpu / latency  : from utilization = rps / (pods × what one pod serves)
+#   spikes         : sudden 5–25 min bursts (cpu 85–100, rps 900–2000)
+#   night troughs  : on some nights the load almost stops
+#   failure bursts : 3–15 min of 7–10 errors per tick
+#
+# Every column is one NumPy array per shard and the labeling rules are the
+# same as before, applied as array masks. Shards (up to --shard-rows of one
+# service) have their own seed from one SeedSequence, so the output only
+# depends on --rows / --seed / --shard-rows, never on --workers.
 
-services = [
-    "patient_monitoring",
-    "pharmacy",
-    "lab_report",
-    "analytics",
-    "emergency"
-]
+SERVICES = {
+    # name: (night rps, peak rps, rps one pod serves); priority: services.py
+    "patient_monitoring": (150, 900, 150),
+    "emergency": (80, 1200, 200),
+    "lab_report": (40, 600, 120),
+    "pharmacy": (40, 500, 120),
+    "analytics": (10, 300, 60),
+}
 
-for i in range(60000):   # dataset size
+# LabelEncoder order (sorted), so codes match what model_train fits
+SERVICE_CLASSES = sorted(SERVICES)
+TYPE_CLASSES = sorted(PRIORITIES)
+ACTION_CLASSES = ["scale_down", "scale_up", "stable"]
+SCALE_DOWN, SCALE_UP, STABLE = range(3)
 
-    # =============================
-    # RANDOM BASE METRICS
-    # =============================
-    cpu = random.randint(1,100)
-    memory = random.randint(5,95)
-    latency = random.randint(20,400)
-    errors = random.randint(0,10)
-    request_rate = random.randint(10,1500)
-    pods = random.randint(1,10)
-
-    service = random.choice(services)
-
-    # critical mapping
-    if service in ["patient_monitoring","emergency"]:
-        service_type = "critical"
-    else:
-        service_type = "non_critical"
-
-    # predicted load formula
-    predicted_load = (
-        0.5*cpu +
-        0.3*memory +
-        0.2*(latency/2) +
-        0.1*request_rate/50
-    )
+DAY = 1440                  # ticks (minutes) per day
+POD_LAG = 3                 # minutes until pods follow the load
+POD_STEP = 5                # pod count is re-decided every POD_STEP minutes
+
+SPIKE_SHARE, SPIKE_LEN = 0.08, (5, 25)
+FAILURE_SHARE, FAILURE_LEN = 0.03, (3, 15)
+TROUGH_NIGHTS = 0.6         # share of nights with a trough
+TROUGH_LEVEL = 0.12         # ... below this point of the diurnal wave
 
-    # =============================
-    # INTELLIGENT LABELING LOGIC
-    # =============================
 
-    # --- CRITICAL SERVICE RULES ---
-    if service_type == "critical":
+# =============================
+# EVENT WINDOWS
+# =============================
+def windows(rng, n, share, length):
+    """Boolean mask of random [start, start + len) windows covering ~share of n."""
+    mean_len = sum(length) / 2
+    count = rng.poisson(n * share / mean_len)
+    starts = rng.integers(0, n, count)
+    ends = np.minimum(starts + rng.integers(length[0], length[1] + 1, count), n)
 
-        if cpu > 70 or latency > 200 or request_rate > 800:
-            action = "scale_up"
+    edges = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(edges, starts, 1)
+    np.add.at(edges, ends, -1)
+    return np.cumsum(edges[:-1]) > 0
 
-        elif cpu < 30 and request_rate < 150 and pods > 2:
-            action = "scale_down"
 
-        else:
-            action = "stable"
+def smooth(x, k):
+    return np.convolve(x, np.ones(k) / k, mode="same")
 
-    # --- NON CRITICAL RULES ---
-    else:
 
-        if cpu > 85 or latency > 300:
-            action = "scale_up"
+# =============================
+# ONE SHARD: n ticks of one service
+# =============================
+def generate_shard(task):
+    service, start, n, seed = task
+    night_rps, peak_rps, pod_rps = SERVICES[service]
+    critical = priority_of(service) == "critical"
+    rng = np.random.default_rng(seed)
+    t = np.arange(start, start + n)
 
-        elif cpu < 25 and request_rate < 80:
-            action = "scale_down"
+    # ---------- diurnal load ----------
+    # same phase for a service across shards, so the clock just continues
+    phase = (SERVICE_CLASSES.index(service) / len(SERVICES)) * 0.25 * 2 * np.pi
+    wave = 0.5 - 0.5 * np.cos(2 * np.pi * t / DAY - phase)
+    rps = night_rps + (peak_rps - night_rps) * wave
+    rps *= np.exp(smooth(rng.normal(0, 0.25, n), 5))
 
-        else:
-            action = "stable"
+    # ---------- pods trail the load ----------
+    held = rps[(np.arange(n) // POD_STEP) * POD_STEP]
+    lagged = np.concatenate([np.full(POD_LAG, held[0]), held[:-POD_LAG]])[:n]
+    pods = np.clip(np.ceil(lagged / (pod_rps * 0.7)), 1, 10)
 
-    # =============================
-    # HARD SPIKE SCENARIOS
-    # =============================
-    if random.random() < 0.08:
-        cpu = random.randint(85,100)
-        request_rate = random.randint(900,2000)
-        latency = random.randint(200,500)
-        action = "scale_up"
+    # ---------- resource metrics ----------
+    util = rps / (pods * pod_rps)
+    cpu = 70 * util + rng.normal(0, 4, n)
+    latency = 20 + 60 * util + 400 * np.maximum(util - 0.85, 0) + rng.normal(0, 8, n)
+    errors = rng.poisson(0.3 + 10 * np.maximum(util - 1, 0))
+    memory = 30 + 0.4 * np.clip(cpu, 0, 100) + 8 * np.sin(2 * np.pi * t / (3 * DAY) + phase) + rng.normal(0, 3, n)
 
-    # =============================
-    # NIGHT LOW LOAD
-    # =============================
-    if random.random() < 0.1:
-        cpu = random.randint(1,20)
-        request_rate = random.randint(1,50)
-        latency = random.randint(20,80)
-        action = "scale_down"
+    # ---------- events ----------
+    spike = windows(rng, n, SPIKE_SHARE, SPIKE_LEN)
+    k = spike.sum()
+    cpu[spike] = rng.integers(85, 101, k)
+    rps[spike] = rng.integers(900, 2001, k)
+    latency[spike] = rng.integers(200, 501, k)
 
-    # =============================
-    # POD SATURATION
-    # =============================
-    if pods >= 8 and cpu > 70:
-        action = "scale_up"
+    nights = rng.random(t[-1] // DAY - t[0] // DAY + 1) < TROUGH_NIGHTS
+    trough = (wave < TROUGH_LEVEL) & nights[t // DAY - t[0] // DAY]
+    k = trough.sum()
+    cpu[trough] = rng.integers(1, 21, k)
+    rps[trough] = rng.integers(1, 51, k)
+    latency[trough] = rng.integers(20, 81, k)
+
+    failure = windows(rng, n, FAILURE_SHARE, FAILURE_LEN)
+    errors[failure] = rng.integers(7, 11, failure.sum())
 
-    if pods >= 8 and service_type == "non_critical":
-        action = "scale_down"
+    cpu = np.clip(np.rint(cpu), 1, 100)
+    memory = np.clip(np.rint(memory), 5, 95)
+    latency = np.clip(np.rint(latency), 20, 500)
+    errors = np.clip(errors, 0, 10)
+    rps = np.clip(np.rint(rps), 1, 2000)
+
+    predicted_load = np.round(0.5 * cpu + 0.3 * memory + 0.2 * (latency / 2) + 0.1 * rps / 50, 2)
 
     # =============================
-    # FAILURE CASE
+    # LABELING RULES (as masks, same order as the old per-row logic)
     # =============================
-    if errors > 6:
-        action = "scale_up"
+    if critical:
+        up = (cpu > 70) | (latency > 200) | (rps > 800)
+        down = (cpu < 30) & (rps < 150) & (pods > 2)
+    else:
+        up = (cpu > 85) | (latency > 300)
+        down = (cpu < 25) & (rps < 80)
+    action = np.select([up, down], [SCALE_UP, SCALE_DOWN], STABLE)
 
-    # =============================
-    rows.append([
-        cpu,
-        memory,
-        latency,
-        errors,
-        request_rate,
-        pods,
-        round(predicted_load,2),
-        service,
-        service_type,
-        action
+    action[spike] = SCALE_UP                      # hard spike scenarios
+    action[trough] = SCALE_DOWN                   # night low load
+    action[(pods >= 8) & (cpu > 70)] = SCALE_UP   # pod saturation
+    if not critical:
+        action[pods >= 8] = SCALE_DOWN
+    action[errors > 6] = SCALE_UP                 # failure case
+
+    X = np.column_stack([
+        cpu, memory, latency, errors, rps, pods, predicted_load,
+        np.full(n, SERVICE_CLASSES.index(service)),
+        np.full(n, TYPE_CLASSES.index(priority_of(service))),
     ])
+    return X, action
+
+
+# =============================
+# SHARDING
+# =============================
+def plan_shards(rows, shard_rows, seed):
+    """[(service, first tick, ticks, seed)]: services in turn, each one contiguous."""
+    per_service = np.full(len(SERVICES), rows // len(SERVICES))
+    per_service[:rows % len(SERVICES)] += 1
+
+    tasks = []
+    for service, total in zip(SERVICES, per_service):
+        for start in range(0, total, shard_rows):
+            tasks.append((service, start, min(shard_rows, total - start)))
+
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+    return [task + (s,) for task, s in zip(tasks, seeds)]
+
 
 # =============================
-# SAVE CSV
+# WRITERS: CSV, or convert_dataset's .npy layout
 # =============================
-df = pd.DataFrame(rows, columns=[
-    "cpu_percent",
-    "memory_percent",
-    "latency_ms",
-    "error_count",
-    "request_rate",
-    "active_pods",
-    "predicted_load",
-    "service",
-    "service_type",
-    "action"
-])
-
-df.to_csv("k8s_autoscale_training_dataset.csv", index=False)
-
-print("✅ Dataset created: k8s_autoscale_training_dataset.csv")
-print("Rows:", len(df))
\ No newline at end of file
+def write_csv(path, results):
+    for i, (X, action) in enumerate(results):
+        df = pd.DataFrame(X[:, :6].astype(np.int64), columns=FEATURES[:6])
+        df["predicted_load"] = X[:, 6]
+        df["service"] = pd.Categorical.from_codes(X[:, 7].astype(np.int64), SERVICE_CLASSES)
+        df["service_type"] = pd.Categorical.from_codes(X[:, 8].astype(np.int64), TYPE_CLASSES)
+        df["action"] = pd.Categorical.from_codes(action, ACTION_CLASSES)
+        df.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        yield action
+
+
+def write_npy(out_dir, rows, results):
+    os.makedirs(out_dir, exist_ok=True)
+    X_out = np.lib.format.open_memmap(
+        os.path.join(out_dir, FEATURES_FILE), mode="w+", dtype=np.float32, shape=(rows, len(FEATURES))
+    )
+    y_out = np.lib.format.open_memmap(
+        os.path.join(out_dir, LABELS_FILE), mode="w+", dtype=np.int64, shape=(rows,)
+    )
+    stats = RunningStats(len(FEATURES))
+
+    start = 0
+    for X, action in results:
+        stats.update(X)
+        X_out[start:start + len(X)] = X
+        y_out[start:start + len(X)] = action
+        start += len(X)
+        yield action
+
+    X_out.flush()
+    y_out.flush()
+    meta = {
+        "rows": rows,
+        "features": FEATURES,
+        "classes": {"service": SERVICE_CLASSES, "service_type": TYPE_CLASSES, "action": ACTION_CLASSES},
+        "mean": stats.mean.tolist(),
+        "var": stats.var.tolist(),
+        "source": "generate_dataset.py",
+    }
+    with open(os.path.join(out_dir, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate per-service metric time series with action labels")
+    parser.add_argument("--rows", type=int, default=60000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="k8s_autoscale_training_dataset.csv",
+                        help="*.csv, or a directory in convert_dataset.py's .npy layout")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes generating shards")
+    parser.add_argument("--shard-rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print("\n🧠 Generating AI Autoscaler Dataset...\n")
+    start = time.perf_counter()
+
+    tasks = plan_shards(args.rows, args.shard_rows, args.seed)
+    workers = max(min(args.workers, len(tasks)), 1)
+    pool = Pool(workers) if workers > 1 else None
+
+    # shards arrive in order and are written as they come
+    results = pool.imap(generate_shard, tasks) if pool else map(generate_shard, tasks)
+    if args.out.endswith(".csv"):
+        written = write_csv(args.out, results)
+    else:
+        written = write_npy(args.out, args.rows, results)
+
+    counts = np.zeros(len(ACTION_CLASSES), dtype=np.int64)
+    for action in written:
+        counts += np.bincount(action, minlength=len(ACTION_CLASSES))
+
+    if pool:
+        pool.close()
+        pool.join()
+
+    seconds = time.perf_counter() - start
+    print(f"{args.rows:,} rows, {len(tasks)} shards, {workers} workers | {seconds:.1f}s")
+    for name, count in zip(ACTION_CLASSES, counts):
+        print(f"   {name:<11} {count / max(args.rows, 1):6.1%}")
+    print(f"✅ Dataset created: {args.out}")
@@ -0,0 +1,191 @@
+import numpy as np
+
+# ==========================================
+# VECTORIZED SPIKE / ANOMALY DETECTOR
+# ==========================================
+# One pass per tick over a (time × deployments × signals) block read from
+# the TimeSeriesStore. Three upward checks run as whole-array NumPy ops:
+#
+#   zscore : latest value vs an EWMA mean/std of the window before it
+#   cusum  : drift of the last CUSUM_RECENT ticks above the baseline before
+#            them (catches sustained rises no single tick gives away)
+#   rate   : latest value vs the mean of the previous RATE_TICKS ticks (the
+#            old spike_detect rule, now for every signal)
+#
+# All three baselines (two EWMAs and the plain rate mean) come out of the
+# same two matrix products over the window, one weight row each.
+#
+# Every hit becomes an AnomalyEvent with a warning / critical severity.
+# Only flagged cells are turned into Python objects.
+
+SIGNALS = ("cpu", "mem", "rps", "latency_ms", "errors")
+
+# std floor per signal, so a flat series doesn't turn noise into z = ∞
+SIGMA_FLOOR = {"cpu": 2.0, "mem": 2.0, "rps": 1.0, "latency_ms": 5.0, "errors": 1.0}
+
+# rate rule ignores values below these (e.g. 1 → 2 rps) and never divides
+# by a baseline below them, so 0 → 2 errors is not an infinite spike
+RATE_FLOOR = {"cpu": 5.0, "mem": 5.0, "rps": 5.0, "latency_ms": 20.0, "errors": 2.0}
+
+WINDOW = 30            # ticks read per pass
+EWMA_ALPHA = 0.1
+MIN_BASELINE = 5       # baseline samples needed before zscore / cusum fire
+
+Z_WARN, Z_CRIT = 4.0, 6.0
+CUSUM_RECENT = 6
+CUSUM_K = 1.0          # slack per tick, in baseline sigmas
+CUSUM_WARN, CUSUM_CRIT = 5.0, 10.0
+RATE_TICKS = 4
+RATE_WARN, RATE_CRIT = 1.4, 2.0
+
+
+class AnomalyEvent:
+
+    def __init__(self, deployment, signal, kind, severity, value, baseline, score):
+        self.deployment = deployment
+        self.signal = signal
+        self.kind = kind             # zscore / cusum / rate
+        self.severity = severity     # warning / critical
+        self.value = value
+        self.baseline = baseline
+        self.score = score
+
+    def __repr__(self):
+        return (f"{self.deployment} {self.signal} {self.kind} {self.severity} "
+                f"({self.value:.1f} vs {self.baseline:.1f}, score {self.score:.1f})")
+
+
+def ewma_weights(t, excluded, alpha=EWMA_ALPHA):
+    """(k × t) EWMA weights; row k ignores the last excluded[k] ticks."""
+    decay = (1 - alpha) ** np.arange(t - 1, -1, -1)
+    w = np.tile(decay, (len(excluded), 1))
+    for k, skip in enumerate(excluded):
+        w[k, max(t - skip, 0):] = 0.0
+    return w
+
+
+def ewma_stats(x, weights, scratch=None):
+    """Weighted mean/std/count of every column of x for each weight row.
+
+    x: (t × n) with NaN = missing, weights: (k × t) → (k × n) arrays.
+    All weighted sums come from two BLAS products over the time axis, and
+    the variance is bias-corrected for the weights' effective sample size.
+    `scratch` (a dict) keeps the temporaries and stacked weights between calls.
+    """
+    if scratch is None:
+        scratch = {}
+    if scratch.get("shape") != x.shape:
+        scratch.update(
+            shape=x.shape,
+            missing=np.empty(x.shape, dtype=bool),
+            seen=np.empty(x.shape),
+            values=np.empty((x.shape[0], 2 * x.shape[1])),
+        )
+    # [w; w²; w > 0] for the weight sums, kept while the weights are
+    if scratch.get("weights") is not weights:
+        scratch.update(
+            weights=weights,
+            stacked=np.vstack([weights, weights * weights, (weights > 0).astype(np.float64)]),
+        )
+    missing, seen, values = scratch["missing"], scratch["seen"], scratch["values"]
+    k, n = weights.shape[0], x.shape[1]
+
+    # values = [v | v²] with missing = 0
+    np.isnan(x, out=missing)
+    v, v2 = values[:, :n], values[:, n:]
+    np.copyto(v, x)
+    np.copyto(v, 0.0, where=missing)
+    np.multiply(v, v, out=v2)
+    np.subtract(1.0, missing, out=seen)
+
+    # two BLAS products instead of five
+    sums = scratch["stacked"] @ seen
+    total, total_sq, count = sums[:k], sums[k:2 * k], sums[2 * k:]
+    moments = weights @ values
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = moments[:, :n] / total
+        var = np.maximum(moments[:, n:] / total - mean * mean, 0.0)
+        var *= total * total / (total * total - total_sq)
+
+    return mean, np.sqrt(var), count
+
+
+class AnomalyDetector:
+
+    def __init__(self, signals=SIGNALS, window=WINDOW):
+        self.signals = list(signals)
+        self.window = window
+        self.sigma_floor = np.array([SIGMA_FLOOR.get(s, 1.0) for s in self.signals])
+        self.rate_floor = np.array([RATE_FLOOR.get(s, 0.0) for s in self.signals])
+        self._weights = {}
+        self._scratch = {}
+
+    def weights(self, t):
+        # row 0: z-score baseline (all but the latest tick)
+        # row 1: CUSUM baseline (all but the last CUSUM_RECENT ticks)
+        # row 2: rate baseline, flat over the RATE_TICKS before the latest
+        if t not in self._weights:
+            rate = np.zeros((1, t))
+            rate[0, max(t - 1 - RATE_TICKS, 0):t - 1] = 1.0
+            self._weights[t] = np.vstack([ewma_weights(t, (1, CUSUM_RECENT)), rate])
+        return self._weights[t]
+
+    def detect(self, store):
+        return self.detect_array(store.block(self.signals, self.window), store.deployments)
+
+    def detect_array(self, x, deployments):
+        """x: (time × deployments × signals), oldest row first."""
+        t = x.shape[0]
+        if t < 2:
+            return []
+
+        latest = x[-1]
+        events = []
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+
+            # all three baselines in one pass over x
+            means, stds, counts = ewma_stats(x.reshape(t, -1), self.weights(t), self._scratch)
+            means = means.reshape((3,) + latest.shape)
+            stds = stds.reshape((3,) + latest.shape)
+            counts = counts.reshape((3,) + latest.shape)
+
+            # ---------- EWMA z-score ----------
+            mean = means[0]
+            z = (latest - mean) / np.maximum(stds[0], self.sigma_floor)
+            z_hit = (counts[0] >= MIN_BASELINE) & (z >= Z_WARN)
+            if z_hit.any():
+                events += self._events(z_hit, z >= Z_CRIT, "zscore", deployments, latest, mean, z)
+
+            # ---------- CUSUM over the recent ticks ----------
+            if t > CUSUM_RECENT:
+                ref_mean = means[1]
+                sigma = np.maximum(stds[1], self.sigma_floor)
+                steps = (x[-CUSUM_RECENT:] - ref_mean) / sigma - CUSUM_K
+                steps[np.isnan(steps)] = 0.0
+                # upper CUSUM S_T = C_T - min(0, min_j C_j)
+                c = np.cumsum(steps, axis=0)
+                s = c[-1] - np.minimum(c.min(axis=0), 0.0)
+                c_hit = (counts[1] >= MIN_BASELINE) & (s >= CUSUM_WARN)
+                if c_hit.any():
+                    events += self._events(c_hit, s >= CUSUM_CRIT, "cusum", deployments, latest, ref_mean, s)
+
+            # ---------- rate of change ----------
+            prev_mean = means[2]
+            ratio = latest / np.maximum(prev_mean, self.rate_floor)
+            r_hit = (counts[2] >= 2) & (latest >= self.rate_floor) & (ratio > RATE_WARN)
+            if r_hit.any():
+                events += self._events(r_hit, ratio > RATE_CRIT, "rate", deployments, latest, prev_mean, ratio)
+
+        return events
+
+    def _events(self, hit, crit, kind, deployments, value, baseline, score):
+        return [
+            AnomalyEvent(
+                deployments[d], self.signals[s], kind,
+                "critical" if crit[d, s] else "warning",
+                float(value[d, s]), float(baseline[d, s]), float(score[d, s])
+            )
+            for d, s in zip(*np.nonzero(hit))
+        ]
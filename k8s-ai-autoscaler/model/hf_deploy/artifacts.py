@@ -0,0 +1,41 @@
+import os
+
+# ================================
+# ARTIFACT RESOLUTION (LOCAL FIRST)
+# ================================
+# 1. $PREDICTOR_ARTIFACT_DIR
+# 2. next to predictor.py (the Dockerfile copies the weights, preprocess.npz
+#    and the exported engines there, and sets PREDICTOR_OFFLINE=1)
+# 3. model/ (where model_train.py and export_model.py write)
+# 4. HuggingFace Hub, unless PREDICTOR_OFFLINE=1 / HF_HUB_OFFLINE=1
+HF_REPO_ID = "Hariprasath5128/self_healing"
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+OFFLINE = (
+    os.environ.get("PREDICTOR_OFFLINE", "0") == "1" or
+    os.environ.get("HF_HUB_OFFLINE", "0") == "1"
+)
+
+def search_dirs():
+    dirs = [HERE, os.path.dirname(HERE)]
+    if os.environ.get("PREDICTOR_ARTIFACT_DIR"):
+        dirs.insert(0, os.environ["PREDICTOR_ARTIFACT_DIR"])
+    return dirs
+
+def resolve(filename, remote=True, required=True):
+    for folder in search_dirs():
+        path = os.path.join(folder, filename)
+        if os.path.exists(path):
+            print(f"📁 {filename} → {path}")
+            return path
+
+    if remote and not OFFLINE:
+        # only imported when a file is missing locally
+        from huggingface_hub import hf_hub_download
+        print(f"⬇ {filename} not vendored, downloading from HuggingFace...")
+        return hf_hub_download(repo_id=HF_REPO_ID, filename=filename)
+
+    if required:
+        raise FileNotFoundError(f"{filename} not found in {search_dirs()} (offline={OFFLINE})")
+    return None
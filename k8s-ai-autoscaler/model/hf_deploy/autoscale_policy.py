@@ -0,0 +1,189 @@
+import os
+import time
+from scaling_policy import desired_replicas
+from scaling_behavior import ScalingBehavior, HOLDING
+from pod_budget import Demand, allocate, patches
+
+# ==========================================
+# AUTOSCALING DECISIONS (no I/O)
+# ==========================================
+# Everything live_metrics_sender decides between "metrics observed" and
+# "scale patches sent": features for the model, what its prediction means,
+# each deployment's desired size and one allocation of the pod budget.
+# Nothing here talks to Kubernetes, the model API or the wall clock, so
+# simulator.py runs the exact same code against a simulated cluster.
+#
+#   build_features → (model) → apply_prediction → attach_anomalies → plan
+
+# critical above this (% CPU, now or forecast) blocks non-critical scale-ups;
+# replica counts themselves come from scaling_policy and each target_cpu
+CRITICAL_STRESS_CPU = 60
+
+# anomalies that override the model on a critical deployment: critical
+# severity on a load signal (a warning, or memory creeping up, is only logged)
+SPIKE_SIGNALS = {"cpu", "latency_ms", "rps", "errors"}
+
+# act on the load forecast this many ticks ahead (pod start-up time)
+FORECAST_LEAD = int(os.environ.get("FORECAST_LEAD", "2"))
+
+# ==========================================
+# PER-DEPLOYMENT STATE
+# ==========================================
+class DeploymentState:
+
+    def __init__(self, cfg, clock=time.monotonic):
+        self.cfg = cfg
+        self.name = cfg.name
+        self.replicas = 0
+        self.target = 0
+        self.cpu = 0
+        self.mem = 0
+        self.features = None
+        self.traffic = None
+        self.anomalies = []
+        self.forecast = None
+        self.expected_cpu = 0
+        self.expected_rps = 0
+        self.desired = 0
+        self.why = ""
+        self.action = "stable"
+        self.confidence = 0.0
+        # stabilization windows + rate limits, per deployment
+        self.behavior = ScalingBehavior(cfg.scale_up, cfg.scale_down, clock=clock)
+
+# ==========================================
+# MODEL INPUT / OUTPUT
+# ==========================================
+def build_features(st):
+    # measured traffic; latency falls back to the CPU estimate when idle
+    req = round(st.traffic.rps, 2)
+    errors = st.traffic.errors
+
+    if st.traffic.p50_ms is not None:
+        latency = round(st.traffic.p50_ms, 1)
+    else:
+        latency = 50+(st.cpu*0.5)
+    predicted_load = 0.5*st.cpu+0.3*st.mem+0.2*(latency/2)
+
+    st.features = [
+        st.cpu, st.mem, latency, errors,
+        req, st.replicas, predicted_load,
+        st.cfg.service_code,
+        st.cfg.priority_code
+    ]
+
+def apply_prediction(st, pred):
+    st.action = pred.get("predicted_action", "stable")
+    st.confidence = pred.get("confidence", 0.0)
+
+    # plan against the higher of now and the next FORECAST_LEAD ticks
+    st.forecast = pred.get("forecast")
+    st.expected_cpu = st.cpu
+    st.expected_rps = st.traffic.rps
+    if st.forecast:
+        st.expected_cpu = max(st.cpu, *st.forecast["cpu_percent"][:FORECAST_LEAD])
+        st.expected_rps = max(st.traffic.rps, *st.forecast["request_rate"][:FORECAST_LEAD])
+
+# ==========================================
+# SPIKE / ANOMALY EVENTS → DEPLOYMENTS
+# ==========================================
+def attach_anomalies(states, events, log=print):
+    by_deploy = {st.name: st for st in states}
+    for st in states:
+        st.anomalies = []
+    for event in events:
+        by_deploy[event.deployment].anomalies.append(event)
+        icon = "🚨" if event.severity == "critical" else "⚠"
+        log(f"{icon} ANOMALY {event}")
+
+def is_spike(event):
+    return event.severity == "critical" and event.signal in SPIKE_SIGNALS
+
+# ==========================================
+# PLAN: HOW MANY PODS EACH DEPLOYMENT WANTS (clamped to base..max)
+# ==========================================
+def plan_size(st, action, confidence):
+    cfg = st.cfg
+    return desired_replicas(
+        st.replicas, st.expected_cpu, action, confidence,
+        target_cpu=cfg.target_cpu,
+        rps=st.expected_rps, pod_rps=cfg.pod_rps,
+        floor=cfg.base, ceiling=cfg.max
+    )
+
+def want(st, critical_stressed, log=print):
+    cfg = st.cfg
+
+    # a critical load spike counts as a confident scale_up
+    action, confidence = st.action, st.confidence
+    if cfg.critical and any(is_spike(e) for e in st.anomalies):
+        action, confidence = "scale_up", 1.0
+
+    st.desired, st.why = plan_size(st, action, confidence)
+
+    if cfg.critical and st.desired > st.target:
+        log(f"\n⚡ CRITICAL AUTOSCALING ENGINE [{st.name}] → {st.desired} pods ({st.why})")
+        if st.expected_cpu > st.cpu:
+            log(f"🔮 FORECAST: CPU → {st.expected_cpu:.0f}% within {FORECAST_LEAD} ticks, scaling ahead")
+        if st.expected_cpu > CRITICAL_STRESS_CPU:
+            log("🚨 CRITICAL UNDER HIGH STRESS")
+
+    elif not cfg.critical and st.desired > max(st.target, cfg.base) and critical_stressed:
+        log(f"🚫 {st.name} scale-up BLOCKED — critical is under stress")
+        st.desired, st.why = max(st.target, cfg.base), "blocked"
+
+    # stabilization window / rate limit of this deployment only
+    wanted = st.desired
+    st.desired = st.behavior.recommend(st.target, wanted)
+    if st.behavior.state == HOLDING:
+        log(f"⏳ {st.name} holding at {st.target} (wants {wanted}; {st.why})")
+        st.why = "holding"
+
+# ==========================================
+# PLAN: ONE GLOBAL ALLOCATION (pod_budget), critical first
+# ==========================================
+def plan(states, capacity, preempted, log=print):
+    """Set every st.target; deployments that lose wanted pods go in `preempted`."""
+    critical_stressed = any(
+        st.expected_cpu > CRITICAL_STRESS_CPU for st in states if st.cfg.critical
+    )
+
+    for st in states:
+        want(st, critical_stressed, log)
+
+    demands = [
+        Demand(
+            st.name, st.cfg.priority_code, st.cfg.base, st.cfg.max, st.desired, st.target,
+            cpu_m=st.cfg.cpu_request_m, mem_mi=st.cfg.memory_request_mi
+        )
+        for st in states
+    ]
+    alloc = allocate(demands, capacity)
+    by_name = {st.name: st for st in states}
+
+    for name, replicas in patches(demands, alloc):
+        st = by_name[name]
+        kind = "CRITICAL " if st.cfg.critical else ""
+
+        if replicas > st.target:
+            icon = "⬆" if st.cfg.critical else "📦"
+            log(f"{icon} Scaling {kind}{name} {st.target} → {replicas} ({st.why})")
+
+        elif replicas < st.desired:
+            # wanted these pods, but a higher-priority deployment needs them
+            log(f"🔥 PREEMPTION: {name} {st.target} → {replicas}")
+            preempted.add(name)
+
+        else:
+            log(f"⬇ Scaling down {kind}{name} {st.target} → {replicas} ({st.why})")
+
+        st.behavior.record(st.target, replicas)
+        st.target = replicas
+
+    for st in states:
+        if st.name in preempted:
+            continue
+        if st.target < st.desired:
+            log(f"❌ Cannot scale {st.name} to {st.desired}: pod budget exhausted")
+        elif st.why == "load within band":
+            log(f"🧊 {st.name} stable")
@@ -0,0 +1,118 @@
+import json
+import os
+from scaling_behavior import Rules, default_up, default_down
+from services import PRIORITIES, priority_of
+from artifacts import resolve
+from preprocess import PREPROCESS_FILE, load_preprocess
+
+# ==========================================
+# MODEL ENCODINGS
+# ==========================================
+# codes are positions in the classes the model was trained with
+# (preprocess.npz, or a convert_dataset.py meta.json), never hard-coded
+
+# services the model never saw borrow a trained service of the same priority
+FALLBACK_SERVICE = {"critical": "patient_monitoring", "non_critical": "analytics"}
+
+
+def load_classes(path=None):
+    """→ {"service": [...], "service_type": [...], "action": [...]} of the trained model."""
+    path = path or resolve(PREPROCESS_FILE, remote=False)
+    if path.endswith(".json"):
+        with open(path) as f:
+            return json.load(f)["classes"]
+    return load_preprocess(path).classes
+
+
+def model_codes(service, priority, classes):
+    """(service, service_type) feature codes for one deployment."""
+    services, types = classes["service"], classes["service_type"]
+    if service not in services:
+        service = FALLBACK_SERVICE[priority]
+    return services.index(service), types.index(priority)
+
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "autoscaler_config.json")
+
+
+class ManagedDeployment:
+
+    def __init__(self, name, service, priority=None, base=1, max=3, cooldown=15,
+                 target_cpu=50, pod_rps=None, cpu_request_m=0, memory_request_mi=0,
+                 scale_up=None, scale_down=None, classes=None):
+        if priority is None:
+            priority = priority_of(service)
+        if priority not in PRIORITIES:
+            raise ValueError(f"{name}: priority must be one of {list(PRIORITIES)}")
+        if not 0 <= base <= max:
+            raise ValueError(f"{name}: need 0 <= base ({base}) <= max ({max})")
+        if not 0 < target_cpu <= 100:
+            raise ValueError(f"{name}: target_cpu must be in (0, 100]")
+
+        self.name = name
+        self.service = service
+        self.priority = priority
+        self.base = base
+        self.max = max
+        self.cooldown = cooldown          # default rate-limit period (s) for both directions
+        self.target_cpu = target_cpu      # % CPU per pod the scaling policy plans for
+        self.pod_rps = pod_rps            # requests/s one pod can serve (None: CPU only)
+        self.cpu_request_m = cpu_request_m            # one pod's requests, for node capacity
+        self.memory_request_mi = memory_request_mi
+        # HPA-style behavior: {"window": s, "policies": [{"type", "value", "period"}], "select"}
+        self.scale_up = Rules.from_dict(scale_up, default_up(cooldown))
+        self.scale_down = Rules.from_dict(scale_down, default_down(cooldown))
+        self.service_code, self.priority_code = model_codes(service, priority, classes or load_classes())
+
+    @property
+    def critical(self):
+        return self.priority == "critical"
+
+    def __repr__(self):
+        return f"{self.name}({self.priority}, {self.base}..{self.max})"
+
+
+class AutoscalerConfig:
+
+    def __init__(self, deployments, namespace="default", max_total_pods=8, tick_seconds=6,
+                 cpu_capacity_m=None, memory_capacity_mi=None):
+        names = [d.name for d in deployments]
+        if len(set(names)) != len(names):
+            raise ValueError("duplicate deployment names in autoscaler config")
+
+        # critical first; within a class, keep config order
+        self.deployments = sorted(deployments, key=lambda d: not d.critical)
+        self.namespace = namespace
+        self.max_total_pods = max_total_pods
+        self.tick_seconds = tick_seconds
+        # allocatable node CPU / memory shared by the managed pods (None: pod count only)
+        self.cpu_capacity_m = cpu_capacity_m
+        self.memory_capacity_mi = memory_capacity_mi
+
+    @property
+    def critical(self):
+        return [d for d in self.deployments if d.critical]
+
+    @property
+    def non_critical(self):
+        return [d for d in self.deployments if not d.critical]
+
+
+def load_config(path=None, classes=None):
+    """$AUTOSCALER_CONFIG, else autoscaler_config.json next to this file.
+
+    classes: the trained label classes (default: load_classes())."""
+    path = path or os.environ.get("AUTOSCALER_CONFIG", CONFIG_FILE)
+
+    with open(path) as f:
+        raw = json.load(f)
+
+    classes = classes or load_classes()
+    return AutoscalerConfig(
+        [ManagedDeployment(**d, classes=classes) for d in raw["deployments"]],
+        namespace=raw.get("namespace", "default"),
+        max_total_pods=raw.get("max_total_pods", 8),
+        tick_seconds=raw.get("tick_seconds", 6),
+        cpu_capacity_m=raw.get("cpu_capacity_m"),
+        memory_capacity_mi=raw.get("memory_capacity_mi"),
+    )
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from metrics_scraper import Traffic
+
+# ==========================================
+# ONE METRICS SNAPSHOT PER CONTROL TICK
+# ==========================================
+# A single set-based list call (`app in (a,b,...)`) fetches pod metrics
+# for every managed deployment; pods are then grouped by their app label.
+# Imbalance detection, CPU/memory aggregation and feature building all
+# read from this object instead of scraping `kubectl top` per question.
+# Replica counts come from the informer cache when one is passed, and
+# per-deployment traffic (RPS, latency, errors) from the /metrics scraper.
+
+
+class ClusterSnapshot:
+
+    def __init__(self, pods, replicas, traffic, taken_at):
+        self.pods = pods                  # deploy → [(pod, cpu_m, mem_mi)]
+        self.replicas = replicas          # deploy → spec.replicas
+        self.traffic = traffic            # deploy → Traffic
+        self.taken_at = taken_at
+
+    @classmethod
+    async def take(cls, api, deployments, cache=None, scraper=None):
+        selector = f"app in ({','.join(deployments)})"
+
+        async def replicas_of(deploy):
+            if cache is not None:
+                return cache.replicas(deploy)
+            try:
+                return await api.get_replicas(deploy)
+            except Exception:
+                return 0
+
+        async def traffic_of():
+            if scraper is None:
+                return {}
+            return await scraper.collect(deployments)
+
+        metrics, traffic, *replicas = await asyncio.gather(
+            api.list_pod_metrics(selector),
+            traffic_of(),
+            *(replicas_of(d) for d in deployments),
+            return_exceptions=True
+        )
+
+        if isinstance(metrics, Exception):
+            print("Metrics error:", metrics)
+            metrics = []
+        if isinstance(traffic, Exception):
+            print("Scrape error:", traffic)
+            traffic = {}
+
+        pods = {d: [] for d in deployments}
+        for name, cpu, mem, labels in metrics:
+            app = labels.get("app")
+            if app in pods:
+                pods[app].append((name, cpu, mem))
+
+        return cls(pods, dict(zip(deployments, replicas)), traffic, time.time())
+
+    # ==========================================
+    # VIEWS
+    # ==========================================
+    def traffic_of(self, deploy):
+        return self.traffic.get(deploy) or Traffic()
+
+    def pod_cpu(self, deploy):
+        return [(name, cpu) for name, cpu, _ in self.pods.get(deploy, [])]
+
+    def service_cpu(self, deploy):
+        pods = self.pods.get(deploy, [])
+        if not pods:
+            return 0, 0
+
+        cpus = [cpu for _, cpu, _ in pods]
+        mems = [mem for _, _, mem in pods]
+
+        avg = sum(cpus) / len(cpus)
+        mx = max(cpus)
+
+        final = (0.8 * mx) + (0.2 * avg)
+
+        cpu_percent = min(final, 100)
+        mem_percent = min((max(mems) / 10), 100)
+
+        return cpu_percent, mem_percent
+
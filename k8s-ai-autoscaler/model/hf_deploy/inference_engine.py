@@ -0,0 +1,57 @@
+import torch
+
+# model definitions are shared with model_train.py (networks.py)
+from networks import HealthcareLSTM, PolicyMLP, LoadForecaster, ACTION_MODELS
+from networks import FORECAST_TARGETS, FORECAST_HORIZON
+
+# ================================
+# LOAD FORECASTER (written by model_train.py --task forecast)
+# ================================
+FORECASTER_FILE = "load_forecaster.pth"
+
+# ================================
+# ENGINES (written by model/export_model.py)
+# ================================
+ENGINE_FILES = {
+    "eager": "best_lstm_model.pth",
+    "torchscript": "best_lstm_model.torchscript.pt",
+    "onnx": "best_lstm_model.onnx",
+    "int8": "best_lstm_model.int8.pt",
+}
+
+def set_threads(threads):
+    if threads:
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+
+def load_engine(name, eager_model, artifact_path=None):
+    """Return a callable: float32 tensor (N, 10, 9) → logits tensor (N, 3)."""
+
+    if name == "eager":
+        return eager_model
+
+    if name == "torchscript":
+        return torch.jit.load(artifact_path, map_location="cpu").eval()
+
+    if name == "int8":
+        if artifact_path:
+            return torch.jit.load(artifact_path, map_location="cpu").eval()
+        # no exported file: quantize the eager weights in-process
+        return torch.ao.quantization.quantize_dynamic(
+            eager_model, {torch.nn.LSTM, torch.nn.Linear}, dtype=torch.qint8
+        )
+
+    if name == "onnx":
+        import onnxruntime as ort
+
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = torch.get_num_threads()
+        opts.inter_op_num_threads = 1
+        session = ort.InferenceSession(artifact_path, opts, providers=["CPUExecutionProvider"])
+
+        def run(tensor):
+            return torch.from_numpy(session.run(None, {"x": tensor.numpy()})[0])
+
+        return run
+
+    raise ValueError(f"unknown engine '{name}', expected one of {sorted(ENGINE_FILES)}")
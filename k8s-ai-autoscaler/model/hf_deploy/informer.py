@@ -0,0 +1,158 @@
+import asyncio
+import httpx
+
+# ==========================================
+# LIST + WATCH INFORMER
+# ==========================================
+# Lists a resource once, then follows the watch stream from that
+# resourceVersion and applies every ADDED / MODIFIED / DELETED event to an
+# in-memory dict. Reads are plain dict lookups, so the control loop makes
+# no API calls for replica counts or pod membership. An expired
+# resourceVersion (410 Gone) or a dropped stream triggers a relist.
+
+
+class WatchExpired(Exception):
+    pass
+
+
+class Informer:
+
+    def __init__(self, api, kind, on_event=None):
+        self.api = api
+        self.kind = kind
+        self.on_event = on_event
+        self.objects = {}
+        self.resource_version = None
+        self.synced = asyncio.Event()
+        self._task = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+        await self.synced.wait()
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _list(self):
+        items, self.resource_version = await self.api.list_objects(self.kind)
+        self.objects = {obj["metadata"]["name"]: obj for obj in items}
+        if self.on_event:
+            self.on_event("RESYNC", None)
+        self.synced.set()
+
+    async def _run(self):
+        backoff = 1
+
+        while True:
+            try:
+                if self.resource_version is None:
+                    await self._list()
+
+                async for event_type, obj in self.api.watch(self.kind, self.resource_version):
+                    backoff = 1
+                    self._apply(event_type, obj)
+
+                # server-side timeout: resume straight away
+                continue
+
+            except asyncio.CancelledError:
+                raise
+
+            except WatchExpired:
+                print(f"♻ {self.kind} watch expired, relisting")
+                self.resource_version = None
+                continue
+
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 410:
+                    print(f"♻ {self.kind} watch expired, relisting")
+                    self.resource_version = None
+                    continue
+                print(f"{self.kind} watch error:", e)
+
+            except Exception as e:
+                print(f"{self.kind} watch error:", e)
+
+            # stream ended or failed: resume from the last seen version
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+    def _apply(self, event_type, obj):
+        if event_type == "ERROR":
+            # a 410 delivered as an in-stream Status object
+            if obj.get("code") == 410:
+                raise WatchExpired()
+            return
+
+        self.resource_version = obj["metadata"]["resourceVersion"]
+
+        if event_type == "BOOKMARK":
+            return
+
+        name = obj["metadata"]["name"]
+        if event_type == "DELETED":
+            self.objects.pop(name, None)
+        else:
+            self.objects[name] = obj
+
+        if self.on_event:
+            self.on_event(event_type, obj)
+
+
+# ==========================================
+# DEPLOYMENT + POD CACHE, INDEXED BY app LABEL
+# ==========================================
+class ClusterCache:
+
+    def __init__(self, api):
+        self.deployments = Informer(api, "deployments")
+        self.pods = Informer(api, "pods", on_event=self._index)
+        self.by_app = {}      # app label → {pod names}
+        self.pod_app = {}     # pod name → app label
+
+    async def start(self):
+        await asyncio.gather(self.deployments.start(), self.pods.start())
+        print(f"📚 Informer cache synced: {len(self.deployments.objects)} deployments, {len(self.pods.objects)} pods")
+
+    async def stop(self):
+        await asyncio.gather(self.deployments.stop(), self.pods.stop())
+
+    def _index(self, event_type, obj):
+        if event_type == "RESYNC":
+            self.by_app, self.pod_app = {}, {}
+            for pod in self.pods.objects.values():
+                self._index("ADDED", pod)
+            return
+
+        name = obj["metadata"]["name"]
+
+        # label changes (e.g. draining) move a pod between apps
+        old = self.pod_app.pop(name, None)
+        if old is not None:
+            self.by_app[old].discard(name)
+
+        app = obj["metadata"].get("labels", {}).get("app")
+        if event_type != "DELETED" and app is not None:
+            self.pod_app[name] = app
+            self.by_app.setdefault(app, set()).add(name)
+
+    # ==========================================
+    # READS (no API calls)
+    # ==========================================
+    def replicas(self, deploy):
+        obj = self.deployments.objects.get(deploy)
+        return int(obj["spec"].get("replicas", 0)) if obj else 0
+
+    def pods_of(self, deploy):
+        return sorted(self.by_app.get(deploy, ()))
+
+    def running_pods(self, deploy):
+        return [
+            name for name in self.pods_of(deploy)
+            if self.pods.objects[name].get("status", {}).get("phase") == "Running"
+        ]
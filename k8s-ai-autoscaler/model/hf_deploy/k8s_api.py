@@ -0,0 +1,289 @@
+import os
+import json
+import asyncio
+import httpx
+
+# ==========================================
+# ASYNC KUBERNETES API CLIENT
+# ==========================================
+# One pooled HTTP/1.1 keep-alive session to the API server replaces a
+# kubectl fork (and TLS handshake) per call.
+#
+#   in cluster : https://$KUBERNETES_SERVICE_HOST with the service account token
+#   elsewhere  : $K8S_API_URL, default http://127.0.0.1:8001 (`kubectl proxy`)
+
+SA_DIR = "/var/run/secrets/kubernetes.io/serviceaccount"
+
+MERGE_PATCH = {"Content-Type": "application/merge-patch+json"}
+
+# ==========================================
+# QUANTITY PARSING (metrics.k8s.io units)
+# ==========================================
+CPU_UNITS = {"n": 1e-6, "u": 1e-3, "m": 1.0}
+MEM_UNITS = {
+    "Ki": 1 / 1024, "Mi": 1.0, "Gi": 1024.0, "Ti": 1024.0 ** 2,
+    "k": 1e3 / 2 ** 20, "M": 1e6 / 2 ** 20, "G": 1e9 / 2 ** 20,
+}
+
+def cpu_millicores(q):
+    if q[-1] in CPU_UNITS:
+        return float(q[:-1]) * CPU_UNITS[q[-1]]
+    return float(q) * 1000.0
+
+def memory_mi(q):
+    for suffix in ("Ki", "Mi", "Gi", "Ti", "k", "M", "G"):
+        if q.endswith(suffix):
+            return float(q[:-len(suffix)]) * MEM_UNITS[suffix]
+    return float(q) / 2 ** 20
+
+
+class KubeAPI:
+
+    def __init__(self, namespace="default", base_url=None, max_connections=20, timeout=5.0):
+        self.namespace = namespace
+
+        headers = {}
+        verify = True
+
+        if base_url is None and os.environ.get("KUBERNETES_SERVICE_HOST"):
+            host = os.environ["KUBERNETES_SERVICE_HOST"]
+            port = os.environ.get("KUBERNETES_SERVICE_PORT", "443")
+            base_url = f"https://{host}:{port}"
+            with open(f"{SA_DIR}/token") as f:
+                headers["Authorization"] = f"Bearer {f.read().strip()}"
+            verify = f"{SA_DIR}/ca.crt"
+
+        base_url = base_url or os.environ.get("K8S_API_URL", "http://127.0.0.1:8001")
+
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            verify=verify,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            )
+        )
+
+    async def close(self):
+        await self.client.aclose()
+
+    def _ns(self, group_path):
+        return f"{group_path}/namespaces/{self.namespace}"
+
+    async def _get(self, path, **params):
+        r = await self.client.get(path, params=params or None)
+        r.raise_for_status()
+        return r
+
+    # ==========================================
+    # DEPLOYMENTS
+    # ==========================================
+    async def get_replicas(self, name):
+        deployment = (await self._get(f"{self._ns('/apis/apps/v1')}/deployments/{name}")).json()
+        return int(deployment["spec"].get("replicas", 0))
+
+    async def scale(self, name, replicas):
+        r = await self.client.patch(
+            f"{self._ns('/apis/apps/v1')}/deployments/{name}/scale",
+            json={"spec": {"replicas": int(replicas)}},
+            headers=MERGE_PATCH
+        )
+        r.raise_for_status()
+
+    # ==========================================
+    # PODS
+    # ==========================================
+    async def label_pod(self, pod, labels):
+        r = await self.client.patch(
+            f"{self._ns('/api/v1')}/pods/{pod}",
+            json={"metadata": {"labels": labels}},
+            headers=MERGE_PATCH
+        )
+        r.raise_for_status()
+
+    async def delete_pod(self, pod, grace_period=10):
+        r = await self.client.delete(
+            f"{self._ns('/api/v1')}/pods/{pod}",
+            params={"gracePeriodSeconds": grace_period}
+        )
+        if r.status_code != 404:
+            r.raise_for_status()
+
+    # ==========================================
+    # LIST + WATCH (informers)
+    # ==========================================
+    def _collection(self, kind):
+        group = "/apis/apps/v1" if kind == "deployments" else "/api/v1"
+        return f"{self._ns(group)}/{kind}"
+
+    async def list_objects(self, kind):
+        """(items, resourceVersion) for 'deployments' or 'pods'."""
+        body = (await self._get(self._collection(kind))).json()
+        return body["items"], body["metadata"]["resourceVersion"]
+
+    async def watch(self, kind, resource_version, timeout_seconds=300):
+        """Yield (event type, object) from resource_version on."""
+        params = {
+            "watch": "true",
+            "resourceVersion": resource_version,
+            "allowWatchBookmarks": "true",
+            "timeoutSeconds": timeout_seconds,
+        }
+        async with self.client.stream(
+            "GET", self._collection(kind), params=params,
+            timeout=httpx.Timeout(self.client.timeout.connect, read=timeout_seconds + 30)
+        ) as r:
+            r.raise_for_status()
+            async for line in r.aiter_lines():
+                if line:
+                    event = json.loads(line)
+                    yield event["type"], event["object"]
+
+    # ==========================================
+    # APP METRICS (pod's own /metrics via the API server proxy)
+    # ==========================================
+    async def scrape_pod(self, pod, port=8000, path="/metrics"):
+        """Yield the lines of the pod's Prometheus text exposition."""
+        async with self.client.stream("GET", f"{self._ns('/api/v1')}/pods/{pod}:{port}/proxy{path}") as r:
+            r.raise_for_status()
+            async for line in r.aiter_lines():
+                yield line
+
+    # ==========================================
+    # METRICS (what `kubectl top pods` reads)
+    # ==========================================
+    async def list_pod_metrics(self, label_selector=None):
+        """[(pod, cpu millicores, memory Mi, labels)]"""
+        params = {"labelSelector": label_selector} if label_selector else {}
+        items = (await self._get(f"{self._ns('/apis/metrics.k8s.io/v1beta1')}/pods", **params)).json()["items"]
+
+        pods = []
+        for item in items:
+            cpu = sum(cpu_millicores(c["usage"]["cpu"]) for c in item["containers"])
+            mem = sum(memory_mi(c["usage"]["memory"]) for c in item["containers"])
+            pods.append((item["metadata"]["name"], cpu, mem, item["metadata"].get("labels", {})))
+        return pods
+
+
+# ==========================================
+# FAKE BACKEND (tests / dry runs, no cluster)
+# ==========================================
+class FakeKubeAPI:
+    """In-memory stand-in with the same async interface as KubeAPI.
+
+    Pod usage comes from `load(deployment, pod_index) -> (cpu_m, mem_mi)`
+    and each pod's /metrics text from `exposition(deployment, pod_index)`.
+    Every mutating call is appended to `self.calls`. A deleted pod comes
+    straight back with its original labels, as if its ReplicaSet had
+    replaced it.
+    """
+
+    def __init__(self, deployments, namespace="default", load=None, exposition=None):
+        self.namespace = namespace
+        self.replicas = dict(deployments)
+        self.load = load or (lambda deploy, i: (10.0, 50.0))
+        self.exposition = exposition or (lambda deploy, i: "")
+        self.labels = {}
+        self.calls = []
+        self.version = 1
+        self.watchers = {"deployments": [], "pods": []}
+
+    async def close(self):
+        pass
+
+    # ==========================================
+    # WATCH EVENTS
+    # ==========================================
+    def _deployment_obj(self, name):
+        return {
+            "metadata": {"name": name, "resourceVersion": str(self.version)},
+            "spec": {"replicas": self.replicas[name]},
+            "status": {"readyReplicas": self.replicas[name]},
+        }
+
+    def _pod_obj(self, name, labels):
+        return {
+            "metadata": {"name": name, "labels": labels, "resourceVersion": str(self.version)},
+            "status": {"phase": "Running", "podIP": "127.0.0.1"},
+        }
+
+    def _emit(self, kind, event_type, obj):
+        self.version += 1
+        obj["metadata"]["resourceVersion"] = str(self.version)
+        for q in self.watchers[kind]:
+            q.put_nowait((event_type, obj))
+
+    async def list_objects(self, kind):
+        if kind == "deployments":
+            items = [self._deployment_obj(name) for name in self.replicas]
+        else:
+            items = [self._pod_obj(name, labels) for name, _, _, labels in self._pods()]
+        return items, str(self.version)
+
+    async def watch(self, kind, resource_version, timeout_seconds=300):
+        q = asyncio.Queue()
+        self.watchers[kind].append(q)
+        try:
+            while True:
+                yield await q.get()
+        finally:
+            self.watchers[kind].remove(q)
+
+    def _pods(self):
+        for deploy, n in self.replicas.items():
+            for i in range(n):
+                name = f"{deploy}-{i}"
+                labels = self.labels.get(name, {"app": deploy})
+                yield name, deploy, i, labels
+
+    @staticmethod
+    def _matches(labels, selector):
+        # supports `key=value` and `key in (a,b)`
+        if not selector:
+            return True
+        if " in (" in selector:
+            key, _, values = selector.partition(" in (")
+            return labels.get(key) in values.rstrip(")").split(",")
+        key, _, value = selector.partition("=")
+        return labels.get(key) == value
+
+    async def get_replicas(self, name):
+        return self.replicas.get(name, 0)
+
+    async def scale(self, name, replicas):
+        self.calls.append(("scale", name, int(replicas)))
+        old = self.replicas.get(name, 0)
+        self.replicas[name] = int(replicas)
+
+        self._emit("deployments", "MODIFIED", self._deployment_obj(name))
+        for i in range(int(replicas), old):
+            self._emit("pods", "DELETED", self._pod_obj(f"{name}-{i}", {"app": name}))
+        for i in range(old, int(replicas)):
+            self._emit("pods", "ADDED", self._pod_obj(f"{name}-{i}", {"app": name}))
+
+    async def label_pod(self, pod, labels):
+        self.calls.append(("label", pod, dict(labels)))
+        deploy = pod.rsplit("-", 1)[0]
+        self.labels[pod] = {**self.labels.get(pod, {"app": deploy}), **labels}
+        self._emit("pods", "MODIFIED", self._pod_obj(pod, self.labels[pod]))
+
+    async def delete_pod(self, pod, grace_period=10):
+        self.calls.append(("delete", pod))
+        self.labels.pop(pod, None)
+        deploy = pod.rsplit("-", 1)[0]
+        self._emit("pods", "MODIFIED", self._pod_obj(pod, {"app": deploy}))
+
+    async def scrape_pod(self, pod, port=8000, path="/metrics"):
+        deploy, _, i = pod.rpartition("-")
+        for line in self.exposition(deploy, int(i)).splitlines():
+            yield line
+
+    async def list_pod_metrics(self, label_selector=None):
+        pods = []
+        for name, deploy, i, labels in self._pods():
+            if self._matches(labels, label_selector):
+                cpu, mem = self.load(deploy, i)
+                pods.append((name, cpu, mem, labels))
+        return pods
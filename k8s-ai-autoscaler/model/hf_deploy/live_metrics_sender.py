@@ -1,7 +1,18 @@
-import subprocess
+import asyncio
+import os
 import time
-import requests
+import httpx
 import statistics
+from k8s_api import KubeAPI, FakeKubeAPI
+from cluster_snapshot import ClusterSnapshot
+from informer import ClusterCache
+from autoscaler_config import load_config
+from remediation import RemediationScheduler
+from metrics_scraper import MetricsScraper
+from timeseries_store import TimeSeriesStore
+from anomaly_detector import AnomalyDetector
+from pod_budget import Capacity
+from autoscale_policy import DeploymentState, build_features, apply_prediction, attach_anomalies, plan
 
 print("\n🧠 RESEARCH AI AUTOSCALER STARTED\n")
 
@@ -9,408 +20,258 @@ print("\n🧠 RESEARCH AI AUTOSCALER STARTED\n")
 # CONFIG
 # ================================
 
-MODEL_API = "http://127.0.0.1:35863/predict"
-NAMESPACE = "default"
+MODEL_BATCH_API = "http://127.0.0.1:35863/predict_batch"
 
-CRITICAL_DEPLOY = "critical-app"
-NONCRITICAL_DEPLOY = "noncritical-app"
+# real = API server via kubectl proxy / in-cluster token, fake = in-memory dry run
+K8S_BACKEND = os.environ.get("K8S_BACKEND", "real")
 
-# CLUSTER LIMIT
-MAX_TOTAL_PODS = 8
+# app metrics: each pod's /metrics on METRICS_PORT via the API server proxy,
+# or one stand-in exporter for every deployment when METRICS_URL is set
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "8000"))
+METRICS_URL = os.environ.get("METRICS_URL")
 
-# BASELINE (never go below)
-CRITICAL_BASE = 2
-NONCRITICAL_BASE = 1
+# metric history (ring buffers + 1m/5m rollups); set TSDB_DIR to keep it across restarts
+TSDB_DIR = os.environ.get("TSDB_DIR")
 
-# MAX LIMIT PER SERVICE
-CRITICAL_MAX = 7
-NON_CRITICAL_BASE = 3  # max noncritical can reach when critical is NOT stressed
+# managed deployments, priorities, base/max replicas, scaling behavior
+# (autoscaler_config.json or $AUTOSCALER_CONFIG)
+CONFIG = load_config()
+NAMESPACE = CONFIG.namespace
 
-# COOLDOWN
-COOLDOWN = 15
-last_scaled = 0
+# CLUSTER LIMIT (pods, and node CPU / memory when configured)
+MAX_TOTAL_PODS = CONFIG.max_total_pods
+CAPACITY = Capacity(MAX_TOTAL_PODS, CONFIG.cpu_capacity_m, CONFIG.memory_capacity_mi)
 
-cpu_history = []
+# stress threshold, forecast lead and the planning itself: autoscale_policy.py
+
+# wait after preempting non-critical pods before scaling critical up
+PREEMPT_GRACE = 2
+
+# a drained hot pod keeps serving in-flight requests this long before deletion
+DRAIN_SECONDS = 5
 
 # imbalance config
 IMBALANCE_RATIO = 3.0
 IMBALANCE_MIN_CPU = 50
 
-service_map = {"patient_monitoring": 5}
-type_map = {"critical": 0, "noncritical": 1}
-
-# ==========================================
-# GET REPLICAS
-# ==========================================
-def get_replicas(deploy):
-    try:
-        r = subprocess.check_output([
-            "kubectl", "get", "deployment", deploy,
-            "-o", "jsonpath={.spec.replicas}"
-        ]).decode().strip()
-        return int(r)
-    except:
-        return 0
-
 # ==========================================
 # SCALE
 # ==========================================
-def scale(deploy, replicas):
+async def scale(api, deploy, replicas):
+    """→ True once the PATCH went through."""
     print(f"⚡ Scaling {deploy} → {replicas}")
-    subprocess.run([
-        "kubectl","scale","deployment",deploy,
-        f"--replicas={replicas}"
-    ])
+    try:
+        await api.scale(deploy, replicas)
+        return True
+    except Exception as e:
+        print(f"Scale error [{deploy}]:", e)
+        return False
 
 # ==========================================
-# GET CPU PER SERVICE
+# LOAD IMBALANCE FIX
 # ==========================================
-def get_service_cpu(deploy):
-    try:
-        out = subprocess.check_output(
-            ["kubectl","top","pods","-l",f"app={deploy}","-n",NAMESPACE],
-            stderr=subprocess.DEVNULL
-        ).decode()
-
-        lines = out.strip().split("\n")[1:]
-
-        cpus=[]
-        mems=[]
+async def detect_and_fix_imbalance(api, snap, deploy, scheduler):
+    # one drain per deployment at a time
+    if scheduler.in_flight(("drain", deploy)):
+        return
 
-        for l in lines:
-            p=l.split()
-            cpu=int(p[1].replace("m",""))
-            mem=int(p[2].replace("Mi",""))
-            cpus.append(cpu)
-            mems.append(mem)
+    pods=snap.pod_cpu(deploy)
+    if len(pods)<2:
+        return
 
-        if not cpus:
-            return 0,0
+    cpus=[c for _,c in pods]
+    avg=statistics.mean(cpus)
+    hot_pod,hot_cpu=max(pods,key=lambda x:x[1])
 
-        avg=sum(cpus)/len(cpus)
-        mx=max(cpus)
+    if hot_cpu>=IMBALANCE_MIN_CPU and avg>0 and (hot_cpu/avg)>=IMBALANCE_RATIO:
 
-        final=(0.8*mx)+(0.2*avg)
+        print(f"\n🔀 LOAD IMBALANCE [{deploy}]")
+        print(f"Hot pod: {hot_pod} = {hot_cpu}m")
 
-        cpu_percent=min(final,100)
-        mem_percent=min((max(mems)/10),100)
+        try:
+            # out of the Service selector now, deleted once drained
+            await api.label_pod(hot_pod, {"app": f"{deploy}-draining"})
+        except Exception as e:
+            print(f"Imbalance fix error [{hot_pod}]:", e)
+            return
 
-        return cpu_percent, mem_percent
+        async def restart():
+            await api.delete_pod(hot_pod, grace_period=10)
+            print(f"✅ Hot pod {hot_pod} restarted for balance")
 
-    except:
-        return 0,0
+        scheduler.schedule(("drain", deploy), DRAIN_SECONDS, restart, value=hot_pod)
 
 # ==========================================
-# REQUEST RATE
+# OBSERVE (features from the tick snapshot)
 # ==========================================
-def get_request_rate():
-    try:
-        pod = subprocess.check_output(
-            ["kubectl","get","pods","-o","jsonpath={.items[0].metadata.name}"]
-        ).decode().strip()
-
-        logs = subprocess.check_output(
-            ["kubectl","logs",pod,"--since=5s"],
-            stderr=subprocess.DEVNULL
-        ).decode()
-
-        return logs.count("GET")+logs.count("POST")
-    except:
-        return 0
+def observe(st, snap, scheduler):
+    st.cpu, st.mem = snap.service_cpu(st.name)
+    st.replicas = snap.replicas.get(st.name, 0)
+
+    # a scale still waiting on its preemption grace already owns its pods
+    st.target = scheduler.value(("scale", st.name), st.replicas)
+
+    st.traffic = snap.traffic_of(st.name)
+    build_features(st)
+
+def record(store, states, t):
+    store.append(t, {
+        st.name: {
+            "cpu": st.cpu,
+            "mem": st.mem,
+            "rps": st.traffic.rps,
+            "latency_ms": st.traffic.p50_ms,
+            "p99_ms": st.traffic.p99_ms,
+            "errors": st.traffic.errors,
+            "error_rate": st.traffic.error_rate,
+            "replicas": st.replicas,
+        }
+        for st in states
+    })
 
 # ==========================================
-# SPIKE DETECT
+# PREDICT (one batched call for every deployment)
 # ==========================================
-def spike_detect(cpu):
-    cpu_history.append(cpu)
-    if len(cpu_history)>5:
-        cpu_history.pop(0)
+async def predict_all(http, states):
+    # deployment + service keys let the predictor keep real history
+    items = [
+        {"features": st.features, "deployment": st.name, "service": st.cfg.service}
+        for st in states
+    ]
 
-    if len(cpu_history)>=3:
-        if cpu_history[-1]>(statistics.mean(cpu_history[:-1])*1.4):
-            print("🚨 CPU SPIKE DETECTED")
-            return True
-    return False
+    res = await http.post(MODEL_BATCH_API, json={"items": items}, timeout=5)
+    res.raise_for_status()
 
-# ==========================================
-# PER POD CPU
-# ==========================================
-def get_per_pod_cpu(deploy):
-    try:
-        output = subprocess.check_output(
-            ["kubectl","top","pods","-l",f"app={deploy}","-n",NAMESPACE],
-            stderr=subprocess.DEVNULL
-        ).decode()
-
-        pods=[]
-        for line in output.strip().split("\n")[1:]:
-            parts=line.split()
-            if len(parts)<3: continue
-            name=parts[0]
-            cpu=int(parts[1].replace("m",""))
-            pods.append((name,cpu))
-        return pods
-    except:
-        return []
+    for st, pred in zip(states, res.json()["predictions"]):
+        apply_prediction(st, pred)
 
 # ==========================================
-# LOAD IMBALANCE FIX
+# APPLY: downs at once, ups after a preemption grace (never blocking)
 # ==========================================
-def detect_and_fix_imbalance(deploy):
-    pods=get_per_pod_cpu(deploy)
-    if len(pods)<2:
-        return
-
-    cpus=[c for _,c in pods]
-    avg=statistics.mean(cpus)
-    hot_pod,hot_cpu=max(pods,key=lambda x:x[1])
-
-    if hot_cpu>=IMBALANCE_MIN_CPU and avg>0 and (hot_cpu/avg)>=IMBALANCE_RATIO:
-
-        print(f"\n🔀 LOAD IMBALANCE [{deploy}]")
-        print(f"Hot pod: {hot_pod} = {hot_cpu}m")
-
-        subprocess.run([
-            "kubectl","label","pod",hot_pod,
-            f"app={deploy}-draining","--overwrite","-n",NAMESPACE
-        ],stdout=subprocess.DEVNULL,stderr=subprocess.DEVNULL)
+async def apply(api, states, preempted, scheduler):
+    now = []
+
+    for st in states:
+        key = ("scale", st.name)
+
+        if scheduler.in_flight(key):
+            if st.target == scheduler.value(key):
+                continue
+            # plan changed before the delayed scale fired
+            scheduler.cancel(key)
+
+        if st.target == st.replicas:
+            continue
+
+        if preempted and st.target > st.replicas:
+            # give preempted pods time to terminate; the loop keeps ticking
+            scheduler.schedule(
+                key, PREEMPT_GRACE,
+                lambda d=st.name, r=st.target: scale(api, d, r),
+                value=st.target
+            )
+            print(f"⏱ {st.name} → {st.target} scheduled in {PREEMPT_GRACE}s")
+        else:
+            now.append(st)
 
-        time.sleep(5)
+    applied = await asyncio.gather(*(scale(api, st.name, st.target) for st in now))
 
-        subprocess.run([
-            "kubectl","delete","pod",hot_pod,
-            "-n",NAMESPACE,"--grace-period=10"
-        ],stdout=subprocess.DEVNULL,stderr=subprocess.DEVNULL)
+    # a failed PATCH leaves the cluster (and next tick's snapshot) where it was
+    for st, ok in zip(now, applied):
+        if ok:
+            st.replicas = st.target
 
-        print("✅ Hot pod restarted for balance")
+# ==========================================
+# BACKEND
+# ==========================================
+def make_api():
+    if K8S_BACKEND == "fake":
+        print("🧪 Using in-memory fake Kubernetes API")
+        return FakeKubeAPI({d.name: d.base for d in CONFIG.deployments}, NAMESPACE)
+    return KubeAPI(NAMESPACE)
 
 # ==========================================
 # MAIN LOOP
 # ==========================================
-while True:
+async def control_loop(api, cache, http, scheduler, scraper, store, detector):
 
-    detect_and_fix_imbalance(CRITICAL_DEPLOY)
-    detect_and_fix_imbalance(NONCRITICAL_DEPLOY)
+    states = [DeploymentState(d) for d in CONFIG.deployments]
+    names = [st.name for st in states]
 
-    critical_cpu, critical_mem = get_service_cpu(CRITICAL_DEPLOY)
-    noncritical_cpu, noncritical_mem = get_service_cpu(NONCRITICAL_DEPLOY)
+    print("📋 Managing:", CONFIG.deployments)
 
-    critical=get_replicas(CRITICAL_DEPLOY)
-    noncritical=get_replicas(NONCRITICAL_DEPLOY)
-    total=critical+noncritical
+    while True:
 
-    req=get_request_rate()
-    errors=0
+        tick_start = time.perf_counter()
 
-    # =============================================
-    # 📊 PHASE 1: CRITICAL PODS MEASUREMENT (FIRST)
-    # =============================================
+        # one metrics list call for every managed deployment
+        # replicas come from the informer cache, not the API server
+        # traffic comes from one /metrics scrape per pod
+        snap = await ClusterSnapshot.take(api, names, cache, scraper)
 
-    crit_latency=50+(critical_cpu*0.5)
-    crit_predicted_load=0.5*critical_cpu+0.3*critical_mem+0.2*(crit_latency/2)
-
-    crit_features=[
-        critical_cpu, critical_mem, crit_latency, errors,
-        req, critical, crit_predicted_load,
-        service_map["patient_monitoring"],
-        type_map["critical"]
-    ]
-
-    print("\n" + "="*50)
-    print("📊 CRITICAL FEATURES:", crit_features)
-
-    try:
-        crit_res=requests.post(MODEL_API,json={"features":crit_features},timeout=5)
-        crit_data=crit_res.json()
-        crit_action=crit_data.get("predicted_action","stable")
-        print("🤖 CRITICAL MODEL:", crit_data)
-    except Exception as e:
-        print("Critical model error:",e)
-        time.sleep(5)
-        continue
-
-    # -----------------------------------------
-    # 🚨 CRITICAL STRESS CHECK + PREEMPTION
-    # -----------------------------------------
-    critical_stressed = critical_cpu > 60
-
-    if time.time()-last_scaled >= COOLDOWN:
-
-        if crit_action=="scale_up" or spike_detect(critical_cpu):
-
-            print("\n⚡ CRITICAL AUTOSCALING ENGINE")
-
-            if critical_stressed:
-
-                print("🚨 CRITICAL UNDER HIGH STRESS")
-
-                # AGGRESSIVE PREEMPTION: kill ALL noncritical down to 1
-                # 7 out of 8 pods should be critical
-                if noncritical > NONCRITICAL_BASE:
-                    print(f"🔥 PREEMPTION: Killing ALL noncritical down to {NONCRITICAL_BASE} (freeing {noncritical - NONCRITICAL_BASE} slots)")
-                    scale(NONCRITICAL_DEPLOY, NONCRITICAL_BASE)
-                    freed = noncritical - NONCRITICAL_BASE
-                    noncritical = NONCRITICAL_BASE
-                    total = critical + noncritical
-                    time.sleep(2)
-
-                # Scale critical up to fill available slots (up to 7)
-                desired_critical = min(MAX_TOTAL_PODS - NONCRITICAL_BASE, CRITICAL_MAX)
-                if critical < desired_critical:
-                    new_critical = min(desired_critical, MAX_TOTAL_PODS - noncritical)
-                    if new_critical > critical:
-                        print(f"⬆ Scaling CRITICAL {critical} → {new_critical}")
-                        scale(CRITICAL_DEPLOY, new_critical)
-                        critical = new_critical
-                        total = critical + noncritical
-
-            else:
-                # critical not at extreme stress but model says scale up
-                if total < MAX_TOTAL_PODS:
-                    print("⬆ Scaling CRITICAL (cluster has space)")
-                    scale(CRITICAL_DEPLOY, critical+1)
-                    critical += 1
-                    total += 1
-
-                elif noncritical > NONCRITICAL_BASE:
-                    print("🔥 PREEMPTION: Killing 1 NONCRITICAL for CRITICAL")
-                    scale(NONCRITICAL_DEPLOY, noncritical-1)
-                    time.sleep(2)
-                    noncritical -= 1
-                    scale(CRITICAL_DEPLOY, critical+1)
-                    critical += 1
-                    total = critical + noncritical
-
-                else:
-                    print("❌ Cannot scale critical further")
-
-            last_scaled=time.time()
-
-        elif crit_action=="scale_down":
-
-            if critical > CRITICAL_BASE:
-                print("⬇ AI scale down CRITICAL")
-                scale(CRITICAL_DEPLOY, critical-1)
-                critical -= 1
-                total = critical + noncritical
-                last_scaled=time.time()
+        await asyncio.gather(*(detect_and_fix_imbalance(api, snap, n, scheduler) for n in names))
 
-        else:
-            # stable — reduce excess critical if overprovisioned
-            if critical_cpu < 25 and critical > CRITICAL_BASE:
-                print("⬇ Reducing excess CRITICAL pods")
-                scale(CRITICAL_DEPLOY, critical-1)
-                critical -= 1
-                total = critical + noncritical
-                last_scaled=time.time()
-
-    else:
-        print("⏳ Cooldown active (critical phase)")
-
-    # =============================================
-    # � PHASE 2: NON-CRITICAL PODS MEASUREMENT (SECOND)
-    # =============================================
-
-    nc_latency=50+(noncritical_cpu*0.5)
-    nc_predicted_load=0.5*noncritical_cpu+0.3*noncritical_mem+0.2*(nc_latency/2)
-
-    nc_features=[
-        noncritical_cpu, noncritical_mem, nc_latency, errors,
-        req, noncritical, nc_predicted_load,
-        service_map["patient_monitoring"],
-        type_map["noncritical"]
-    ]
+        for st in states:
+            observe(st, snap, scheduler)
+        record(store, states, snap.taken_at)
+        attach_anomalies(states, detector.detect(store))
 
-    print("\n" + "="*50)
-    print("📊 NONCRITICAL FEATURES:", nc_features)
+        print("\n" + "="*50)
+        for st in states:
+            print(f"📊 {st.name} FEATURES:", st.features)
 
-    try:
-        nc_res=requests.post(MODEL_API,json={"features":nc_features},timeout=5)
-        nc_data=nc_res.json()
-        nc_action=nc_data.get("predicted_action","stable")
-        print("🤖 NONCRITICAL MODEL:", nc_data)
-    except Exception as e:
-        print("Noncritical model error:",e)
-        time.sleep(5)
-        continue
+        try:
+            await predict_all(http, states)
+        except Exception as e:
+            print("Model error:",e)
+            await asyncio.sleep(5)
+            continue
 
-    # -----------------------------------------
-    # 📦 NON-CRITICAL SCALING (GUARDED BY CRITICAL STRESS)
-    # -----------------------------------------
-    # re-check critical stress (may have changed after scaling)
-    critical_stressed = critical_cpu > 60
+        for st in states:
+            print(f"🤖 {st.name} MODEL: {st.action} ({st.confidence:.2f})")
 
-    if time.time()-last_scaled >= COOLDOWN:
+        preempted = set()
 
-        if nc_action=="scale_up":
+        # every deployment's desired size, then one allocation of the
+        # shared budget (critical first) and only the patches that change
+        plan(states, CAPACITY, preempted)
 
-            if critical_stressed:
-                print("🚫 NONCRITICAL scale-up BLOCKED — critical is under stress")
+        await apply(api, states, preempted, scheduler)
 
-            else:
-                # critical is NOT stressed → allow noncritical up to NON_CRITICAL_BASE
-                if noncritical < NON_CRITICAL_BASE and total < MAX_TOTAL_PODS:
-                    print(f"📦 Scaling NONCRITICAL (critical is safe, up to {NON_CRITICAL_BASE})")
-                    scale(NONCRITICAL_DEPLOY, noncritical+1)
-                    noncritical += 1
-                    total = critical + noncritical
-                else:
-                    print("⚠ Noncritical at max allowed or cluster full")
+        # =============================================
+        # CLUSTER STATUS
+        # =============================================
+        total = sum(st.replicas for st in states)
+        tick_ms = (time.perf_counter() - tick_start) * 1000
 
-            last_scaled=time.time()
+        print(f"\n📋 CLUSTER: total={total}/{MAX_TOTAL_PODS} | tick {tick_ms:.0f} ms")
+        for st in states:
+            pending = scheduler.value(("scale", st.name))
+            note = f" (→ {pending} pending)" if pending is not None else ""
+            ahead = f" (→ {st.expected_cpu:.1f}%)" if st.expected_cpu > st.cpu else ""
+            print(f"   {st.name:<24} replicas={st.replicas}{note} [{st.behavior.state}] cpu={st.cpu:.1f}%{ahead} | {st.traffic}")
 
-        elif nc_action=="scale_down":
+        if all(st.cpu < 40 and st.replicas == st.cfg.base for st in states):
+            print("🟢 Cluster perfectly balanced")
 
-            if noncritical > NONCRITICAL_BASE:
-                print("⬇ AI scale down NONCRITICAL")
-                scale(NONCRITICAL_DEPLOY, noncritical-1)
-                noncritical -= 1
-                total = critical + noncritical
-                last_scaled=time.time()
+        await asyncio.sleep(CONFIG.tick_seconds)
 
-        else:
-            # stable noncritical
-            print("🧊 Noncritical stable")
-
-            if not critical_stressed:
-                # allow noncritical recovery if below baseline and critical safe
-                if noncritical < NONCRITICAL_BASE:
-                    print("🟢 Restoring NONCRITICAL to baseline")
-                    scale(NONCRITICAL_DEPLOY, NONCRITICAL_BASE)
-                    noncritical = NONCRITICAL_BASE
-                    total = critical + noncritical
-                    last_scaled=time.time()
-
-                elif noncritical < NON_CRITICAL_BASE and total < MAX_TOTAL_PODS:
-                    print("📈 Recovering NONCRITICAL gradually")
-                    scale(NONCRITICAL_DEPLOY, noncritical+1)
-                    noncritical += 1
-                    total = critical + noncritical
-                    last_scaled=time.time()
-
-            # reduce excess noncritical if idle
-            if noncritical_cpu < 20 and noncritical > NONCRITICAL_BASE:
-                print("⬇ Reducing excess NONCRITICAL pods")
-                scale(NONCRITICAL_DEPLOY, noncritical-1)
-                noncritical -= 1
-                total = critical + noncritical
-                last_scaled=time.time()
-
-    else:
-        print("⏳ Cooldown active (noncritical phase)")
-
-    # =============================================
-    # CLUSTER STATUS
-    # =============================================
-    print(f"\n📋 CLUSTER: critical={critical} noncritical={noncritical} total={total}/{MAX_TOTAL_PODS}")
-    print(f"   CPU: critical={critical_cpu:.1f}% noncritical={noncritical_cpu:.1f}%")
-
-    if (
-        critical_cpu < 40 and
-        noncritical_cpu < 40 and
-        critical == CRITICAL_BASE and
-        noncritical == NONCRITICAL_BASE
-    ):
-        print("🟢 Cluster perfectly balanced")
-
-    time.sleep(6)
+async def main():
+    api = make_api()
+    cache = ClusterCache(api)
+    scheduler = RemediationScheduler()
+    store = TimeSeriesStore([d.name for d in CONFIG.deployments], path=TSDB_DIR)
+    detector = AnomalyDetector()
+    try:
+        await cache.start()
+        # one pooled keep-alive session for the model API as well
+        async with httpx.AsyncClient(timeout=5) as http:
+            scraper = MetricsScraper(api, cache, http, port=METRICS_PORT, url=METRICS_URL)
+            await control_loop(api, cache, http, scheduler, scraper, store, detector)
+    finally:
+        store.flush()
+        await scheduler.stop()
+        await cache.stop()
+        await api.close()
+
+asyncio.run(main())
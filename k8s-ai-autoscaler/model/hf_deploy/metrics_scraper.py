@@ -0,0 +1,192 @@
+import asyncio
+import math
+import re
+import time
+from prom_metrics import REQUESTS_METRIC, DURATION_METRIC
+
+# ==========================================
+# PROMETHEUS /metrics SCRAPER
+# ==========================================
+# Every running pod of a managed deployment is scraped once per tick
+# (through the API server pod proxy, or one stand-in URL for dry runs).
+# Lines are parsed as they stream in and folded into a few numbers per pod,
+# so the text is never held in memory. Per deployment:
+#
+#   rps        = Σ Δrequests / Δt
+#   error_rate = Δ5xx / Δrequests
+#   p50 / p99  = quantiles of the Δ latency histogram (histogram_quantile)
+#
+# The first scrape of a pod only sets its baseline.
+
+BUCKET_METRIC = f"{DURATION_METRIC}_bucket"
+
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def _unescape(value):
+    return value.replace('\\"', '"').replace("\\n", "\n").replace("\\\\", "\\")
+
+
+def parse_line(line):
+    """'name{a="b"} 1.5 [timestamp]' → (name, labels, value); None for comments."""
+    line = line.strip()
+    if not line or line[0] == "#":
+        return None
+
+    if "{" in line:
+        name, _, rest = line.partition("{")
+        label_text, _, rest = rest.rpartition("}")
+        labels = {k: _unescape(v) for k, v in LABEL.findall(label_text)}
+    else:
+        name, _, rest = line.partition(" ")
+        labels = {}
+
+    return name.strip(), labels, float(rest.split()[0])
+
+
+# ==========================================
+# ONE POD'S COUNTERS AT ONE INSTANT
+# ==========================================
+class PodSample:
+
+    def __init__(self):
+        self.requests = 0.0
+        self.errors = 0.0
+        self.buckets = {}      # upper bound (s) → cumulative count
+        self.taken_at = time.monotonic()
+
+
+async def read_sample(lines):
+    sample = PodSample()
+
+    async for line in lines:
+        parsed = parse_line(line)
+        if parsed is None:
+            continue
+        name, labels, value = parsed
+
+        if name == REQUESTS_METRIC:
+            sample.requests += value
+            if labels.get("status", "").startswith("5"):
+                sample.errors += value
+
+        elif name == BUCKET_METRIC:
+            le = float(labels["le"])
+            sample.buckets[le] = sample.buckets.get(le, 0.0) + value
+
+    return sample
+
+
+def histogram_quantile(q, buckets):
+    """Prometheus histogram_quantile over {upper bound: cumulative count}."""
+    if not buckets:
+        return None
+    bounds = sorted(buckets)
+    total = buckets[bounds[-1]]
+    if total <= 0:
+        return None
+
+    rank = q * total
+    lower, below = 0.0, 0.0
+    for le in bounds:
+        count = buckets[le]
+        if count >= rank:
+            if math.isinf(le):
+                # in the +Inf bucket: report the highest finite bound
+                return lower
+            if count == below:
+                return le
+            return lower + (le - lower) * (rank - below) / (count - below)
+        lower, below = le, count
+    return lower
+
+
+# ==========================================
+# PER-DEPLOYMENT TRAFFIC OVER THE LAST TICK
+# ==========================================
+class Traffic:
+
+    def __init__(self, rps=0.0, errors=0.0, error_rate=0.0, p50_ms=None, p99_ms=None):
+        self.rps = rps
+        self.errors = errors
+        self.error_rate = error_rate
+        self.p50_ms = p50_ms         # None when no request finished in the window
+        self.p99_ms = p99_ms
+
+    def __repr__(self):
+        p50 = "-" if self.p50_ms is None else f"{self.p50_ms:.0f}"
+        p99 = "-" if self.p99_ms is None else f"{self.p99_ms:.0f}"
+        return f"{self.rps:.1f} rps, p50 {p50} ms, p99 {p99} ms, err {self.error_rate:.1%}"
+
+
+class MetricsScraper:
+
+    def __init__(self, api, cache, http, port=8000, path="/metrics", url=None):
+        self.api = api
+        self.cache = cache
+        self.http = http
+        self.port = port
+        self.path = path
+        self.url = url            # stand-in exporter: one URL per deployment
+        self.prev = {}            # (deploy, pod) → PodSample
+
+    def targets(self, deploy):
+        if self.url:
+            return [deploy]
+        return self.cache.running_pods(deploy) if self.cache is not None else []
+
+    async def _scrape(self, pod):
+        if self.url:
+            async with self.http.stream("GET", self.url) as r:
+                r.raise_for_status()
+                return await read_sample(r.aiter_lines())
+        return await read_sample(self.api.scrape_pod(pod, self.port, self.path))
+
+    async def collect(self, deployments):
+        """deploy → Traffic since the previous collect()."""
+        keys = [(d, pod) for d in deployments for pod in self.targets(d)]
+        samples = await asyncio.gather(*(self._scrape(pod) for _, pod in keys), return_exceptions=True)
+
+        windows = {d: [0.0, 0.0, 0.0, {}] for d in deployments}   # rps, Δreq, Δerr, Δbuckets
+
+        for key, cur in zip(keys, samples):
+            if isinstance(cur, Exception):
+                print(f"Scrape error {key[1]}:", cur)
+                continue
+
+            prev = self.prev.get(key)
+            self.prev[key] = cur
+            if prev is None:
+                continue
+
+            # counters only go down when the process restarted: count from zero
+            if cur.requests < prev.requests or any(cur.buckets.get(le, 0.0) < n for le, n in prev.buckets.items()):
+                zero = PodSample()
+                zero.taken_at = prev.taken_at
+                prev = zero
+
+            dt = max(cur.taken_at - prev.taken_at, 1e-6)
+            window = windows[key[0]]
+            window[0] += (cur.requests - prev.requests) / dt
+            window[1] += cur.requests - prev.requests
+            window[2] += cur.errors - prev.errors
+            for le, n in cur.buckets.items():
+                window[3][le] = window[3].get(le, 0.0) + n - prev.buckets.get(le, 0.0)
+
+        # forget pods that are gone
+        live = set(keys)
+        for key in [k for k in self.prev if k not in live]:
+            del self.prev[key]
+
+        traffic = {}
+        for deploy, (rps, requests, errors, buckets) in windows.items():
+            p50 = histogram_quantile(0.5, buckets)
+            p99 = histogram_quantile(0.99, buckets)
+            traffic[deploy] = Traffic(
+                rps=rps,
+                errors=errors,
+                error_rate=errors / requests if requests > 0 else 0.0,
+                p50_ms=p50 * 1000 if p50 is not None else None,
+                p99_ms=p99 * 1000 if p99 is not None else None,
+            )
+        return traffic
@@ -0,0 +1,98 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# ==========================================
+# DYNAMIC MICRO-BATCHING
+# ==========================================
+# Concurrent callers submit one item each. The worker waits up to
+# max_wait_ms (or until max_batch_size items are queued), then runs
+# fn(list_of_items) once and hands every caller its own result.
+# fn runs on a single dedicated thread so the event loop keeps accepting
+# requests while a batch is in flight; those requests form the next batch.
+# A caller that already holds many items (run) gets them scored in one
+# fn call on that same thread, whatever max_batch_size is.
+
+
+class MicroBatcher:
+
+    def __init__(self, fn, max_batch_size=64, max_wait_ms=2.0):
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="batcher")
+        self._pending = deque()
+        self._wakeup = None
+        self._full = None
+        self._worker = None
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        for _, fut in self._pending:
+            if not fut.done():
+                fut.cancel()
+        self._pending.clear()
+        self.executor.shutdown(wait=False)
+
+    async def submit(self, item):
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.append((item, fut))
+
+        self._wakeup.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._full.set()
+
+        return await fut
+
+    async def run(self, items):
+        """fn(items) in one call on the batcher thread, never split."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.fn, items)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await self._wakeup.wait()
+
+            # hold the first request briefly so concurrent ones can join
+            if len(self._pending) < self.max_batch_size:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_wait)
+                except asyncio.TimeoutError:
+                    pass
+
+            n = min(len(self._pending), self.max_batch_size)
+            batch = [self._pending.popleft() for _ in range(n)]
+
+            if len(self._pending) < self.max_batch_size:
+                self._full.clear()
+            if not self._pending:
+                self._wakeup.clear()
+
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+
+            try:
+                results = await loop.run_in_executor(self.executor, self.fn, items)
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
@@ -0,0 +1,102 @@
+import torch.nn as nn
+
+# ===============================
+# MODEL DEFINITIONS
+# ===============================
+# The one copy of every network: model_train.py, export_model.py and
+# benchmark_models.py (via sys.path) and inference_engine.py all import
+# from here, so training and serving can't drift apart. It lives in
+# hf_deploy because that is what the service image ships.
+
+# ===============================
+# ACTION MODEL (BiLSTM)
+# ===============================
+class HealthcareLSTM(nn.Module):
+    def __init__(self, input_size=9, hidden_size=64, num_layers=2, num_classes=3):
+        super().__init__()
+
+        self.lstm = nn.LSTM(
+            input_size=input_size,
+            hidden_size=hidden_size,
+            num_layers=num_layers,
+            batch_first=True,
+            bidirectional=True
+        )
+
+        self.fc1 = nn.Linear(hidden_size * 2, 32)
+        self.relu = nn.ReLU()
+        self.fc2 = nn.Linear(32, num_classes)
+
+    def forward(self, x):
+        out, _ = self.lstm(x)
+        last_step = out[:, -1, :]
+        out = self.relu(self.fc1(last_step))
+        out = self.fc2(out)
+        return out
+
+
+# ===============================
+# LOAD FORECASTER (causal LSTM, multi-step regression)
+# ===============================
+# Predicts the scaled values of FORECAST_TARGETS for the next
+# FORECAST_HORIZON ticks after the input window.
+
+# forecast target → its column in the feature vector
+FORECAST_TARGETS = {"cpu_percent": 0, "request_rate": 4}
+FORECAST_HORIZON = 5
+
+
+class LoadForecaster(nn.Module):
+    def __init__(self, input_size=9, hidden_size=64, num_layers=1,
+                 horizon=FORECAST_HORIZON, n_targets=len(FORECAST_TARGETS)):
+        super().__init__()
+
+        self.horizon = horizon
+        self.n_targets = n_targets
+
+        self.lstm = nn.LSTM(
+            input_size=input_size,
+            hidden_size=hidden_size,
+            num_layers=num_layers,
+            batch_first=True
+        )
+
+        self.head = nn.Linear(hidden_size, horizon * n_targets)
+
+    def forward(self, x):
+        out, _ = self.lstm(x)
+        out = self.head(out[:, -1, :])
+        return out.view(-1, self.horizon, self.n_targets)
+
+
+# ===============================
+# POLICY MLP (distilled student of HealthcareLSTM)
+# ===============================
+# The action labels are threshold rules over single timesteps, so a small
+# MLP over the flattened window gets most of the way for ~1% of the LSTM's
+# compute. Same input (N, 10, 9) and output (N, 3 logits) as the LSTM.
+class PolicyMLP(nn.Module):
+    def __init__(self, input_size=9, seq_len=10, hidden_size=64, num_classes=3):
+        super().__init__()
+
+        self.net = nn.Sequential(
+            nn.Flatten(),
+            nn.Linear(input_size * seq_len, hidden_size),
+            nn.ReLU(),
+            nn.Linear(hidden_size, 32),
+            nn.ReLU(),
+            nn.Linear(32, num_classes)
+        )
+
+    def forward(self, x):
+        return self.net(x)
+
+
+# ===============================
+# ACTION MODEL REGISTRY (model_train.py --model / PREDICTOR_MODEL)
+# ===============================
+# name → (class, weights file)
+ACTION_MODELS = {
+    "lstm": (HealthcareLSTM, "best_lstm_model.pth"),
+    "mlp": (PolicyMLP, "policy_mlp.pth"),
+}
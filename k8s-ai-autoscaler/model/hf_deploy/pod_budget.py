@@ -0,0 +1,112 @@
+import heapq
+
+# ==========================================
+# GLOBAL POD BUDGET (one allocation per tick)
+# ==========================================
+# Every deployment asks for `desired` pods (scaling_policy) between its
+# floor (base) and ceiling (max). allocate() hands out the cluster's pods,
+# and node CPU / memory when configured, one pod at a time to whichever
+# pod is worth most:
+#
+#   1. floors first, critical before non-critical
+#   2. then wanted pods, critical before non-critical; within a class the
+#      deployment furthest (relatively) from its desired size goes next,
+#      so a shortage is shared in proportion to demand
+#   3. a pod that is already running beats a new one by STICKINESS, so
+#      small swings in desired sizes don't move pods back and forth
+#
+# A pod's worth only falls as its deployment grows, so for a pod-count
+# budget the greedy pass is optimal. With CPU / memory limits on top it
+# is a greedy approximation: a deployment whose next pod no longer fits
+# stops growing and smaller pods may still fill the gap.
+
+STICKINESS = 0.15
+
+
+class Demand:
+
+    def __init__(self, name, priority, floor, ceiling, desired, current, cpu_m=0.0, mem_mi=0.0):
+        self.name = name
+        self.priority = priority           # 0 = critical, higher = less important
+        self.floor = floor
+        self.ceiling = ceiling
+        self.desired = min(max(desired, floor), ceiling)
+        self.current = current
+        self.cpu_m = cpu_m                 # requests of one pod
+        self.mem_mi = mem_mi
+
+    def __repr__(self):
+        return f"{self.name}(p{self.priority}, {self.current} → {self.desired}, {self.floor}..{self.ceiling})"
+
+
+class Capacity:
+
+    def __init__(self, pods, cpu_m=None, mem_mi=None):
+        self.pods = pods
+        self.cpu_m = cpu_m                 # None = not limited
+        self.mem_mi = mem_mi
+
+    def fits(self, used, d):
+        pods, cpu, mem = used
+        if pods + 1 > self.pods:
+            return False
+        if self.cpu_m is not None and cpu + d.cpu_m > self.cpu_m:
+            return False
+        if self.mem_mi is not None and mem + d.mem_mi > self.mem_mi:
+            return False
+        return True
+
+    def fits_all(self, demands):
+        """Every deployment can have its desired size at once."""
+        if sum(d.desired for d in demands) > self.pods:
+            return False
+        if self.cpu_m is not None and sum(d.desired * d.cpu_m for d in demands) > self.cpu_m:
+            return False
+        if self.mem_mi is not None and sum(d.desired * d.mem_mi for d in demands) > self.mem_mi:
+            return False
+        return True
+
+
+def _rank(d, k):
+    """Heap key of deployment d's k-th pod (smaller = handed out first)."""
+    tier = 0 if k <= d.floor else 1
+    worth = (d.desired - k + 1) / d.desired
+    if k <= d.current:
+        worth += STICKINESS
+    return (tier, d.priority, -worth)
+
+
+def allocate(demands, capacity):
+    """→ {name: replicas}, never above desired, floors first."""
+    # no shortage: the greedy pass would hand everyone their desired size
+    if capacity.fits_all(demands):
+        return {d.name: d.desired for d in demands}
+
+    alloc = {d.name: 0 for d in demands}
+    used = [0, 0.0, 0.0]
+
+    heap = [(_rank(d, 1), i, 1) for i, d in enumerate(demands) if d.desired >= 1]
+    heapq.heapify(heap)
+
+    while heap:
+        _, i, k = heapq.heappop(heap)
+        d = demands[i]
+
+        # its next pods are the same size, so this deployment is done
+        if not capacity.fits(used, d):
+            continue
+
+        alloc[d.name] = k
+        used[0] += 1
+        used[1] += d.cpu_m
+        used[2] += d.mem_mi
+
+        if k < d.desired:
+            heapq.heappush(heap, (_rank(d, k + 1), i, k + 1))
+
+    return alloc
+
+
+def patches(demands, alloc):
+    """Only the deployments whose replica count changes: [(name, replicas)]."""
+    return [(d.name, alloc[d.name]) for d in demands if alloc[d.name] != d.current]
@@ -1,97 +1,376 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from contextlib import asynccontextmanager
+import asyncio
+import os
+import time
 import torch
 import numpy as np
-import pickle
-from huggingface_hub import hf_hub_download
+from micro_batcher import MicroBatcher
+from sequence_buffer import SequenceStore
+from streaming_lstm import StreamingLSTM
+from inference_engine import ACTION_MODELS, ENGINE_FILES, load_engine, set_threads
+from inference_engine import LoadForecaster, FORECASTER_FILE, FORECAST_TARGETS
+from artifacts import resolve
+from preprocess import PREPROCESS_FILE, load_preprocess, load_pickles
+from prom_metrics import RequestMetrics
+from scaling_policy import desired_replicas
 
-app = FastAPI()
+# ================================
+# MICRO-BATCHING CONFIG
+# ================================
+MAX_BATCH_SIZE = int(os.environ.get("PREDICT_MAX_BATCH", "64"))
+MAX_WAIT_MS = float(os.environ.get("PREDICT_MAX_WAIT_MS", "2"))
 
-print("\n⬇ Downloading model from HuggingFace...\n")
+# ================================
+# STREAMING INFERENCE CONFIG
+# ================================
+# keyed callers advance one LSTM timestep per tick instead of ten,
+# with an exact full-window recompute every STREAMING_RESYNC_EVERY ticks.
+# Only 1 is exact; above that actions drift (streaming_lstm.py: 75% of
+# actions match the full model at 10)
+STREAMING = os.environ.get("STREAMING_INFERENCE", "0") == "1"
+STREAMING_RESYNC_EVERY = int(os.environ.get("STREAMING_RESYNC_EVERY", "1"))
 
 # ================================
-# DOWNLOAD MODEL FROM HF
+# INFERENCE ENGINE CONFIG
 # ================================
-model_path = hf_hub_download(
-    repo_id="Hariprasath5128/self_healing",
-    filename="best_lstm_model.pth"
-)
+# lstm (best_lstm_model.pth) or mlp (policy_mlp.pth, distilled from it by
+# model_train.py --model mlp; local only, eager / int8, no streaming)
+MODEL = os.environ.get("PREDICTOR_MODEL", "lstm")
+# eager / torchscript / onnx / int8 (exported by model/export_model.py)
+ENGINE = os.environ.get("PREDICTOR_ENGINE", "eager")
+THREADS = int(os.environ.get("PREDICTOR_THREADS", "0"))
 
-scaler_path = hf_hub_download(
-    repo_id="Hariprasath5128/self_healing",
-    filename="scaler.pkl"
-)
+# ================================
+# LOAD FORECAST CONFIG
+# ================================
+# served whenever load_forecaster.pth is found locally (model_train.py --task forecast)
+FORECAST = os.environ.get("PREDICTOR_FORECAST", "1") == "1"
+# desired_replicas plans for the peak of the next FORECAST_LEAD ticks
+FORECAST_LEAD = int(os.environ.get("FORECAST_LEAD", "2"))
 
-encoder_path = hf_hub_download(
-    repo_id="Hariprasath5128/self_healing",
-    filename="label_encoders.pkl"
-)
+SEQ_LEN = 10
+N_FEATURES = 9
 
-print("✅ Model downloaded")
+# feature columns desired_replicas reads (cpu_percent, request_rate, active_pods)
+CPU, RPS, PODS = 0, 4, 5
+
+device = torch.device("cpu")
 
 # ================================
-# LOAD MODEL
+# LAZY LOAD: SERVE LIVENESS AT ONCE, READINESS AFTER WARM-UP
 # ================================
-device = torch.device("cpu")
+ready = False
+load_error = None
+
+model = None
+engine = None
+forecaster = None
+streamer = None
+history = None
+prep = None
+
+def load_artifacts():
+    global model, engine, forecaster, streamer, history, prep
+
+    print("\n⬇ Resolving model artifacts...\n")
+    set_threads(THREADS)
+
+    if MODEL not in ACTION_MODELS:
+        raise ValueError(f"unknown model '{MODEL}', expected one of {sorted(ACTION_MODELS)}")
+    model_class, model_file = ACTION_MODELS[MODEL]
+    if MODEL != "lstm" and ENGINE not in ("eager", "int8"):
+        # the exported engine files are all of the LSTM
+        raise ValueError(f"model '{MODEL}' runs on the eager or int8 engine, not '{ENGINE}'")
+
+    model_path = resolve(model_file, remote=MODEL == "lstm")
+
+    model = model_class()
+    model.load_state_dict(torch.load(model_path,map_location=device))
+    model.eval()
 
-class HealthcareLSTM(torch.nn.Module):
-    def __init__(self,input_size=9,hidden_size=64,num_layers=2,num_classes=3):
-        super().__init__()
-        self.lstm = torch.nn.LSTM(input_size,hidden_size,num_layers,
-                                  batch_first=True,bidirectional=True)
-        self.fc1 = torch.nn.Linear(hidden_size*2,32)
-        self.relu = torch.nn.ReLU()
-        self.fc2 = torch.nn.Linear(32,num_classes)
+    engine_path = model_path
+    if MODEL != "lstm" and ENGINE == "int8":
+        engine_path = None           # quantized in-process below
+    elif ENGINE != "eager":
+        engine_path = resolve(ENGINE_FILES[ENGINE], remote=False, required=ENGINE != "int8")
 
-    def forward(self,x):
-        out,_ = self.lstm(x)
-        last = out[:,-1,:]
-        out = self.relu(self.fc1(last))
-        out = self.fc2(out)
-        return out
+    engine = load_engine(ENGINE, model, engine_path)
+    print(f"⚙ Model: {MODEL} | engine: {ENGINE} | threads: {torch.get_num_threads()}")
 
-model = HealthcareLSTM()
-model.load_state_dict(torch.load(model_path,map_location=device))
-model.eval()
+    prep_path = resolve(PREPROCESS_FILE, remote=False, required=False)
+    if prep_path:
+        prep = load_preprocess(prep_path)
+    else:
+        prep = load_pickles(resolve("scaler.pkl"), resolve("label_encoders.pkl"))
 
-scaler = pickle.load(open(scaler_path,"rb"))
-encoders = pickle.load(open(encoder_path,"rb"))
+    forecast_path = resolve(FORECASTER_FILE, remote=False, required=False) if FORECAST else None
+    if forecast_path:
+        forecaster = LoadForecaster()
+        forecaster.load_state_dict(torch.load(forecast_path, map_location=device))
+        forecaster.eval()
+        print("🔮 Load forecast: on")
 
-print("🚀 MODEL READY\n")
+    streamer = None
+    if STREAMING and MODEL == "lstm":
+        streamer = StreamingLSTM(model, resync_every=STREAMING_RESYNC_EVERY)
+    elif STREAMING:
+        print(f"⚠ Streaming inference needs the LSTM, off for '{MODEL}'")
+
+    # real per-service history for callers that identify themselves
+    history = SequenceStore(
+        SEQ_LEN, N_FEATURES,
+        on_evict=streamer.drop if streamer is not None else None
+    )
+
+def warm_up():
+    # first calls allocate kernels/buffers; pay that before taking traffic
+    for n in (1, MAX_BATCH_SIZE):
+        score(np.zeros((n, SEQ_LEN, N_FEATURES)))
+
+async def start_up():
+    global ready, load_error
+    try:
+        await asyncio.to_thread(load_artifacts)
+        await asyncio.to_thread(warm_up)
+        ready = True
+        print("🚀 MODEL READY\n")
+    except Exception as e:
+        load_error = repr(e)
+        print("❌ Model load failed:", load_error)
+
+@asynccontextmanager
+async def lifespan(app):
+    await batcher.start()
+    loader = asyncio.create_task(start_up())
+    yield
+    loader.cancel()
+    await batcher.stop()
+
+app = FastAPI(lifespan=lifespan)
 
 # ====================================
-# RECEIVE LIVE FEATURES FROM EXTRACTOR
+# REQUEST METRICS (scraped from /metrics by the autoscaler)
 # ====================================
-@app.post("/predict")
-def predict(data: dict):
+request_metrics = RequestMetrics()
+
+# probes and scrapes are not traffic
+UNTRACKED = {"/metrics", "/healthz", "/ready"}
+
+@app.middleware("http")
+async def track_requests(request: Request, call_next):
+    path = request.url.path
+    if path in UNTRACKED:
+        return await call_next(request)
+
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # unknown paths share one label so scanners can't blow up cardinality
+        request_metrics.observe(
+            request.method, path if status != 404 else "unmatched",
+            status, time.perf_counter() - start
+        )
+
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(request_metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# ====================================
+# BUILD MODEL INPUT
+# ====================================
+def invalid(detail):
+    return HTTPException(status_code=422, detail=detail)
+
+def stream_key(item):
+    if "deployment" not in item and "service" not in item:
+        return None
+    key = (item.get("deployment"), item.get("service"))
+    if not all(part is None or isinstance(part, str) for part in key):
+        raise invalid("'deployment' and 'service' must be strings")
+    return key
+
+def as_rows(value, name):
+    try:
+        return np.asarray(value, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise invalid(f"'{name}' must be numbers")
 
-    feature_vector = data["features"]
+def check_item(item):
+    # every shape / type check happens here, before anything is stored:
+    # a bad item is a 422 and leaves the per-service history untouched
+    #   sequence → (None, last SEQ_LEN rows)
+    #   keyed vector → (key, vector), windowed by to_job
+    #   bare vector → (None, repeated window)
+    if not isinstance(item, dict):
+        raise invalid("item must be an object")
 
-    # create sequence
-    sequence = [feature_vector]*10
+    if "sequence" in item:
+        seq = as_rows(item["sequence"], "sequence")
+        if seq.ndim != 2 or seq.shape[1] != N_FEATURES or len(seq) == 0:
+            raise invalid(f"'sequence' must be a non-empty list of {N_FEATURES}-feature rows, got shape {list(seq.shape)}")
+        seq = seq[-SEQ_LEN:]
+        if len(seq) < SEQ_LEN:
+            pad = np.repeat(seq[:1], SEQ_LEN - len(seq), axis=0)
+            seq = np.concatenate([pad, seq])
+        return None, seq
 
-    seq = np.array(sequence)
-    seq = scaler.transform(seq.reshape(-1,9)).reshape(1,10,9)
+    if "features" in item:
+        vec = as_rows(item["features"], "features")
+        if vec.shape != (N_FEATURES,):
+            raise invalid(f"'features' must be {N_FEATURES} numbers, got shape {list(vec.shape)}")
 
-    tensor = torch.FloatTensor(seq)
+        key = stream_key(item)
+        if key is None:
+            return None, np.broadcast_to(vec, (SEQ_LEN, N_FEATURES))
+        return key, vec
+
+    raise invalid("item needs 'features' or 'sequence'")
+
+def to_job(checked):
+    # the key is only kept when the window comes from the per-service history
+    key, x = checked
+    if x.ndim == 1:
+        # copy: the ring keeps moving while this request waits for its batch
+        return key, history.push(key, x).copy()
+    return key, x
+
+# ====================================
+# SCORE N SEQUENCES IN ONE FORWARD PASS
+# ====================================
+def score(sequences, keys=None):
+    # sequences is a fresh float64 array owned by this call; scaled in place
+    n = len(sequences)
+    latest = sequences[:, -1, [CPU, RPS, PODS]]       # raw units, before scaling
+    tensor = torch.from_numpy(prep.transform(sequences))
 
     with torch.no_grad():
-        out = model(tensor)
-        probs = torch.softmax(out, dim=1).numpy()[0]
-        pred = probs.argmax()
+        if streamer is not None and keys is not None and any(k is not None for k in keys):
+            out = torch.empty(n, model.fc2.out_features)
+            stream_idx = [i for i, k in enumerate(keys) if k is not None]
+            plain_idx = [i for i, k in enumerate(keys) if k is None]
+
+            out[stream_idx] = streamer.step([keys[i] for i in stream_idx], tensor[stream_idx])
+            if plain_idx:
+                out[plain_idx] = engine(tensor[plain_idx])
+        else:
+            out = engine(tensor)
+
+        probs = torch.softmax(out, dim=1).numpy()
+
+        # (n, horizon, targets) in raw units
+        ahead = None
+        if forecaster is not None:
+            ahead = prep.unscale(forecaster(tensor).numpy(), list(FORECAST_TARGETS.values()))
+
+    preds = probs.argmax(axis=1)
+    actions = prep.decode(preds)
+    confidences = probs.max(axis=1).tolist()
 
-    action = encoders["action"].inverse_transform([pred])[0]
-    confidence = float(np.max(probs))
+    results = [
+        {"predicted_action": a, "confidence": c}
+        for a, c in zip(actions, confidences)
+    ]
+
+    if ahead is not None:
+        for result, rows in zip(results, ahead.round(2).tolist()):
+            result["forecast"] = {
+                name: [row[k] for row in rows]
+                for k, name in enumerate(FORECAST_TARGETS)
+            }
+
+    # replica count for the caller to clamp to its own base/max/budget
+    for result, (cpu, rps, pods) in zip(results, latest.tolist()):
+        if "forecast" in result:
+            cpu = max(cpu, *result["forecast"]["cpu_percent"][:FORECAST_LEAD])
+        result["desired_replicas"], _ = desired_replicas(
+            int(pods), cpu, result["predicted_action"], result["confidence"]
+        )
+
+    return results
+
+# ====================================
+# CONCURRENT REQUESTS SHARE ONE FORWARD PASS
+# ====================================
+def score_jobs(jobs):
+    keys = [key for key, _ in jobs]
+    return score(np.stack([seq for _, seq in jobs]), keys)
+
+batcher = MicroBatcher(
+    score_jobs,
+    max_batch_size=MAX_BATCH_SIZE,
+    max_wait_ms=MAX_WAIT_MS
+)
+
+# ====================================
+# LIVENESS / READINESS
+# ====================================
+@app.get("/healthz")
+def healthz():
+    if load_error:
+        return JSONResponse({"status": "failed", "error": load_error}, status_code=500)
+    return {"status": "alive"}
+
+@app.get("/ready")
+def readiness():
+    if not ready:
+        return JSONResponse({"status": "loading"}, status_code=503)
+    return {"status": "ready", "model": MODEL, "engine": ENGINE, "forecast": forecaster is not None}
+
+def require_ready():
+    if not ready:
+        raise HTTPException(status_code=503, detail="model loading")
+
+# ====================================
+# RECEIVE LIVE FEATURES FROM EXTRACTOR
+# ====================================
+@app.post("/predict")
+async def predict(data: dict):
+
+    require_ready()
+    key, sequence = to_job(check_item(data))
+    result = await batcher.submit((key, sequence))
 
     # PRINT BOTH INPUT + OUTPUT
     print("\n================ MODEL INPUT =================")
-    print("Feature Vector:", feature_vector)
+    print("Feature Vector:", sequence[-1].tolist())
 
     print("\n🤖 MODEL OUTPUT")
-    print("Action      :", action)
-    print("Confidence  :", confidence)
+    print("Action      :", result["predicted_action"])
+    print("Confidence  :", result["confidence"])
+    print("Replicas    :", result["desired_replicas"])
+    if "forecast" in result:
+        print("Forecast    :", result["forecast"])
     print("==============================================\n")
 
-    return {
-        "predicted_action": action,
-        "confidence": confidence
-    }
+    return result
+
+# ====================================
+# BATCH: MANY SERVICES, ONE CALL
+# ====================================
+@app.post("/predict_batch")
+async def predict_batch(data: dict):
+
+    require_ready()
+    items = data.get("items", [])
+    if not isinstance(items, list):
+        raise invalid("'items' must be a list")
+    if not items:
+        return {"predictions": []}
+
+    # validate the whole batch first, so one bad item doesn't leave the
+    # items before it pushed into their services' history
+    checked = [check_item(item) for item in items]
+    jobs = [to_job(c) for c in checked]
+    # already a batch: one forward pass over all N windows, not N submits
+    predictions = await batcher.run(jobs)
+
+    print(f"📦 BATCH {len(items)} items →", [p["predicted_action"] for p in predictions])
+
+    return {"predictions": predictions}
@@ -0,0 +1,54 @@
+import numpy as np
+
+# ================================
+# SKLEARN-FREE PRE/POST PROCESSING
+# ================================
+# preprocess.npz holds the StandardScaler mean/scale and the LabelEncoder
+# class lists as plain arrays, so serving never imports sklearn.
+# It is written by model_train.py and model/export_model.py.
+PREPROCESS_FILE = "preprocess.npz"
+
+
+class Preprocessor:
+
+    def __init__(self, mean, scale, classes):
+        # kept float64: same arithmetic as StandardScaler, so results are
+        # bit-identical to scaler.transform(x).astype(float32)
+        self.mean = np.ascontiguousarray(mean, dtype=np.float64)
+        self.scale = np.ascontiguousarray(scale, dtype=np.float64)
+        self.classes = classes
+        self.actions = tuple(classes["action"])
+
+    def transform(self, x):
+        """Scale float64 x in place and return it as a new float32 array."""
+        np.subtract(x, self.mean, out=x)
+        out = np.empty(x.shape, dtype=np.float32)
+        np.divide(x, self.scale, out=out, casting="same_kind")
+        return out
+
+    def unscale(self, x, columns):
+        """Back to raw units for values of the feature columns `columns` (last axis)."""
+        return x * self.scale[columns] + self.mean[columns]
+
+    def decode(self, preds):
+        actions = self.actions
+        return [actions[i] for i in preds.tolist()]
+
+
+def load_preprocess(path):
+    with np.load(path, allow_pickle=False) as data:
+        classes = {
+            name: [str(c) for c in data[f"{name}_classes"]]
+            for name in ("service", "service_type", "action")
+        }
+        return Preprocessor(data["mean"], data["scale"], classes)
+
+
+def load_pickles(scaler_path, encoder_path):
+    # fallback for artifact sets that predate preprocess.npz (needs sklearn)
+    import pickle
+
+    scaler = pickle.load(open(scaler_path, "rb"))
+    encoders = pickle.load(open(encoder_path, "rb"))
+    classes = {name: [str(c) for c in enc.classes_] for name, enc in encoders.items()}
+    return Preprocessor(scaler.mean_, scaler.scale_, classes)
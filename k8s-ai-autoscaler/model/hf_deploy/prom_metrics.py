@@ -0,0 +1,70 @@
+import threading
+
+# ==========================================
+# PROMETHEUS TEXT EXPORTER (no client library)
+# ==========================================
+# Counts requests by method/path/status and records latency in one
+# cumulative histogram, rendered in the Prometheus text format on /metrics.
+# metrics_scraper.py turns deltas of these into RPS, p50/p99 and error rate.
+
+REQUESTS_METRIC = "http_requests_total"
+DURATION_METRIC = "http_request_duration_seconds"
+
+# seconds, same as the Prometheus client defaults
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _fmt(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class RequestMetrics:
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self.requests = {}                   # (method, path, status) → count
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.duration_sum = 0.0
+        self.duration_count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, method, path, status, seconds):
+        key = (method, path, str(status))
+
+        # first bucket whose upper bound holds the value; last slot is +Inf
+        i = 0
+        while i < len(self.buckets) and seconds > self.buckets[i]:
+            i += 1
+
+        with self.lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.bucket_counts[i] += 1
+            self.duration_sum += seconds
+            self.duration_count += 1
+
+    def render(self):
+        with self.lock:
+            requests = dict(self.requests)
+            counts = list(self.bucket_counts)
+            total, count = self.duration_sum, self.duration_count
+
+        lines = [
+            f"# HELP {REQUESTS_METRIC} Requests served, by method, path and status.",
+            f"# TYPE {REQUESTS_METRIC} counter",
+        ]
+        for (method, path, status), n in sorted(requests.items()):
+            lines.append(f'{REQUESTS_METRIC}{{method="{method}",path="{path}",status="{status}"}} {n}')
+
+        lines += [
+            f"# HELP {DURATION_METRIC} Request latency.",
+            f"# TYPE {DURATION_METRIC} histogram",
+        ]
+        cumulative = 0
+        for le, n in zip(self.buckets + ("+Inf",), counts):
+            cumulative += n
+            le = le if le == "+Inf" else _fmt(le)
+            lines.append(f'{DURATION_METRIC}_bucket{{le="{le}"}} {cumulative}')
+        lines.append(f"{DURATION_METRIC}_sum {total}")
+        lines.append(f"{DURATION_METRIC}_count {count}")
+
+        return "\n".join(lines) + "\n"
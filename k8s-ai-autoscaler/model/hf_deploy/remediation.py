@@ -0,0 +1,65 @@
+import asyncio
+
+# ==========================================
+# DELAYED REMEDIATION ACTIONS
+# ==========================================
+# Drain → delete and preempt → scale need a pause between their steps.
+# Instead of sleeping inside the control loop, the later step runs as a
+# timed task and the loop keeps ticking. Every action has a key, e.g.
+# ("drain", deploy) or ("scale", deploy); a key that is still in flight is
+# not scheduled twice; to change it, cancel() and then schedule() again.
+
+
+class ScheduledAction:
+
+    def __init__(self, value, task):
+        self.value = value
+        self.task = task
+
+
+class RemediationScheduler:
+
+    def __init__(self):
+        self.actions = {}
+
+    def in_flight(self, key):
+        return key in self.actions
+
+    def value(self, key, default=None):
+        action = self.actions.get(key)
+        return action.value if action else default
+
+    def schedule(self, key, delay, fn, value=None):
+        """Run `await fn()` after `delay` seconds. False if `key` is already pending."""
+        if key in self.actions:
+            return False
+
+        task = asyncio.create_task(self._run(key, delay, fn))
+        self.actions[key] = ScheduledAction(value, task)
+        return True
+
+    def cancel(self, key):
+        action = self.actions.pop(key, None)
+        if action:
+            action.task.cancel()
+
+    async def _run(self, key, delay, fn):
+        try:
+            await asyncio.sleep(delay)
+            await fn()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Remediation error {key}:", e)
+        finally:
+            # a cancelled action must not remove its successor
+            action = self.actions.get(key)
+            if action and action.task is asyncio.current_task():
+                del self.actions[key]
+
+    async def stop(self):
+        tasks = [action.task for action in self.actions.values()]
+        self.actions.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
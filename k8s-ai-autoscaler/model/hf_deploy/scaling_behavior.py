@@ -0,0 +1,151 @@
+import math
+import time
+from collections import deque
+
+# ==========================================
+# PER-DEPLOYMENT SCALING BEHAVIOR (HPA-style)
+# ==========================================
+# One small state machine per deployment, between the desired size
+# (scaling_policy) and the pod budget (pod_budget). It replaces the single
+# cooldown timestamp, so a critical scale-up never holds back non-critical
+# recovery:
+#
+#   stabilization : go down only to the highest recommendation of the last
+#                   scale_down window (one quiet tick is not enough), and up
+#                   only to the lowest of the last scale_up window
+#   rate limits   : per direction, at most `value` pods or `value`% of the
+#                   size at the start of each `period` seconds; "max" picks
+#                   the policy that allows the biggest change (HPA selectPolicy)
+#
+# States: stable → scaling_up / scaling_down, or holding while a change is
+# held back by a window or a rate limit. The clock is injectable.
+
+STABLE, SCALING_UP, SCALING_DOWN, HOLDING = "stable", "scaling_up", "scaling_down", "holding"
+
+
+class Policy:
+
+    def __init__(self, type, value, period):
+        if type not in ("pods", "percent"):
+            raise ValueError(f"policy type must be pods or percent, not {type!r}")
+        self.type = type
+        self.value = value
+        self.period = period
+
+    def limit(self, start):
+        """Pods this policy lets the size change by from `start` in one period."""
+        if self.type == "pods":
+            return self.value
+        return math.ceil(start * self.value / 100)
+
+    def __repr__(self):
+        unit = "" if self.type == "pods" else "%"
+        return f"{self.value}{unit}/{self.period}s"
+
+
+class Rules:
+
+    def __init__(self, window=0, policies=(), select="max"):
+        if select not in ("max", "min", "disabled"):
+            raise ValueError(f"select must be max, min or disabled, not {select!r}")
+        self.window = window
+        self.policies = list(policies)
+        self.select = select
+
+    @classmethod
+    def from_dict(cls, raw, default):
+        """{"window": s, "policies": [{"type", "value", "period"}], "select"} over a default."""
+        if not raw:
+            return default
+        policies = raw.get("policies")
+        return cls(
+            window=raw.get("window", default.window),
+            policies=[Policy(**p) for p in policies] if policies is not None else default.policies,
+            select=raw.get("select", default.select),
+        )
+
+    @property
+    def horizon(self):
+        return max([self.window] + [p.period for p in self.policies])
+
+    def __repr__(self):
+        return f"window {self.window}s, {self.select} of {self.policies}"
+
+
+def default_up(period=15):
+    # HPA default: double or +4 pods per period, whichever is more
+    return Rules(0, [Policy("pods", 4, period), Policy("percent", 100, period)], "max")
+
+
+def default_down(period=15):
+    # a minute of low recommendations, then one pod per period
+    return Rules(60, [Policy("pods", 1, period)], "max")
+
+
+class ScalingBehavior:
+
+    def __init__(self, up=None, down=None, clock=time.monotonic):
+        self.up = up or default_up()
+        self.down = down or default_down()
+        self.clock = clock
+        self.horizon = max(self.up.horizon, self.down.horizon)     # history kept, s
+        self.state = STABLE
+        self.recommendations = deque()     # (t, desired)
+        self.changes = deque()             # (t, replicas before, replicas after)
+
+    def _forget(self, now):
+        cutoff = now - self.horizon
+        while self.recommendations and self.recommendations[0][0] <= cutoff:
+            self.recommendations.popleft()
+        while self.changes and self.changes[0][0] <= cutoff:
+            self.changes.popleft()
+
+    def _rate_limit(self, rules, current, target, now):
+        if rules.select == "disabled":
+            return current
+        if not rules.policies:
+            return target
+
+        up = target > current
+        limits = []
+        for p in rules.policies:
+            # this direction's moves inside the policy period
+            moved = sum(
+                after - before for t, before, after in self.changes
+                if t > now - p.period and (after > before) == up
+            )
+            start = current - moved
+            limits.append(start + p.limit(start) if up else start - p.limit(start))
+
+        pick = max if (rules.select == "max") == up else min
+        bound = pick(limits)
+        return min(target, bound) if up else max(target, bound)
+
+    def recommend(self, current, desired):
+        """Replica count to ask the budget for this tick."""
+        now = self.clock()
+        self.recommendations.append((now, desired))
+        self._forget(now)
+
+        if desired > current:
+            rules = self.up
+            target = min(r for t, r in self.recommendations if t > now - rules.window or t == now)
+            target = self._rate_limit(rules, current, max(target, current), now)
+            self.state = SCALING_UP if target > current else HOLDING
+
+        elif desired < current:
+            rules = self.down
+            target = max(r for t, r in self.recommendations if t > now - rules.window or t == now)
+            target = self._rate_limit(rules, current, min(target, current), now)
+            self.state = SCALING_DOWN if target < current else HOLDING
+
+        else:
+            target = current
+            self.state = STABLE
+
+        return target
+
+    def record(self, before, after):
+        """A size change that was actually applied (including preemptions)."""
+        if after != before:
+            self.changes.append((self.clock(), before, after))
@@ -0,0 +1,60 @@
+import math
+
+# ==========================================
+# DESIRED REPLICAS (instead of fixed ±1 / jump-to-max steps)
+# ==========================================
+# Turns the model's action + confidence, the (forecast) load and per-pod
+# capacity into one replica count:
+#
+#   by CPU : ceil(replicas × expected CPU / target CPU)     (the HPA rule)
+#   by RPS : ceil(expected rps / rps one pod can serve)     (when known)
+#   need   = the larger of the two
+#
+# The size only changes once the load leaves a hysteresis band around the
+# current size: 10% over to go up, 20% under to go down (narrower the more
+# confident a model scale_down is). A scale_up goes through the same band:
+# it plans for a lower per-pod CPU the more confident it is, so the extra
+# pods it buys are sized by its confidence and the measured load. A model
+# vote alone can't walk replicas up to the ceiling while the pods sit idle.
+# Stabilization windows and rate limits are scaling_behavior's job, and
+# the caller clamps to base/max and its pod budget.
+
+TARGET_CPU = 50          # % CPU per pod to plan for
+UP_TOLERANCE = 0.1
+DOWN_TOLERANCE = 0.2
+UP_HEADROOM = 0.25       # scale_up at confidence 1.0 plans for 75% of TARGET_CPU
+
+
+def load_replicas(replicas, cpu, target_cpu=TARGET_CPU, rps=None, pod_rps=None):
+    """Pods (fractional) needed to serve the load at target_cpu (and pod_rps) per pod."""
+    need = replicas * cpu / target_cpu if replicas > 0 and cpu else 0.0
+    if pod_rps and rps:
+        need = max(need, rps / pod_rps)
+    return need
+
+
+def desired_replicas(replicas, cpu, action="stable", confidence=0.0,
+                     target_cpu=TARGET_CPU, rps=None, pod_rps=None,
+                     floor=1, ceiling=None):
+    """→ (desired, reason). cpu / rps should already include the forecast."""
+    if action == "scale_up":
+        target_cpu = target_cpu * (1 - UP_HEADROOM * confidence)
+
+    need = load_replicas(replicas, cpu, target_cpu, rps, pod_rps)
+    # round first so 3 × 60 / 60 doesn't become 3.0000000001 → 4
+    pods = math.ceil(round(need, 6))
+
+    down_tolerance = DOWN_TOLERANCE
+    if action == "scale_down":
+        down_tolerance *= 1 - confidence
+
+    if replicas > 0 and replicas * (1 - down_tolerance) <= need <= replicas * (1 + UP_TOLERANCE):
+        desired, reason = replicas, "load within band"
+
+    else:
+        desired, reason = pods, f"{action}, load needs {pods}"
+
+    desired = max(desired, floor)
+    if ceiling is not None:
+        desired = min(desired, ceiling)
+    return desired, reason
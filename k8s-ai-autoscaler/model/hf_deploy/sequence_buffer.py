@@ -0,0 +1,75 @@
+from collections import OrderedDict
+import numpy as np
+
+# ==========================================
+# ROLLING SEQUENCE BUFFER
+# ==========================================
+# Each sample is written twice, at pos and pos+seq_len, into a
+# preallocated (2*seq_len, n_features) array. The latest window is then
+# always the contiguous slice data[pos:pos+seq_len], so a push is O(1)
+# and reading the window is a view, never a copy of the history.
+
+
+class SequenceBuffer:
+
+    def __init__(self, seq_len=10, n_features=9, dtype=np.float64):
+        self.seq_len = seq_len
+        self.data = np.empty((2 * seq_len, n_features), dtype=dtype)
+        self.pos = 0
+        self.count = 0
+
+    def push(self, sample):
+        if self.count == 0:
+            # until real history exists, the window repeats the first sample
+            self.data[:] = sample
+        else:
+            self.data[self.pos] = sample
+            self.data[self.pos + self.seq_len] = sample
+
+        self.pos = (self.pos + 1) % self.seq_len
+        self.count += 1
+
+    def window(self):
+        # oldest → newest
+        return self.data[self.pos:self.pos + self.seq_len]
+
+
+# ==========================================
+# ONE BUFFER PER (DEPLOYMENT, SERVICE)
+# ==========================================
+class SequenceStore:
+
+    def __init__(self, seq_len=10, n_features=9, max_keys=10000, on_evict=None):
+        self.seq_len = seq_len
+        self.n_features = n_features
+        self.max_keys = max_keys
+        self.on_evict = on_evict
+        self.buffers = OrderedDict()
+
+    def push(self, key, sample):
+        buf = self.buffers.get(key)
+
+        if buf is None:
+            if len(self.buffers) >= self.max_keys:
+                evicted, _ = self.buffers.popitem(last=False)
+                if self.on_evict:
+                    self.on_evict(evicted)
+            buf = SequenceBuffer(self.seq_len, self.n_features)
+            self.buffers[key] = buf
+        else:
+            self.buffers.move_to_end(key)
+
+        buf.push(sample)
+        return buf.window()
+
+    def get(self, key):
+        buf = self.buffers.get(key)
+        return None if buf is None else buf.window()
+
+    def drop(self, key):
+        self.buffers.pop(key, None)
+        if self.on_evict:
+            self.on_evict(key)
+
+    def __len__(self):
+        return len(self.buffers)
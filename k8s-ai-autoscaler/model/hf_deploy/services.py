@@ -0,0 +1,27 @@
+# ==========================================
+# SERVICE PRIORITY (Actions.txt)
+# ==========================================
+# The one criticality table. autoscaler_config.py reads it for each
+# deployment's default priority and model/generate_dataset.py labels its
+# training data with it, so the model learns the rules the autoscaler runs.
+CRITICAL_SERVICES = {
+    "patient_monitoring",   # Patient Vitals
+    "patient_report",
+    "emergency",            # Emergency & operation theatre systems
+    "lab_report",
+    "pharmacy",             # Pharmacy & medication system
+}
+
+NON_CRITICAL_SERVICES = {
+    "appointments",
+    "website",
+    "hr_payroll",
+    "analytics",            # Analytics & reporting
+    "cctv",                 # CCTV storage & monitoring
+}
+
+PRIORITIES = ("critical", "non_critical")
+
+
+def priority_of(service):
+    return "critical" if service in CRITICAL_SERVICES else "non_critical"
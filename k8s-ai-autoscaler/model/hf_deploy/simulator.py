@@ -0,0 +1,605 @@
+import argparse
+import csv
+import heapq
+import math
+import multiprocessing as mp
+import os
+import sys
+import time
+import numpy as np
+from autoscaler_config import load_config
+from pod_budget import Capacity, Demand, allocate
+from metrics_scraper import Traffic
+from scaling_policy import desired_replicas
+from sequence_buffer import SequenceBuffer
+from anomaly_detector import AnomalyDetector, SIGNALS, WINDOW
+from autoscale_policy import DeploymentState, build_features, apply_prediction, attach_anomalies, plan
+
+# ==========================================
+# OFFLINE TRACE-REPLAY SIMULATOR + BENCHMARK
+# ==========================================
+# Replays a synthetic or recorded RPS trace through a discrete-event model
+# of the cluster and runs the real decision code on every control tick:
+#
+#   sender       : autoscale_policy.plan (what live_metrics_sender runs)
+#   orchestrator : ai_orchestrator.decide on the predictor's desired_replicas,
+#                  with each deployment's base / max / target_cpu and the
+#                  same pod budget, so the two are comparable
+#   static       : every deployment stays at base (baseline)
+#
+# Cluster model, per deployment:
+#   pods become ready STARTUP seconds after a scale-up (PREEMPT_GRACE more
+#   after a preemption); scale-downs remove starting pods first, at once
+#   u   = offered rps / (ready pods × pod_rps)
+#   CPU = IDLE_CPU + (100 - IDLE_CPU) × min(u, 1) on every ready pod
+#   p50 = SERVICE_MS / (1 - u), p99 = 4.6 × p50 (M/M/1), past u = 1 the
+#         excess requests fail (5xx)
+#   SLO : violated while p99 > --slo-p99-ms, so always once u ≥ 1
+#
+# Events (control ticks, trace steps, pods becoming ready) come off one
+# heap, and pod-hours / SLO time are integrated exactly between them.
+#
+# The sender's anomaly detector reads the last WINDOW ticks of its signals
+# from a DetectorWindow (a zero-copy view) rather than a TimeSeriesStore,
+# whose rollups and copies cost more than the detection itself.
+#
+# Traces longer than --segment-hours are cut into segments, each warmed up
+# for --warmup-hours before it is counted, and all segments of a policy run
+# in lockstep (run_batch): one detector call and one model batch per tick
+# for all of them. --jobs spreads the segments over processes.
+#
+#   python3 simulator.py --hours 1000 --jobs 8
+#   python3 simulator.py --trace recorded.csv --policy sender --model lstm
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ORCHESTRATOR_DIR = os.path.join(os.path.dirname(os.path.dirname(HERE)), "orchestrator")
+
+POLICIES = ("sender", "orchestrator", "static")
+
+IDLE_CPU = 5.0
+SERVICE_MS = 20.0
+STARTUP = 30.0           # s from scale patch to a ready pod
+PREEMPT_GRACE = 2.0      # same delay live_metrics_sender puts before post-preemption ups
+
+TICK, STEP, READY = 0, 1, 2     # event kinds; ties resolve in this order
+
+
+def quiet(*args, **kwargs):
+    pass
+
+
+# ==========================================
+# TRACES: {deployment: (times, rps)}
+# ==========================================
+def synthetic_trace(deployments, hours, pod_rps, step=60.0, seed=0):
+    """Diurnal wave + noise + random bursts, sized for about base..max pods."""
+    rng = np.random.default_rng(seed)
+    times = np.arange(0.0, hours * 3600.0, step)
+    trace = {}
+
+    for d in deployments:
+        low = d.base * pod_rps * 0.4
+        high = max(d.max * pod_rps * 0.6, low)
+        phase = rng.uniform(0, 2 * np.pi)
+        wave = 0.5 - 0.5 * np.cos(2 * np.pi * times / 86400.0 + phase)
+        rps = low + (high - low) * wave
+        rps *= rng.lognormal(0.0, 0.1, len(times))
+
+        # ~3 bursts a day: ×1.5–3 for 5–30 minutes
+        n_bursts = rng.poisson(3 * hours / 24.0)
+        for start in rng.uniform(0, times[-1] if len(times) else 0, n_bursts):
+            length = rng.uniform(300, 1800)
+            rps[(times >= start) & (times < start + length)] *= rng.uniform(1.5, 3.0)
+
+        trace[d.name] = (times, rps)
+    return trace
+
+
+def load_trace(path, deployments, pod_rps):
+    """CSV with time, deployment and rps columns, or cpu + replicas instead of rps."""
+    rows = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            if row.get("rps") not in (None, ""):
+                rps = float(row["rps"])
+            else:
+                # recorded CPU → offered load at this simulator's pod capacity
+                rps = float(row["cpu"]) / 100.0 * float(row["replicas"]) * pod_rps
+            rows.setdefault(row["deployment"], []).append((float(row["time"]), rps))
+
+    trace = {}
+    for d in deployments:
+        points = sorted(rows.get(d.name, [(0.0, 0.0)]))
+        t0 = min(t for pts in rows.values() for t, _ in pts) if rows else 0.0
+        times = np.array([t - t0 for t, _ in points])
+        trace[d.name] = (times, np.array([r for _, r in points]))
+    return trace
+
+
+# ==========================================
+# DETECTOR INPUT: LAST n TICKS AS ONE VIEW
+# ==========================================
+class DetectorWindow:
+    """Last n rows, oldest first, as a contiguous view: every row is
+    written twice in a 2n buffer, so the window never has to be copied."""
+
+    def __init__(self, n, shape):
+        self.n = n
+        self.buf = np.full((2 * n,) + tuple(shape), np.nan)
+        self.head = 0
+        self.count = 0
+
+    def push(self, row):
+        self.buf[self.head] = row
+        self.buf[self.head + self.n] = row
+        self.head = (self.head + 1) % self.n
+        self.count = min(self.count + 1, self.n)
+
+    def view(self):
+        end = self.head + self.n
+        return self.buf[end - self.count:end]
+
+
+# ==========================================
+# MODELS (what the predictor would answer)
+# ==========================================
+class NoModel:
+    """Always 'stable': the policy runs on load, forecast-free."""
+
+    def predict(self, states):
+        return [{"predicted_action": "stable", "confidence": 0.0} for _ in states]
+
+
+class LocalModel:
+    """The predictor's eager model + preprocessing, in process, with per-deployment history."""
+
+    def __init__(self):
+        import torch
+        from artifacts import resolve
+        from inference_engine import HealthcareLSTM, ENGINE_FILES
+        from inference_engine import LoadForecaster, FORECASTER_FILE, FORECAST_TARGETS
+        from preprocess import PREPROCESS_FILE, load_preprocess
+
+        self.torch = torch
+        self.model = HealthcareLSTM()
+        self.model.load_state_dict(torch.load(resolve(ENGINE_FILES["eager"]), map_location="cpu"))
+        self.model.eval()
+        self.prep = load_preprocess(resolve(PREPROCESS_FILE))
+
+        self.forecaster = None
+        self.targets = FORECAST_TARGETS
+        path = resolve(FORECASTER_FILE, remote=False, required=False)
+        if path:
+            self.forecaster = LoadForecaster()
+            self.forecaster.load_state_dict(torch.load(path, map_location="cpu"))
+            self.forecaster.eval()
+
+        self.history = {}
+
+    def predict(self, states):
+        windows = []
+        for st in states:
+            buf = self.history.get(st.name)
+            if buf is None:
+                buf = self.history[st.name] = SequenceBuffer()
+            buf.push(np.asarray(st.features, dtype=np.float64))
+            windows.append(buf.window())
+
+        x = np.stack(windows)
+        with self.torch.no_grad():
+            tensor = self.torch.from_numpy(self.prep.transform(x))
+            probs = self.torch.softmax(self.model(tensor), dim=1).numpy()
+            ahead = None
+            if self.forecaster is not None:
+                ahead = self.prep.unscale(self.forecaster(tensor).numpy(), list(self.targets.values()))
+
+        actions = self.prep.decode(probs.argmax(axis=1))
+        preds = [{"predicted_action": a, "confidence": float(c)} for a, c in zip(actions, probs.max(axis=1))]
+        if ahead is not None:
+            for pred, rows in zip(preds, ahead.tolist()):
+                pred["forecast"] = {name: [row[k] for row in rows] for k, name in enumerate(self.targets)}
+        return preds
+
+
+# ==========================================
+# ONE SIMULATED DEPLOYMENT
+# ==========================================
+class SimDeployment:
+
+    def __init__(self, cfg, times, rps, pod_rps):
+        self.cfg = cfg
+        self.name = cfg.name
+        self.times = times
+        self.rps_trace = rps
+        self.pod_rps = cfg.pod_rps or pod_rps
+        self.step = 0
+        self.rps = float(rps[0]) if len(rps) else 0.0
+
+        self.spec = cfg.base          # what the autoscaler asked for
+        self.ready = cfg.base
+        self.starting = []            # ready-at times, ascending
+
+        self.slo_seconds = 0.0
+        self.pod_seconds = 0.0
+        self.actions = 0
+
+    # ---------- load model ----------
+    def utilization(self):
+        if self.ready == 0:
+            return math.inf if self.rps > 0 else 0.0
+        return self.rps / (self.ready * self.pod_rps)
+
+    def violating(self, slo_p99_ms):
+        u = self.utilization()
+        if u >= 1.0:
+            return self.rps > 0
+        return 4.6 * SERVICE_MS / (1 - u) > slo_p99_ms
+
+    def observe(self, st, tick):
+        u = self.utilization()
+        served = min(u, 1.0)
+        st.cpu = IDLE_CPU + (100 - IDLE_CPU) * served if self.ready else 0
+        st.mem = 20 + 30 * served if self.ready else 0
+        st.replicas = self.spec
+        st.target = self.spec
+
+        if self.ready == 0 or self.rps == 0:
+            st.traffic = Traffic(rps=self.rps, errors=self.rps * tick, error_rate=1.0 if self.rps else 0.0)
+            return
+
+        p50 = SERVICE_MS / max(1 - u, 0.01)
+        error_rate = max(0.0, 1 - 1 / u) if u > 1 else 0.0
+        st.traffic = Traffic(
+            rps=self.rps,
+            errors=self.rps * error_rate * tick,
+            error_rate=error_rate,
+            p50_ms=p50,
+            p99_ms=4.6 * p50,
+        )
+
+    # ---------- actions ----------
+    def scale(self, replicas, now, delay):
+        if replicas == self.spec:
+            return None
+        self.actions += 1
+        ready_at = None
+        if replicas > self.spec:
+            ready_at = now + delay
+            self.starting.extend([ready_at] * (replicas - self.spec))
+        else:
+            drop = self.spec - replicas
+            # starting pods go first, newest first
+            keep = max(len(self.starting) - drop, 0)
+            drop -= len(self.starting) - keep
+            del self.starting[keep:]
+            self.ready -= drop
+        self.spec = replicas
+        return ready_at
+
+    def promote(self, now):
+        while self.starting and self.starting[0] <= now:
+            self.starting.pop(0)
+            self.ready += 1
+
+
+# ==========================================
+# ONE RUN: POLICY × TRACE (or one segment of it)
+# ==========================================
+class Simulation:
+
+    def __init__(self, config, trace, policy, model, pod_rps=100.0, startup=STARTUP,
+                 slo_p99_ms=500.0, anomalies=True, tick=None, end=None, count_from=0.0):
+        self.config = config
+        self.policy = policy
+        self.model = model
+        self.startup = startup
+        self.slo_p99_ms = slo_p99_ms
+        self.now = 0.0
+        self.tick = tick or config.tick_seconds
+        self.capacity = Capacity(config.max_total_pods, config.cpu_capacity_m, config.memory_capacity_mi)
+
+        self.sims = [SimDeployment(d, *trace[d.name], pod_rps) for d in config.deployments]
+        self.states = [DeploymentState(d, clock=lambda: self.now) for d in config.deployments]
+        if end is None:
+            end = max(float(t[-1]) if len(t) else 0.0 for t, _ in trace.values()) + 60.0
+        self.end = end
+        # warm-up: simulated and decided on, but not reported
+        self.count_from = count_from
+
+        self.names = [d.name for d in config.deployments]
+        self.window = None
+        if anomalies and policy == "sender":
+            self.window = DetectorWindow(WINDOW, (len(self.names), len(SIGNALS)))
+
+        self.decide_seconds = []
+        self.choose = getattr(self, f"_choose_{policy}")
+        if policy == "orchestrator":
+            sys.path.insert(0, ORCHESTRATOR_DIR)
+            import ai_orchestrator
+            self.orchestrator = ai_orchestrator
+
+        self.events = [(0.0, TICK, -1)]
+        for i, sim in enumerate(self.sims):
+            if len(sim.times) > 1:
+                self.events.append((float(sim.times[1]), STEP, i))
+        heapq.heapify(self.events)
+        self.last = 0.0
+
+    # ---------- event loop ----------
+    def next_tick(self):
+        """Process events up to the next control tick → its time, or None past the end."""
+        events = self.events
+        while events:
+            t, kind, i = heapq.heappop(events)
+            if t > self.end:
+                break
+
+            # state was constant since `last`; only time after the warm-up counts
+            dt = t - max(self.last, self.count_from)
+            if dt > 0:
+                for sim in self.sims:
+                    sim.pod_seconds += dt * (sim.ready + len(sim.starting))
+                    if sim.violating(self.slo_p99_ms):
+                        sim.slo_seconds += dt
+            self.last = self.now = t
+
+            if kind == STEP:
+                sim = self.sims[i]
+                sim.step += 1
+                sim.rps = float(sim.rps_trace[sim.step])
+                if sim.step + 1 < len(sim.times):
+                    heapq.heappush(events, (float(sim.times[sim.step + 1]), STEP, i))
+
+            elif kind == READY:
+                for sim in self.sims:
+                    sim.promote(t)
+
+            else:
+                heapq.heappush(events, (t + self.tick, TICK, -1))
+                return t
+
+        self.events = []
+        return None
+
+    def apply(self, decisions):
+        t = self.now
+        for sim, (replicas, preempted) in zip(self.sims, decisions):
+            delay = self.startup + (PREEMPT_GRACE if preempted else 0.0)
+            ready_at = sim.scale(replicas, t, delay)
+            if ready_at is not None:
+                heapq.heappush(self.events, (ready_at, READY, -1))
+            if t < self.count_from:
+                sim.actions = 0
+
+    # ---------- decisions ----------
+    # observe → (detector, model: run_batch, shared by every run) → choose
+    def observe(self):
+        for sim, st in zip(self.sims, self.states):
+            sim.observe(st, self.tick)
+            build_features(st)
+
+        if self.window is not None:
+            # the detector's SIGNALS, as the sender's store would return them
+            self.window.push([
+                [st.cpu, st.mem, st.traffic.rps,
+                 st.traffic.p50_ms if st.traffic.p50_ms is not None else np.nan,
+                 st.traffic.errors]
+                for st in self.states
+            ])
+
+    def _choose_sender(self):
+        preempted = set()
+        plan(self.states, self.capacity, preempted, log=quiet)
+        return [(st.target, bool(preempted)) for st in self.states]
+
+    def _choose_orchestrator(self):
+        demands = []
+        for st in self.states:
+            cfg = st.cfg
+            # the predictor's desired_replicas, at this deployment's targets
+            desired, _ = desired_replicas(
+                int(st.replicas), st.expected_cpu, st.action, st.confidence,
+                target_cpu=cfg.target_cpu, rps=st.expected_rps, pod_rps=cfg.pod_rps
+            )
+            prediction = {"predicted_action": st.action, "desired_replicas": desired}
+            replicas = self.orchestrator.decide(prediction, floor=cfg.base, ceiling=cfg.max)
+            demands.append(Demand(
+                st.name, cfg.priority_code, cfg.base, cfg.max, replicas, st.replicas,
+                cpu_m=cfg.cpu_request_m, mem_mi=cfg.memory_request_mi
+            ))
+
+        # same pod budget as the sender; a shortfall on a shrinking deployment is a preemption
+        alloc = allocate(demands, self.capacity)
+        preempted = any(alloc[d.name] < min(d.current, d.desired) for d in demands)
+        return [(alloc[d.name], preempted) for d in demands]
+
+    def _choose_static(self):
+        return [(sim.cfg.base, False) for sim in self.sims]
+
+    def run(self):
+        return run_batch([self])[0]
+
+    def report(self):
+        return {
+            "hours": (self.end - self.count_from) / 3600.0,
+            "slo_minutes": {sim.name: sim.slo_seconds / 60.0 for sim in self.sims},
+            "critical_slo_minutes": sum(sim.slo_seconds for sim in self.sims if sim.cfg.critical) / 60.0,
+            "pod_hours": sum(sim.pod_seconds for sim in self.sims) / 3600.0,
+            "actions": sum(sim.actions for sim in self.sims),
+            "decide_us": np.array(self.decide_seconds) * 1e6,
+        }
+
+
+# ==========================================
+# MANY RUNS IN LOCKSTEP
+# ==========================================
+# Independent runs of one policy (segments of a long trace, or other
+# traces) tick at the same times. Per tick, the sender's detector gets one
+# stacked (window × every run's deployments × signals) block and the model
+# one batch of windows, so their fixed per-call cost (most of a tick, on a
+# block this small) is paid once for all runs; plan() still runs per run.
+# Detection is per cell, so stacking doesn't change any run's events.
+
+def run_batch(sims):
+    """Run every simulation to its end → [report], in order."""
+    first = sims[0]
+    detector = AnomalyDetector() if first.window is not None else None
+
+    active = sims
+    while True:
+        active = [sim for sim in active if sim.next_tick() is not None]
+        if not active:
+            break
+
+        start = time.perf_counter()
+        if first.policy != "static":
+            for sim in active:
+                sim.observe()
+
+            if detector is not None:
+                x = np.concatenate([sim.window.view() for sim in active], axis=1)
+                found = [[] for _ in active]
+                for event in detector.detect_array(x, [(k, name) for k, sim in enumerate(active) for name in sim.names]):
+                    k, event.deployment = event.deployment
+                    found[k].append(event)
+                for sim, events in zip(active, found):
+                    attach_anomalies(sim.states, events, log=quiet)
+
+            states = [st for sim in active for st in sim.states]
+            for st, pred in zip(states, first.model.predict(states)):
+                apply_prediction(st, pred)
+
+        decisions = [sim.choose() for sim in active]
+        # each run's share of the tick
+        share = (time.perf_counter() - start) / len(active)
+
+        for sim, decision in zip(active, decisions):
+            if sim.now >= sim.count_from:
+                sim.decide_seconds.append(share)
+            sim.apply(decision)
+
+    return [sim.report() for sim in sims]
+
+
+def segments(trace, hours, warmup_hours):
+    """Cut a trace into runs of `hours`, each started `warmup_hours` early so
+    its pods, windows and detector are warm → [(trace, end, count_from)]."""
+    t_end = max(float(t[-1]) if len(t) else 0.0 for t, _ in trace.values()) + 60.0
+    length, warmup = hours * 3600.0, warmup_hours * 3600.0
+    if length <= 0 or t_end <= length:
+        return [(trace, None, 0.0)]
+
+    parts = []
+    for a in np.arange(0.0, t_end, length):
+        b = min(a + length, t_end)
+        s = max(a - warmup, 0.0)
+        part = {}
+        for name, (times, rps) in trace.items():
+            # the point in force at s becomes t = 0
+            i = max(int(np.searchsorted(times, s, side="right")) - 1, 0)
+            j = int(np.searchsorted(times, b, side="left"))
+            t = times[i:j] - s
+            if len(t):
+                t[0] = 0.0
+            part[name] = (t, rps[i:j])
+        # the next segment reports the tick at b
+        end = b - s - 1e-6 if b < t_end else t_end - s
+        parts.append((part, end, a - s))
+    return parts
+
+
+def simulate(config, policy, parts, model_name="none", options=None):
+    """Every segment of one policy, in lockstep → [report] (runs in a worker)."""
+    model = LocalModel() if model_name == "lstm" else NoModel()
+    sims = [
+        Simulation(config, part, policy, model, end=end, count_from=count_from, **(options or {}))
+        for part, end, count_from in parts
+    ]
+    return run_batch(sims)
+
+
+def merge(reports):
+    lat = np.concatenate([r["decide_us"] for r in reports])
+    slo = {}
+    for r in reports:
+        for name, minutes in r["slo_minutes"].items():
+            slo[name] = slo.get(name, 0.0) + minutes
+    return {
+        "hours": sum(r["hours"] for r in reports),
+        "slo_minutes": slo,
+        "critical_slo_minutes": sum(r["critical_slo_minutes"] for r in reports),
+        "pod_hours": sum(r["pod_hours"] for r in reports),
+        "actions": sum(r["actions"] for r in reports),
+        "decide_us_mean": float(lat.mean()) if len(lat) else 0.0,
+        "decide_us_p99": float(np.percentile(lat, 99)) if len(lat) else 0.0,
+    }
+
+
+# ==========================================
+# BENCHMARK
+# ==========================================
+def main():
+    parser = argparse.ArgumentParser(description="Replay a load trace through the autoscaling policies")
+    parser.add_argument("--config", help="autoscaler config (default: $AUTOSCALER_CONFIG / autoscaler_config.json)")
+    parser.add_argument("--trace", help="CSV: time,deployment,rps (or cpu,replicas); default synthetic")
+    parser.add_argument("--hours", type=float, default=24.0, help="length of the synthetic trace")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policy", default=",".join(POLICIES), help=f"comma list of {POLICIES}")
+    parser.add_argument("--model", choices=("none", "lstm"), default="none",
+                        help="none = always 'stable' (fast), lstm = the predictor's model in process")
+    parser.add_argument("--pod-rps", type=float, default=100.0, help="rps one pod serves (unless pod_rps is configured)")
+    parser.add_argument("--startup", type=float, default=STARTUP, help="seconds until a new pod is ready")
+    parser.add_argument("--slo-p99-ms", type=float, default=500.0)
+    parser.add_argument("--no-anomalies", action="store_true", help="skip the anomaly detector (faster)")
+    parser.add_argument("--tick", type=float, help="seconds between decisions (default: tick_seconds); "
+                                                   "coarser ticks trade fidelity for speed on long sweeps")
+    parser.add_argument("--segment-hours", type=float, default=24.0,
+                        help="longer traces run as segments this long, all in lockstep (0 = one run)")
+    parser.add_argument("--warmup-hours", type=float, default=1.0,
+                        help="each segment starts this much earlier, unreported")
+    parser.add_argument("--jobs", type=int, default=1, help="processes to spread the segments over")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    if args.trace:
+        trace = load_trace(args.trace, config.deployments, args.pod_rps)
+        source = args.trace
+    else:
+        trace = synthetic_trace(config.deployments, args.hours, args.pod_rps, seed=args.seed)
+        source = f"synthetic, {args.hours:g} h, seed {args.seed}"
+
+    parts = segments(trace, args.segment_hours, args.warmup_hours)
+    jobs = max(min(args.jobs, len(parts)), 1)
+    options = dict(pod_rps=args.pod_rps, startup=args.startup, slo_p99_ms=args.slo_p99_ms,
+                   anomalies=not args.no_anomalies, tick=args.tick)
+
+    print(f"\n🧪 SIMULATION: {source} | {len(config.deployments)} deployments | "
+          f"tick {args.tick or config.tick_seconds:g}s | startup {args.startup:g}s | "
+          f"SLO p99 ≤ {args.slo_p99_ms:g} ms | {len(parts)} segment(s), {jobs} process(es)\n")
+
+    print(f"{'policy':<14}{'SLO min':>10}{'crit SLO':>10}{'pod-h':>10}{'actions':>9}"
+          f"{'decide µs':>11}{'p99 µs':>9}{'sim h/s':>10}")
+
+    for policy in args.policy.split(","):
+        start = time.perf_counter()
+        if jobs == 1:
+            reports = simulate(config, policy, parts, args.model, options)
+        else:
+            # fork: workers inherit the trace; each builds its own model
+            with mp.get_context("fork").Pool(jobs) as pool:
+                chunks = pool.starmap(simulate, [
+                    (config, policy, parts[k::jobs], args.model, options) for k in range(jobs)
+                ])
+            reports = [r for chunk in chunks for r in chunk]
+        wall = time.perf_counter() - start
+        r = merge(reports)
+
+        print(f"{policy:<14}{sum(r['slo_minutes'].values()):>10.1f}{r['critical_slo_minutes']:>10.1f}"
+              f"{r['pod_hours']:>10.1f}{r['actions']:>9}{r['decide_us_mean']:>11.1f}"
+              f"{r['decide_us_p99']:>9.1f}{r['hours'] / wall:>10.0f}")
+        for name, minutes in r["slo_minutes"].items():
+            print(f"   {name:<24} SLO violated {minutes:.1f} min")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+from collections import deque
+import torch
+
+# ==========================================
+# STREAMING INFERENCE FOR HealthcareLSTM
+# ==========================================
+# A full pass over a 10-step window costs 2 layers x 2 directions x 10
+# LSTM cell steps. Streaming advances each service by one timestep,
+# which costs 4 cell steps:
+#
+#   layer 1 forward  : cached (h, c), one step on the new sample
+#   layer 1 backward : one step from zero state on the new sample
+#   layer 2 forward  : cached (h, c), one step on [l1 fwd, l1 bwd]
+#   layer 2 backward : one step from zero state on [l1 fwd, l1 bwd]
+#
+# At the last timestep both backward steps only see the newest sample, so
+# they match the full pass given their inputs. The cached forward states
+# do not:
+#   - layer 2 forward was fed layer 1 backward outputs computed when each
+#     sample was the newest. The full model recomputes them with the later
+#     samples of the window.
+#   - the forward states carry history older than the 10-step window.
+# Every key does a full-window recompute every `resync_every` ticks, which
+# gives the exact output and reseeds the cache. A new key, or a key seen
+# twice in one batch, is also recomputed.
+#
+# The drift is large. Replaying the bundled CSV per service against
+# model(full window), 2000 ticks each:
+#
+#   resync_every   1      2      3      5      10
+#   same action    100%   89.0%  83.5%  79.0%  75.4%
+#   max |Δlogit|   0      10.9   12.8   13.5   14.3
+#
+# So the default is 1: every tick is a full, exact recompute (no speed-up).
+# Larger values trade decisions for CPU; measure on your own traffic first.
+#
+# step() runs on the predictor's batcher thread, while drop() is called
+# from the event loop when the SequenceStore evicts a key. drop() only
+# queues the key; step() applies the queued drops before it reads the
+# cache, so the cache is only ever touched by one thread.
+
+
+class StreamingLSTM:
+
+    def __init__(self, model, resync_every=1):
+        self.model = model
+        self.resync_every = resync_every
+
+        lstm = model.lstm
+        self.hidden = lstm.hidden_size
+        self.cells = {}
+        for layer in range(lstm.num_layers):
+            for suffix in ("", "_reverse"):
+                name = f"l{layer}{suffix}"
+                self.cells[name] = (
+                    getattr(lstm, f"weight_ih_{name}").detach(),
+                    getattr(lstm, f"weight_hh_{name}").detach(),
+                    (getattr(lstm, f"bias_ih_{name}") + getattr(lstm, f"bias_hh_{name}")).detach()
+                )
+
+        # key → (tensor[4, hidden] = h1, c1, h2, c2 of the forward direction, ticks since resync)
+        self.cache = {}
+        self._dropped = deque()
+
+    # ==========================================
+    # ONE LSTM CELL STEP (PyTorch gate order i, f, g, o)
+    # ==========================================
+    def _cell(self, name, x, h=None, c=None):
+        w_ih, w_hh, bias = self.cells[name]
+
+        gates = torch.addmm(bias, x, w_ih.t())
+        if h is not None:
+            gates = gates.addmm_(h, w_hh.t())
+
+        i, f, g, o = gates.chunk(4, dim=1)
+        i = torch.sigmoid(i)
+        g = torch.tanh(g)
+        o = torch.sigmoid(o)
+
+        if c is None:
+            c_new = i * g
+        else:
+            c_new = torch.sigmoid(f) * c + i * g
+
+        return o * torch.tanh(c_new), c_new
+
+    def _head(self, last):
+        m = self.model
+        return m.fc2(m.relu(m.fc1(last)))
+
+    # ==========================================
+    # FULL WINDOW (exact) + CACHE RESEED
+    # ==========================================
+    def _full(self, keys, windows):
+        out, (h_n, c_n) = self.model.lstm(windows)
+        logits = self._head(out[:, -1, :])
+
+        # forward-direction final states live at index layer*2
+        state = torch.stack([h_n[0], c_n[0], h_n[2], c_n[2]], dim=1)
+        for i, key in enumerate(keys):
+            self.cache[key] = (state[i], 0)
+
+        return logits
+
+    # ==========================================
+    # ONE NEW TIMESTEP PER KEY
+    # ==========================================
+    def _incremental(self, keys, x):
+        state = torch.stack([self.cache[k][0] for k in keys])
+        h1, c1, h2, c2 = state.unbind(dim=1)
+
+        h1, c1 = self._cell("l0", x, h1, c1)
+        b1, _ = self._cell("l0_reverse", x)
+        l1_out = torch.cat([h1, b1], dim=1)
+
+        h2, c2 = self._cell("l1", l1_out, h2, c2)
+        b2, _ = self._cell("l1_reverse", l1_out)
+
+        logits = self._head(torch.cat([h2, b2], dim=1))
+
+        state = torch.stack([h1, c1, h2, c2], dim=1)
+        for i, key in enumerate(keys):
+            self.cache[key] = (state[i], self.cache[key][1] + 1)
+
+        return logits
+
+    # ==========================================
+    # MIXED BATCH
+    # ==========================================
+    def step(self, keys, windows):
+        """windows: scaled (N, seq_len, n_features) tensor, newest sample last."""
+        while self._dropped:
+            self.cache.pop(self._dropped.popleft(), None)
+
+        seen = {}
+        for key in keys:
+            seen[key] = seen.get(key, 0) + 1
+
+        full_idx, inc_idx = [], []
+        for i, key in enumerate(keys):
+            cached = self.cache.get(key)
+            if cached is None or seen[key] > 1 or cached[1] + 1 >= self.resync_every:
+                full_idx.append(i)
+            else:
+                inc_idx.append(i)
+
+        logits = torch.empty(len(keys), self.model.fc2.out_features)
+
+        with torch.no_grad():
+            if full_idx:
+                logits[full_idx] = self._full([keys[i] for i in full_idx], windows[full_idx])
+            if inc_idx:
+                logits[inc_idx] = self._incremental([keys[i] for i in inc_idx], windows[inc_idx, -1, :])
+
+        return logits
+
+    def drop(self, key):
+        # any thread; applied by the next step()
+        self._dropped.append(key)
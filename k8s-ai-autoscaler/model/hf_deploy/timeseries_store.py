@@ -0,0 +1,235 @@
+import json
+import os
+import numpy as np
+
+# ==========================================
+# IN-MEMORY TIME-SERIES STORE
+# ==========================================
+# Columnar history for every managed deployment. One tick appends one row:
+# a timestamp plus a (deployments × metrics) array of values. Rows live in
+# fixed-size NumPy ring buffers (O(1) append, no list.pop(0)), and are also
+# folded into 1m and 5m rollups (mean + max per bucket) for longer windows.
+#
+# With a directory, each ring is a .npy memmap, so history survives a
+# restart. Only the rollup bucket still being filled is lost.
+
+METRICS = ("cpu", "mem", "rps", "latency_ms", "p99_ms", "errors", "error_rate", "replicas")
+
+RAW_RETENTION = int(os.environ.get("TSDB_RETENTION", "600"))     # ticks (1 h at 6 s)
+ROLLUPS = {
+    "1m": (60, 1440),        # step seconds, buckets kept (24 h)
+    "5m": (300, 2016),       # (7 d)
+}
+
+
+class Ring:
+    """Fixed-capacity (time, value-array) ring, optionally memmap-backed."""
+
+    def __init__(self, capacity, shape, path=None):
+        self.capacity = capacity
+        self.shape = tuple(shape)
+
+        if path is None:
+            self.times = np.full(capacity, np.nan)
+            self.values = np.full((capacity,) + self.shape, np.nan)
+            self.state = np.zeros(2, dtype=np.int64)         # head, count
+        else:
+            self.times = self._open(f"{path}.times.npy", (capacity,))
+            self.values = self._open(f"{path}.values.npy", (capacity,) + self.shape)
+            self.state = self._open(f"{path}.state.npy", (2,), dtype=np.int64, fill=0)
+
+    @staticmethod
+    def _open(path, shape, dtype=np.float64, fill=np.nan):
+        if os.path.exists(path):
+            arr = np.lib.format.open_memmap(path, mode="r+")
+            if arr.shape == shape and arr.dtype == dtype:
+                return arr
+            del arr
+        arr = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+        arr[...] = fill
+        return arr
+
+    def __len__(self):
+        return int(self.state[1])
+
+    def push(self, t, values):
+        head = int(self.state[0])
+        self.times[head] = t
+        self.values[head] = values
+        self.state[0] = (head + 1) % self.capacity
+        self.state[1] = min(int(self.state[1]) + 1, self.capacity)
+
+    def _index(self, n):
+        count = len(self)
+        n = count if n is None else min(n, count)
+        return (int(self.state[0]) - n + np.arange(n)) % self.capacity
+
+    def last(self, n=None, cells=()):
+        """Chronological (times, values) of the newest n rows (copies).
+
+        `cells` indexes the value dimensions, so a query copies only what it reads.
+        """
+        idx = self._index(n)
+        return self.times[idx], self.values[(idx,) + tuple(cells)]
+
+    def since(self, t0, cells=()):
+        idx = self._index(None)
+        idx = idx[np.searchsorted(self.times[idx], t0, side="left"):]
+        return self.times[idx], self.values[(idx,) + tuple(cells)]
+
+    def flush(self):
+        for arr in (self.times, self.values, self.state):
+            if isinstance(arr, np.memmap):
+                arr.flush()
+
+
+class Rollup:
+    """Downsamples raw rows into fixed time buckets (mean and max)."""
+
+    def __init__(self, step, capacity, shape, path=None):
+        self.step = step
+        self.mean = Ring(capacity, shape, path and f"{path}.mean")
+        self.max = Ring(capacity, shape, path and f"{path}.max")
+        self.bucket = None
+        self.sum = np.zeros(shape)
+        self.count = np.zeros(shape)
+        self.peak = np.full(shape, -np.inf)
+
+    def add(self, t, values):
+        bucket = int(t // self.step)
+        if self.bucket is not None and bucket != self.bucket:
+            self._close()
+        self.bucket = bucket
+
+        # NaN (no sample) adds nothing; fmax ignores it
+        seen = ~np.isnan(values)
+        self.sum += np.where(seen, values, 0.0)
+        self.count += seen
+        np.fmax(self.peak, values, out=self.peak)
+
+    def _close(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = self.sum / self.count
+        peak = np.where(self.count > 0, self.peak, np.nan)
+
+        t = self.bucket * self.step
+        self.mean.push(t, mean)
+        self.max.push(t, peak)
+
+        self.sum[...] = 0
+        self.count[...] = 0
+        self.peak[...] = -np.inf
+
+    def flush(self):
+        self.mean.flush()
+        self.max.flush()
+
+
+class TimeSeriesStore:
+
+    def __init__(self, deployments, metrics=METRICS, retention=RAW_RETENTION, path=None):
+        self.deployments = list(deployments)
+        self.metrics = list(metrics)
+        self.row = {d: i for i, d in enumerate(self.deployments)}
+        self.col = {m: i for i, m in enumerate(self.metrics)}
+        shape = (len(self.deployments), len(self.metrics))
+
+        if path is not None:
+            path = self._prepare(path, retention)
+
+        self.raw = Ring(retention, shape, path and os.path.join(path, "raw"))
+        self.rollups = {
+            name: Rollup(step, capacity, shape, path and os.path.join(path, name))
+            for name, (step, capacity) in ROLLUPS.items()
+        }
+
+    def _prepare(self, path, retention):
+        # history is only reused for the same deployments / metrics / retention
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, "meta.json")
+        meta = {"deployments": self.deployments, "metrics": self.metrics, "retention": retention}
+
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                if json.load(f) != meta:
+                    print(f"⚠ {path}: layout changed, starting a fresh history")
+                    for name in os.listdir(path):
+                        if name.endswith(".npy"):
+                            os.remove(os.path.join(path, name))
+
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
+        return path
+
+    # ==========================================
+    # WRITE
+    # ==========================================
+    def append(self, t, samples):
+        """samples: {deployment: {metric: value}}; anything missing is NaN."""
+        values = np.full((len(self.deployments), len(self.metrics)), np.nan)
+        for deploy, metrics in samples.items():
+            r = self.row.get(deploy)
+            if r is None:
+                continue
+            for metric, value in metrics.items():
+                c = self.col.get(metric)
+                if c is not None and value is not None:
+                    values[r, c] = value
+
+        self.append_array(t, values)
+
+    def append_array(self, t, values):
+        """values: (deployments × metrics) array in store order."""
+        self.raw.push(t, values)
+        for rollup in self.rollups.values():
+            rollup.add(t, values)
+
+    def flush(self):
+        self.raw.flush()
+        for rollup in self.rollups.values():
+            rollup.flush()
+
+    # ==========================================
+    # READ
+    # ==========================================
+    def _ring(self, resolution, agg="mean"):
+        if resolution == "raw":
+            return self.raw
+        return getattr(self.rollups[resolution], agg)
+
+    def series(self, deploy, metric, seconds=None, n=None, resolution="raw", agg="mean", now=None):
+        """Chronological (times, values) for one deployment and metric."""
+        ring = self._ring(resolution, agg)
+        cells = (self.row[deploy], self.col[metric])
+        if seconds is not None:
+            if now is None:
+                times, _ = ring.last(1, cells)
+                now = times[-1] if len(times) else 0
+            return ring.since(now - seconds, cells)
+        return ring.last(n, cells)
+
+    def block(self, metrics, n):
+        """(n × deployments × metrics) newest rows, oldest first, in storage order."""
+        _, values = self.raw.last(n)
+        return np.ascontiguousarray(values[:, :, [self.col[m] for m in metrics]])
+
+    def mean(self, deploy, metric, seconds=None, n=None, resolution="raw"):
+        _, v = self.series(deploy, metric, seconds, n, resolution)
+        return float(np.nanmean(v)) if np.any(~np.isnan(v)) else None
+
+    def max(self, deploy, metric, seconds=None, n=None, resolution="raw"):
+        _, v = self.series(deploy, metric, seconds, n, resolution, agg="max")
+        return float(np.nanmax(v)) if np.any(~np.isnan(v)) else None
+
+    def percentile(self, deploy, metric, q, seconds=None, n=None, resolution="raw"):
+        _, v = self.series(deploy, metric, seconds, n, resolution)
+        return float(np.nanpercentile(v, q)) if np.any(~np.isnan(v)) else None
+
+    def rate(self, deploy, metric, seconds=None, n=None, resolution="raw"):
+        """Change per second between the first and last sample in the window."""
+        t, v = self.series(deploy, metric, seconds, n, resolution)
+        seen = ~np.isnan(v)
+        t, v = t[seen], v[seen]
+        if len(v) < 2 or t[-1] == t[0]:
+            return None
+        return float((v[-1] - v[0]) / (t[-1] - t[0]))
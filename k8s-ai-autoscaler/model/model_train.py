@@ -1,142 +1,340 @@
+import argparse
+import os
+import sys
+import time
 import pandas as pd
 import numpy as np
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 import pickle
+# network definitions live in hf_deploy/networks.py, shared with the service
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "hf_deploy"))
+from networks import HealthcareLSTM, LoadForecaster, FORECAST_TARGETS, FORECAST_HORIZON, ACTION_MODELS
+from sequence_dataset import SequenceDataset, batch_loader, time_split
+from convert_dataset import FEATURES, CATEGORICAL, LABEL, open_converted
 
-print("\n🧠 LSTM TRAINING STARTED...\n")
+# ===============================
+# TASK
+# ===============================
+# action   → HealthcareLSTM classifier (best_lstm_model.pth), or with
+#            --model mlp a PolicyMLP distilled from it (policy_mlp.pth)
+# forecast → LoadForecaster, CPU / request rate 1..5 ticks ahead (load_forecaster.pth)
+parser = argparse.ArgumentParser()
+parser.add_argument("--task", choices=["action", "forecast"], default="action")
+parser.add_argument("--model", choices=sorted(ACTION_MODELS), default="lstm", help="action model to train")
+parser.add_argument("--teacher", default=ACTION_MODELS["lstm"][1],
+                    help="LSTM weights a non-LSTM action model is distilled from ('' = labels only)")
+parser.add_argument("--distill-alpha", type=float, default=0.7, help="weight of the teacher's soft targets")
+parser.add_argument("--temperature", type=float, default=2.0)
+parser.add_argument("--epochs", type=int, default=30)
+parser.add_argument("--data", default="k8s_autoscale_training_dataset.csv",
+                    help="CSV, or a directory from convert_dataset.py (memory-mapped, out of core)")
+parser.add_argument("--batch-size", type=int, default=64)
+parser.add_argument("--workers", type=int, default=0, help="DataLoader worker processes")
+parser.add_argument("--threads", type=int, help="intra-op CPU threads (default: torch default)")
+parser.add_argument("--bf16", action="store_true", help="bfloat16 autocast on CPU")
+parser.add_argument("--val-fraction", type=float, default=0.15, help="held-out tail of every block (0 = no validation)")
+parser.add_argument("--val-blocks", type=int, default=10, help="blocks the time-ordered split is made in (1 = one tail)")
+parser.add_argument("--patience", type=int, default=5, help="epochs without a better validation loss before stopping")
+parser.add_argument("--min-delta", type=float, default=1e-4)
+parser.add_argument("--checkpoint", help="resumable state, written every epoch (default: checkpoint_<task>.pt)")
+parser.add_argument("--resume", action="store_true", help="continue from --checkpoint")
+args = parser.parse_args()
+
+if args.threads:
+    torch.set_num_threads(args.threads)
+
+if args.task == "forecast" and args.model != "lstm":
+    raise SystemExit("❌ the load forecaster is LSTM only: drop --model")
+
+print(f"\n🧠 {args.model.upper()} TRAINING STARTED ({args.task})...\n")
 
 # ===============================
 # LOAD DATASET
 # ===============================
-df = pd.read_csv("k8s_autoscale_training_dataset.csv")
-print("Dataset loaded:", df.shape)
+if os.path.isdir(args.data):
+    # memmaps: raw features, standardized per batch by the dataset
+    X, y, meta = open_converted(args.data)
+    print("Dataset mapped:", X.shape)
+
+    label_encoders = {}
+    for col in CATEGORICAL:
+        le = LabelEncoder()
+        le.classes_ = np.array(meta["classes"][col], dtype=object)
+        label_encoders[col] = le
+
+    # same statistics StandardScaler.fit would find, merged per chunk
+    scaler = StandardScaler()
+    scaler.mean_ = np.array(meta["mean"])
+    scaler.var_ = np.array(meta["var"])
+    std = np.sqrt(scaler.var_)
+    scaler.scale_ = np.where(std < 10 * np.finfo(np.float64).eps, 1.0, std)
+    scaler.n_features_in_ = len(FEATURES)
+    scaler.n_samples_seen_ = meta["rows"]
+    standardize = {"mean": scaler.mean_, "scale": scaler.scale_}
+    service_types = X[:, FEATURES.index("service_type")]
+
+else:
+    df = pd.read_csv(args.data)
+    print("Dataset loaded:", df.shape)
+
+    # encode categorical features
+    label_encoders = {}
+
+    for col in CATEGORICAL:
+        le = LabelEncoder()
+        df[col] = le.fit_transform(df[col])
+        label_encoders[col] = le
+
+    X = df[FEATURES].values
+    y = df[LABEL].values.astype(np.int64)
+    service_types = df["service_type"].values
+    del df
+
+    # feature scaling: fitted after the split, on training rows only
+    scaler = None
+    standardize = {}
 
 # ===============================
-# ENCODE CATEGORICAL FEATURES
+# TIME-ORDERED VALIDATION SPLIT
 # ===============================
-label_encoders = {}
+# the rows are split (the same way for both tasks, so the classifier and
+# the forecaster scale alike). Window i reads rows i .. i + gap - 1, inputs
+# then label or targets, and is kept only when they all fall on one side:
+# overlapping windows would leak.
+SEQ_LEN = 10
+gap = SEQ_LEN + (1 if args.task == "action" else FORECAST_HORIZON)
+train_rows = np.ones(len(X), dtype=bool)
+if args.val_fraction > 0:
+    train_rows[:] = False
+    train_rows[time_split(len(X), args.val_fraction, args.val_blocks)[0]] = True
+seen = np.concatenate([[0], np.cumsum(train_rows)])
+in_train = seen[gap:] - seen[:max(len(seen) - gap, 0)]      # training rows per window
+train_idx, val_idx = np.flatnonzero(in_train == gap), np.flatnonzero(in_train == 0)
 
-for col in ["service", "service_type", "action"]:
-    le = LabelEncoder()
-    df[col] = le.fit_transform(df[col])
-    label_encoders[col] = le
+if scaler is None:
+    # validation rows are only transformed, never fitted on
+    scaler = StandardScaler().fit(X[train_rows])
+    X = scaler.transform(X).astype(np.float32)
 
 # ===============================
-# FEATURES AND TARGET
+# SEQUENCES FOR LSTM (strided views, no copies)
 # ===============================
-features = [
-    "cpu_percent",
-    "memory_percent",
-    "latency_ms",
-    "error_count",
-    "request_rate",
-    "active_pods",
-    "predicted_load",
-    "service",
-    "service_type"
-]
+if args.task == "action":
+    dataset = SequenceDataset(X, SEQ_LEN, labels=y, **standardize)
+else:
+    # targets: the scaled target columns of the next FORECAST_HORIZON rows
+    target_cols = list(FORECAST_TARGETS.values())
+    assert [FEATURES[i] for i in target_cols] == list(FORECAST_TARGETS), "FORECAST_TARGETS out of sync with FEATURES"
+    dataset = SequenceDataset(X, SEQ_LEN, target_cols=target_cols, horizon=FORECAST_HORIZON, **standardize)
+assert len(dataset) == len(in_train)
 
-X = df[features].values
-y = df["action"].values
+print("Sequence shape:", (len(dataset), SEQ_LEN, X.shape[1]))
+print(f"Train windows: {len(train_idx):,} | validation: {len(val_idx):,} (last {args.val_fraction:.0%} of "
+      f"{args.val_blocks} blocks)")
+
+loader = batch_loader(dataset, args.batch_size, shuffle=True, workers=args.workers, indices=train_idx)
+val_loader = batch_loader(dataset, 1024, shuffle=False, workers=args.workers, indices=val_idx)
+
+if args.task == "action":
+    actions = [str(c) for c in label_encoders[LABEL].classes_]
+    critical_code = list(label_encoders["service_type"].classes_).index("critical")
+    # the label row's service decides whether it is a critical scale_up
+    val_critical = np.asarray(service_types[val_idx + SEQ_LEN]) == critical_code
 
 # ===============================
-# FEATURE SCALING
+# MODEL (shared with export_model.py / the predictor)
 # ===============================
-scaler = StandardScaler()
-X = scaler.fit_transform(X)
+if args.task == "action":
+    model_class, model_file = ACTION_MODELS[args.model]
+    model = model_class()
+    criterion = nn.CrossEntropyLoss()
+else:
+    model = LoadForecaster()
+    criterion = nn.MSELoss()
+    model_file = "load_forecaster.pth"
 
 # ===============================
-# CREATE SEQUENCES FOR LSTM
+# DISTILLATION (students also learn the LSTM's soft predictions)
 # ===============================
-SEQ_LEN = 10
-X_seq, y_seq = [], []
-
-for i in range(len(X) - SEQ_LEN):
-    X_seq.append(X[i:i + SEQ_LEN])
-    y_seq.append(y[i + SEQ_LEN])
+teacher = None
+if args.task == "action" and args.model != "lstm" and args.teacher:
+    if os.path.exists(args.teacher):
+        # must be trained on the same data / preprocess.npz as this run
+        teacher = HealthcareLSTM()
+        teacher.load_state_dict(torch.load(args.teacher, map_location="cpu"))
+        teacher.eval()
+        print(f"🎓 Distilling from {args.teacher} (alpha {args.distill_alpha}, T {args.temperature})")
+    else:
+        print(f"⚠ Teacher {args.teacher} not found: training {args.model} on labels only")
 
-X_seq = np.array(X_seq)
-y_seq = np.array(y_seq)
 
-print("Sequence shape:", X_seq.shape)
+def train_loss(outputs, xb, yb):
+    loss = criterion(outputs, yb)
+    if teacher is None:
+        return loss
+    T = args.temperature
+    with torch.no_grad():
+        soft = torch.softmax(teacher(xb) / T, dim=1)
+    kd = F.kl_div(F.log_softmax(outputs / T, dim=1), soft, reduction="batchmean") * T * T
+    return args.distill_alpha * kd + (1 - args.distill_alpha) * loss
 
 # ===============================
-# TORCH TENSORS
+# OPTIMIZER
 # ===============================
-X_tensor = torch.FloatTensor(X_seq)
-y_tensor = torch.LongTensor(y_seq)
+optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
 
 # ===============================
-# MODEL DEFINITION (BiLSTM)
+# VALIDATION
 # ===============================
-class HealthcareLSTM(nn.Module):
-    def __init__(self, input_size=9, hidden_size=64, num_layers=2, num_classes=3):
-        super().__init__()
+def evaluate():
+    """→ (mean loss, report line) over the validation windows, in order."""
+    model.eval()
+    total, preds, trues, taught = 0.0, [], [], []
+    with torch.no_grad():
+        for xb, yb in val_loader:
+            with torch.autocast("cpu", dtype=torch.bfloat16, enabled=args.bf16):
+                outputs = model(xb)
+            outputs = outputs.float()
+            total += criterion(outputs, yb).item() * len(xb)
+            preds.append(outputs.argmax(dim=1).numpy() if args.task == "action" else outputs.numpy())
+            trues.append(yb.numpy())
+            if teacher is not None:
+                taught.append(teacher(xb).argmax(dim=1).numpy())
+    model.train()
+
+    loss = total / len(val_idx)
+    preds, true = np.concatenate(preds), np.concatenate(trues)
 
-        self.lstm = nn.LSTM(
-            input_size=input_size,
-            hidden_size=hidden_size,
-            num_layers=num_layers,
-            batch_first=True,
-            bidirectional=True
-        )
+    if args.task == "action":
+        k = len(actions)
+        confusion = np.bincount(true * k + preds, minlength=k * k).reshape(k, k)
+        hits = np.diag(confusion)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            precision = hits / confusion.sum(axis=0)
+            recall = hits / confusion.sum(axis=1)
+        parts = [f"acc {hits.sum() / len(true):.1%}"]
+        parts += [f"{a} P {p:.0%} R {r:.0%}" for a, p, r in zip(actions, precision, recall)]
 
-        self.fc1 = nn.Linear(hidden_size * 2, 32)
-        self.relu = nn.ReLU()
-        self.fc2 = nn.Linear(32, num_classes)
+        up = actions.index("scale_up")
+        critical_up = val_critical & (true == up)
+        if critical_up.any():
+            parts.append(f"critical scale_up R {(preds[critical_up] == up).mean():.1%}")
+        if taught:
+            parts.append(f"agrees with lstm {(preds == np.concatenate(taught)).mean():.1%}")
+        return loss, " | ".join(parts)
 
-    def forward(self, x):
-        out, _ = self.lstm(x)
-        last_step = out[:, -1, :]
-        out = self.relu(self.fc1(last_step))
-        out = self.fc2(out)
-        return out
+    # forecast: RMSE per target, back in its own units
+    parts = []
+    for j, col in enumerate(FORECAST_TARGETS):
+        rmse = np.sqrt(np.mean((preds[..., j] - true[..., j]) ** 2)) * scaler.scale_[FEATURES.index(col)]
+        parts.append(f"{col} RMSE {rmse:.2f}")
+    return loss, " | ".join(parts)
 
-model = HealthcareLSTM()
 
 # ===============================
-# LOSS AND OPTIMIZER
+# CHECKPOINT / RESUME
 # ===============================
-criterion = nn.CrossEntropyLoss()
-optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
+checkpoint_file = args.checkpoint or f"checkpoint_{args.task}{'' if args.model == 'lstm' else '_' + args.model}.pt"
+start_epoch, best_loss, bad_epochs = 0, float("inf"), 0
+
+if args.resume:
+    state = torch.load(checkpoint_file)
+    if (state["task"], state.get("arch", "lstm")) != (args.task, args.model):
+        raise SystemExit(f"❌ {checkpoint_file} is a {state['task']} / {state.get('arch', 'lstm')} checkpoint")
+    model.load_state_dict(state["model"])
+    optimizer.load_state_dict(state["optimizer"])
+    torch.set_rng_state(state["rng"])
+    start_epoch, best_loss, bad_epochs = state["epoch"], state["best_loss"], state["bad_epochs"]
+    print(f"↩ Resumed from {checkpoint_file} after epoch {start_epoch} (best val loss {best_loss:.4f})")
 
 # ===============================
-# TRAINING LOOP
+# TRAINING LOOP (early stopping, best model kept)
 # ===============================
-EPOCHS = 30
-BATCH_SIZE = 64
+EPOCHS = args.epochs
 
-for epoch in range(EPOCHS):
-    perm = torch.randperm(X_tensor.size(0))
-    total_loss = 0
+print(f"⚙ batch {args.batch_size} | workers {args.workers} | threads {torch.get_num_threads()} | "
+      f"{'bf16 autocast' if args.bf16 else 'fp32'} | patience {args.patience}")
 
-    for i in range(0, X_tensor.size(0), BATCH_SIZE):
-        idx = perm[i:i + BATCH_SIZE]
-
-        xb = X_tensor[idx]
-        yb = y_tensor[idx]
+for epoch in range(start_epoch if bad_epochs < args.patience else EPOCHS, EPOCHS):
+    total_loss = 0
+    start = time.perf_counter()
 
+    for xb, yb in loader:
         optimizer.zero_grad()
-        outputs = model(xb)
-        loss = criterion(outputs, yb)
+        with torch.autocast("cpu", dtype=torch.bfloat16, enabled=args.bf16):
+            outputs = model(xb)
+        loss = train_loss(outputs.float(), xb, yb)
         loss.backward()
         optimizer.step()
 
         total_loss += loss.item()
 
-    print(f"Epoch {epoch + 1}/{EPOCHS} | Loss: {total_loss:.4f}")
+    seconds = time.perf_counter() - start
+    print(f"Epoch {epoch + 1}/{EPOCHS} | Loss: {total_loss:.4f} | "
+          f"{len(train_idx) / seconds:,.0f} seq/s | {seconds:.1f}s")
+
+    if len(val_idx):
+        val_loss, report = evaluate()
+        if val_loss < best_loss - args.min_delta:
+            best_loss, bad_epochs = val_loss, 0
+            torch.save(model.state_dict(), model_file)
+            mark = "⭐ best"
+        else:
+            bad_epochs += 1
+            mark = f"no gain {bad_epochs}/{args.patience}"
+        print(f"   📏 val loss {val_loss:.4f} ({mark}) | {report}")
+    else:
+        # nothing to compare against: the last epoch is the model
+        torch.save(model.state_dict(), model_file)
+
+    torch.save({
+        "task": args.task,
+        "arch": args.model,
+        "epoch": epoch + 1,
+        "model": model.state_dict(),
+        "optimizer": optimizer.state_dict(),
+        "rng": torch.get_rng_state(),
+        "best_loss": best_loss,
+        "bad_epochs": bad_epochs,
+    }, checkpoint_file)
+
+    if bad_epochs >= args.patience:
+        print(f"⏹ Early stop: no validation gain for {args.patience} epochs (best {best_loss:.4f})")
+        break
 
 # ===============================
 # SAVE MODEL AND PREPROCESSORS
 # ===============================
-torch.save(model.state_dict(), "best_lstm_model.pth")
+# model_file was written whenever validation improved (every epoch without)
+print("\n✅ TRAINING COMPLETE")
+print("Saved files:")
+print(f"- {model_file}")
+
+if args.task == "forecast":
+    # the forecaster shares the classifier's scaling at serving time
+    try:
+        with np.load("preprocess.npz") as prep:
+            same = np.allclose(prep["mean"], scaler.mean_) and np.allclose(prep["scale"], scaler.scale_)
+        if not same:
+            print("⚠ preprocess.npz was fitted on other data: retrain --task action on this dataset")
+    except FileNotFoundError:
+        print("⚠ preprocess.npz missing: run --task action first")
+    raise SystemExit
+
 pickle.dump(scaler, open("scaler.pkl", "wb"))
 pickle.dump(label_encoders, open("label_encoders.pkl", "wb"))
 
-print("\n✅ TRAINING COMPLETE")
-print("Saved files:")
-print("- best_lstm_model.pth")
+# plain arrays for the predictor, so serving doesn't need sklearn
+np.savez(
+    "preprocess.npz",
+    mean=scaler.mean_,
+    scale=scaler.scale_,
+    **{f"{col}_classes": np.array([str(c) for c in le.classes_]) for col, le in label_encoders.items()}
+)
+
 print("- scaler.pkl")
-print("- label_encoders.pkl")
\ No newline at end of file
+print("- label_encoders.pkl")
+print("- preprocess.npz")
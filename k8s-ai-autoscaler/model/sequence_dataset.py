@@ -0,0 +1,125 @@
+import numpy as np
+import torch
+from numpy.lib.stride_tricks import sliding_window_view
+from torch.utils.data import Dataset, DataLoader, BatchSampler, RandomSampler, SequentialSampler, SubsetRandomSampler
+
+# ===============================
+# SLIDING-WINDOW SEQUENCES (zero-copy)
+# ===============================
+# Window i is X[i:i + seq_len] and its target is either
+#   labels[i + seq_len]                        (action)
+#   X[i + seq_len:i + seq_len + horizon, cols] (forecast)
+# Both are strided views of the original arrays, so the dataset costs no
+# memory beyond X itself. Items are whole batches: the loader hands
+# __getitem__ a list of window indices and only that batch is gathered
+# (one NumPy fancy index) and copied into a tensor.
+#
+# X may be a read-only memmap of raw features (convert_dataset.py): pass
+# mean / scale and each batch is standardized as it is gathered, so only
+# the pages a batch touches are ever read and memory stays bounded.
+#
+# The views are rebuilt lazily in every DataLoader worker; pickling them
+# would materialize all windows (seq_len × the data), and memmapped .npy
+# files are reopened by path.
+
+
+class SequenceDataset(Dataset):
+
+    def __init__(self, X, seq_len, labels=None, target_cols=None, horizon=None, mean=None, scale=None):
+        self.X = X
+        self.seq_len = seq_len
+        self.labels = labels
+        self.target_cols = target_cols
+        self.horizon = horizon
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float32)
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float32)
+
+        if labels is not None:
+            self.n = len(X) - seq_len
+        else:
+            self.n = len(X) - seq_len - horizon + 1
+        self.n = max(self.n, 0)
+        self._views = None
+
+    def __len__(self):
+        return self.n
+
+    def views(self):
+        if self._views is None:
+            # (n, seq_len, features): window axis last → swap, still a view
+            x = sliding_window_view(self.X, self.seq_len, axis=0).transpose(0, 2, 1)
+            if self.labels is not None:
+                y = self.labels[self.seq_len:]
+            else:
+                # all columns here, the target ones are picked per batch
+                y = sliding_window_view(self.X[self.seq_len:], self.horizon, axis=0).transpose(0, 2, 1)
+            self._views = (x, y)
+        return self._views
+
+    def _standardize(self, batch, cols=slice(None)):
+        if self.mean is None:
+            return batch
+        return ((batch - self.mean[cols]) / self.scale[cols]).astype(np.float32)
+
+    def __getitem__(self, idx):
+        x, y = self.views()
+        idx = np.sort(np.asarray(idx))    # sorted reads are kinder to memmaps
+        xb = self._standardize(x[idx])
+        if self.labels is not None:
+            yb = y[idx]
+        else:
+            yb = self._standardize(y[idx][..., self.target_cols], self.target_cols)
+        return torch.from_numpy(np.ascontiguousarray(xb)), torch.from_numpy(np.ascontiguousarray(yb))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_views"] = None
+        # a memmap pickles as its whole contents: send the .npy path instead
+        for key in ("X", "labels"):
+            if isinstance(state[key], np.memmap):
+                state[key] = MemmapPath(state[key].filename)
+        return state
+
+    def __setstate__(self, state):
+        for key in ("X", "labels"):
+            if isinstance(state[key], MemmapPath):
+                state[key] = np.load(state[key], mmap_mode="r")
+        self.__dict__.update(state)
+
+
+class MemmapPath(str):
+    pass
+
+
+def time_split(n, val_fraction, blocks=10, gap=0):
+    """(train, val) window indices: the last val_fraction of each of `blocks`
+    consecutive blocks is validation, so validation always comes after the
+    training windows of its block. `gap` windows are dropped on both sides
+    of every validation range so no training window reads its rows."""
+    edges = np.linspace(0, n, blocks + 1).astype(np.int64)
+    train, val = [], []
+    for a, b in zip(edges[:-1], edges[1:]):
+        cut = b - int(round((b - a) * val_fraction))
+        train.append(np.arange(a + (gap if a > 0 else 0), max(cut - gap, a)))
+        val.append(np.arange(cut, b))
+    return np.concatenate(train), np.concatenate(val)
+
+
+def batch_loader(dataset, batch_size, shuffle=True, workers=0, indices=None):
+    """DataLoader that yields (xb, yb) batches gathered in one go per batch.
+
+    indices: only these windows (e.g. one side of time_split), in order
+    unless shuffled.
+    """
+    if indices is not None:
+        sampler = SubsetRandomSampler(indices) if shuffle else indices
+    else:
+        sampler = RandomSampler(dataset) if shuffle else SequentialSampler(dataset)
+    return DataLoader(
+        dataset,
+        sampler=BatchSampler(sampler, batch_size, drop_last=False),
+        batch_size=None,          # items already are batches
+        num_workers=workers,
+        persistent_workers=workers > 0,
+        prefetch_factor=4 if workers > 0 else None,
+    )
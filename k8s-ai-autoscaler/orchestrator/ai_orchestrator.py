@@ -1,7 +1,12 @@
+import os
+import sys
 import requests
 import subprocess
 import time
 import random
+# feature codes come from the trained model's classes, as in live_metrics_sender.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "model", "hf_deploy"))
+from autoscaler_config import load_classes, model_codes
 
 # ============================================
 # 🔴 CHANGE THIS PORT EVERY TIME YOU RUN:
@@ -12,22 +17,12 @@ MODEL_API = "http://127.0.0.1:44073/predict"
 
 DEPLOYMENT_NAME = "ai-self-healing"
 
-# label encodings (same as training)
-service_map = {
-    "analytics":0,
-    "appointments":1,
-    "cctv":2,
-    "emergency":3,
-    "lab_report":4,
-    "patient_monitoring":5,
-    "pharmacy":6,
-    "website":7
-}
-
-type_map = {
-    "critical":0,
-    "non_critical":1
-}
+# the model's desired replica count is clamped to this range
+MIN_REPLICAS = 2
+MAX_REPLICAS = 6
+
+# codes are positions in the classes the model was trained with (preprocess.npz)
+CLASSES = load_classes()
 
 # ============================================
 # Generate fake metrics
@@ -44,6 +39,7 @@ def generate_metrics():
     service_type = "critical"
 
     predicted_load = 0.5*cpu + 0.3*memory + 0.2*(latency/2)
+    service_code, type_code = model_codes(service, service_type, CLASSES)
 
     return {
         "cpu_percent": cpu,
@@ -55,8 +51,8 @@ def generate_metrics():
         "predicted_load": predicted_load,
         "service": service,
         "service_type": service_type,
-        "service_encoded": service_map[service],
-        "service_type_encoded": type_map[service_type]
+        "service_encoded": service_code,
+        "service_type_encoded": type_code
     }
 
 # ============================================
@@ -76,15 +72,18 @@ def get_prediction(metrics):
             metrics["service_type_encoded"]
         ]
 
-        sequence = [feature_vector]*10
-        payload = {"sequence": sequence}
+        # the predictor keeps the last 10 real samples per deployment/service
+        payload = {
+            "features": feature_vector,
+            "deployment": DEPLOYMENT_NAME,
+            "service": metrics["service"]
+        }
 
         res = requests.post(MODEL_API, json=payload, timeout=10)
 
         print("🔎 Raw API response:", res.text)
 
-        data = res.json()
-        return data["predicted_action"]
+        return res.json()
 
     except Exception as e:
         print("❌ Model API error:", e)
@@ -93,37 +92,42 @@ def get_prediction(metrics):
 # ============================================
 # Kubernetes scaling
 # ============================================
-def scale_deployment(action):
+def decide(prediction, floor=MIN_REPLICAS, ceiling=MAX_REPLICAS):
+    """Replica count for a model prediction (also replayed by simulator.py,
+    with each deployment's base / max as floor / ceiling)."""
+    return min(max(prediction["desired_replicas"], floor), ceiling)
+
+def scale_deployment(prediction, current):
 
-    if action == "scale_up":
-        print("⚡ Scaling UP to 6 pods")
-        subprocess.run([
-            "kubectl","scale","deployment",DEPLOYMENT_NAME,"--replicas=6"
-        ])
+    action = prediction["predicted_action"]
+    replicas = decide(prediction)
 
-    elif action == "scale_down":
-        print("📉 Scaling DOWN to 2 pods")
-        subprocess.run([
-            "kubectl","scale","deployment",DEPLOYMENT_NAME,"--replicas=2"
-        ])
+    if replicas == current:
+        print(f"🟢 Stable - keeping {current} pods")
+        return
 
-    else:
-        print("🟢 Stable - no scaling")
+    icon = "⚡" if replicas > current else "📉"
+    print(f"{icon} {action}: scaling {current} → {replicas} pods")
+    subprocess.run([
+        "kubectl","scale","deployment",DEPLOYMENT_NAME,f"--replicas={replicas}"
+    ])
 
 # ============================================
 # MAIN LOOP
 # ============================================
-print("\n🧠 AI Kubernetes Orchestrator Started...\n")
+if __name__ == "__main__":
+
+    print("\n🧠 AI Kubernetes Orchestrator Started...\n")
 
-while True:
-    metrics = generate_metrics()
-    print("📊 Metrics:", metrics)
+    while True:
+        metrics = generate_metrics()
+        print("📊 Metrics:", metrics)
 
-    action = get_prediction(metrics)
+        prediction = get_prediction(metrics)
 
-    if action:
-        print("🤖 AI Decision:", action)
-        scale_deployment(action)
+        if prediction:
+            print("🤖 AI Decision:", prediction["predicted_action"], "→", prediction["desired_replicas"], "pods")
+            scale_deployment(prediction, metrics["active_pods"])
 
-    print("--------------------------------------------------")
-    time.sleep(8)
+        print("--------------------------------------------------")
+        time.sleep(8)
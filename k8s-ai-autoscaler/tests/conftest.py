@@ -0,0 +1,6 @@
+import os
+import sys
+
+# the services are flat scripts that import each other by module name
+MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "model")
+sys.path.insert(0, os.path.join(MODEL_DIR, "hf_deploy"))
@@ -0,0 +1,26 @@
+import numpy as np
+from anomaly_detector import AnomalyDetector, SIGNALS
+
+ERRORS = SIGNALS.index("errors")
+
+
+def quiet_then(errors, ticks=20):
+    """One deployment at steady load with no errors, then `errors` on the last tick."""
+    x = np.tile(np.array([40.0, 50.0, 100.0, 80.0, 0.0]), (ticks, 1, 1))
+    x[-1, 0, ERRORS] = errors
+    return x
+
+
+def rate_events(x):
+    return [e for e in AnomalyDetector().detect_array(x, ["app"]) if e.kind == "rate"]
+
+
+def test_zero_baseline_small_blip_is_not_an_anomaly():
+    assert rate_events(quiet_then(2)) == []
+
+
+def test_zero_baseline_score_is_finite():
+    events = rate_events(quiet_then(10))
+    assert [(e.signal, e.severity) for e in events] == [("errors", "critical")]
+    assert np.isfinite(events[0].score)
+    assert events[0].baseline == 0.0
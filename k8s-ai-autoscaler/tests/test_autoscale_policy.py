@@ -0,0 +1,44 @@
+from anomaly_detector import AnomalyEvent
+from autoscale_policy import DeploymentState, want
+from autoscaler_config import ManagedDeployment
+
+CLASSES = {
+    "service": ["analytics", "emergency", "lab_report", "patient_monitoring", "pharmacy"],
+    "service_type": ["critical", "non_critical"],
+    "action": ["scale_down", "scale_up", "stable"],
+}
+
+
+def steady_critical(*anomalies):
+    """A critical deployment at 2 pods, load within band, model says stable."""
+    st = DeploymentState(ManagedDeployment("critical-app", "patient_monitoring", base=1, max=6, classes=CLASSES))
+    st.replicas = st.target = 2
+    st.cpu = st.expected_cpu = 45
+    st.expected_rps = 100
+    st.anomalies = list(anomalies)
+    return st
+
+
+def event(signal, severity):
+    return AnomalyEvent("critical-app", signal, "zscore", severity, 90.0, 40.0, 5.0)
+
+
+def planned(st):
+    want(st, critical_stressed=False, log=lambda *a: None)
+    return st.desired
+
+
+def test_no_anomaly_keeps_size():
+    assert planned(steady_critical()) == 2
+
+
+def test_warning_does_not_force_scale_up():
+    assert planned(steady_critical(event("cpu", "warning"))) == 2
+
+
+def test_memory_anomaly_does_not_force_scale_up():
+    assert planned(steady_critical(event("mem", "critical"))) == 2
+
+
+def test_critical_load_spike_forces_scale_up():
+    assert planned(steady_critical(event("cpu", "critical"))) > 2
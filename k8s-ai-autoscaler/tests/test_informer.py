@@ -0,0 +1,73 @@
+import asyncio
+from informer import ClusterCache
+from k8s_api import FakeKubeAPI
+
+
+async def settle():
+    # let the watch tasks drain their queues
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+def test_watch_events_update_the_cache():
+    async def scenario():
+        api = FakeKubeAPI({"api": 2, "db": 1})
+        cache = ClusterCache(api)
+        await cache.start()
+        assert cache.replicas("api") == 2
+        assert cache.running_pods("api") == ["api-0", "api-1"]
+
+        calls = len(api.calls)
+        await api.scale("api", 3)
+        await api.scale("db", 0)
+        await settle()
+        assert cache.replicas("api") == 3
+        assert cache.pods_of("api") == ["api-0", "api-1", "api-2"]
+        assert cache.replicas("db") == 0
+        assert cache.pods_of("db") == []
+
+        # a label change moves the pod to another app
+        await api.label_pod("api-2", {"app": "api-drain"})
+        await settle()
+        assert cache.pods_of("api") == ["api-0", "api-1"]
+        assert cache.pods_of("api-drain") == ["api-2"]
+        assert cache.pods.resource_version == str(api.version)
+
+        await cache.stop()
+        # reads never went to the API
+        assert len(api.calls) == calls + 3
+
+    asyncio.run(scenario())
+
+
+def test_expired_watch_relists():
+    async def scenario():
+        api = FakeKubeAPI({"api": 1})
+        cache = ClusterCache(api)
+        events = []
+
+        def record(event_type, obj):
+            events.append(event_type)
+            cache._index(event_type, obj)
+
+        cache.pods.on_event = record
+        await cache.start()
+        assert events == ["RESYNC"]
+
+        # changes the watch never delivered ...
+        api.replicas["api"] = 3
+        api.version += 5
+
+        # ... are picked up by the relist after a 410 in the stream
+        for q in list(api.watchers["pods"]) + list(api.watchers["deployments"]):
+            q.put_nowait(("ERROR", {"code": 410}))
+        await settle()
+
+        assert events == ["RESYNC", "RESYNC"]
+        assert cache.replicas("api") == 3
+        assert cache.pods_of("api") == ["api-0", "api-1", "api-2"]
+        assert cache.pods.resource_version == str(api.version)
+
+        await cache.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,69 @@
+import asyncio
+from cluster_snapshot import ClusterSnapshot
+from k8s_api import FakeKubeAPI, cpu_millicores, memory_mi
+
+DEPLOYMENTS = ["api", "db"]
+
+
+def fake():
+    # pod i of a deployment runs at 10·(i+1) millicores
+    return FakeKubeAPI({"api": 2, "db": 1}, load=lambda deploy, i: (10.0 * (i + 1), 100.0))
+
+
+def take(api):
+    return asyncio.run(ClusterSnapshot.take(api, DEPLOYMENTS))
+
+
+def test_quantities():
+    assert cpu_millicores("250m") == 250
+    assert cpu_millicores("1") == 1000
+    assert cpu_millicores("500000n") == 0.5
+    assert memory_mi("512Mi") == 512
+    assert memory_mi("1Gi") == 1024
+    assert memory_mi(str(2 ** 20)) == 1
+
+
+def test_snapshot_groups_pods_by_app():
+    snap = take(fake())
+    assert snap.replicas == {"api": 2, "db": 1}
+    assert snap.pod_cpu("api") == [("api-0", 10.0), ("api-1", 20.0)]
+    assert snap.pod_cpu("db") == [("db-0", 10.0)]
+
+    cpu, mem = snap.service_cpu("api")
+    assert cpu == 0.8 * 20 + 0.2 * 15
+    assert mem == 10
+    assert snap.service_cpu("missing") == (0, 0)
+    assert snap.traffic_of("api").rps == 0
+
+
+def test_scale_label_and_delete():
+    api = fake()
+    asyncio.run(api.scale("db", 3))
+    assert take(api).replicas["db"] == 3
+    assert len(take(api).pods["db"]) == 3
+
+    # a relabelled (draining) pod leaves its deployment's snapshot
+    asyncio.run(api.label_pod("api-1", {"app": "api-drain"}))
+    assert take(api).pod_cpu("api") == [("api-0", 10.0)]
+
+    # ... and its replacement comes back under the original label
+    asyncio.run(api.delete_pod("api-1"))
+    assert [name for name, _ in take(api).pod_cpu("api")] == ["api-0", "api-1"]
+
+    assert api.calls == [
+        ("scale", "db", 3),
+        ("label", "api-1", {"app": "api-drain"}),
+        ("delete", "api-1"),
+    ]
+
+
+def test_failed_metrics_call_gives_an_empty_snapshot():
+    api = fake()
+
+    async def broken(selector=None):
+        raise RuntimeError("metrics-server down")
+
+    api.list_pod_metrics = broken
+    snap = take(api)
+    assert snap.pods == {"api": [], "db": []}
+    assert snap.replicas == {"api": 2, "db": 1}
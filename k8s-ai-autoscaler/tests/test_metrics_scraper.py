@@ -0,0 +1,68 @@
+import asyncio
+import math
+import pytest
+from k8s_api import FakeKubeAPI
+from metrics_scraper import MetricsScraper, histogram_quantile, parse_line
+
+
+def test_parse_line():
+    assert parse_line("# HELP http_requests_total Requests") is None
+    assert parse_line("   ") is None
+    assert parse_line("up 1") == ("up", {}, 1.0)
+    assert parse_line('http_requests_total{status="200",path="/a b"} 3 1700000000') == (
+        "http_requests_total", {"status": "200", "path": "/a b"}, 3.0
+    )
+    name, labels, value = parse_line(r'x{msg="say \"hi\" {}"} +Inf')
+    assert labels == {"msg": 'say "hi" {}'}
+    assert math.isinf(value)
+
+
+def test_histogram_quantile():
+    buckets = {0.1: 50.0, 0.5: 100.0, math.inf: 100.0}
+    assert histogram_quantile(0.5, buckets) == pytest.approx(0.1)
+    assert histogram_quantile(0.75, buckets) == pytest.approx(0.3)
+
+    # a rank in the +Inf bucket reports the highest finite bound
+    assert histogram_quantile(0.99, {0.1: 10.0, math.inf: 20.0}) == 0.1
+    assert histogram_quantile(0.5, {}) is None
+    assert histogram_quantile(0.5, {0.1: 0.0, math.inf: 0.0}) is None
+
+
+class Pods:
+
+    def running_pods(self, deploy):
+        return [f"{deploy}-0", f"{deploy}-1"]
+
+
+def test_counter_deltas_and_restarts():
+    counters = {"ok": 100.0, "failed": 0.0, "fast": 100.0}
+
+    def exposition(deploy, i):
+        return "\n".join([
+            "# TYPE http_requests_total counter",
+            f'http_requests_total{{status="200"}} {counters["ok"]}',
+            f'http_requests_total{{status="500"}} {counters["failed"]}',
+            f'http_request_duration_seconds_bucket{{le="0.1"}} {counters["fast"]}',
+            f'http_request_duration_seconds_bucket{{le="+Inf"}} {counters["ok"] + counters["failed"]}',
+        ])
+
+    scraper = MetricsScraper(FakeKubeAPI({"api": 2}, exposition=exposition), Pods(), http=None)
+
+    # the first scrape only sets the baselines
+    first = asyncio.run(scraper.collect(["api"]))["api"]
+    assert first.rps == 0 and first.p50_ms is None
+
+    counters.update(ok=190.0, failed=10.0, fast=150.0)
+    traffic = asyncio.run(scraper.collect(["api"]))["api"]
+    assert traffic.errors == 2 * 10
+    assert traffic.error_rate == pytest.approx(0.1)
+    assert traffic.rps > 0
+    # per pod: 50 of 100 new requests under 100 ms, the rest in +Inf
+    assert traffic.p50_ms == pytest.approx(100)
+    assert traffic.p99_ms == pytest.approx(100)
+
+    # counters going down mean a restart: the new values are the delta
+    counters.update(ok=20.0, failed=0.0, fast=20.0)
+    traffic = asyncio.run(scraper.collect(["api"]))["api"]
+    assert traffic.errors == 0
+    assert traffic.p99_ms == pytest.approx(99)
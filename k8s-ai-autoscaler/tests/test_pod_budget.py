@@ -0,0 +1,20 @@
+from pod_budget import Capacity, Demand, allocate
+
+
+def demands():
+    return [
+        Demand("api", 0, 2, 10, desired=6, current=4, cpu_m=250, mem_mi=256),
+        Demand("batch", 1, 1, 8, desired=5, current=5, cpu_m=500, mem_mi=512),
+    ]
+
+
+def test_fast_path_matches_the_greedy_pass(monkeypatch):
+    capacity = Capacity(11, cpu_m=4000, mem_mi=4096)
+    fast = allocate(demands(), capacity)
+    monkeypatch.setattr(Capacity, "fits_all", lambda self, demands: False)
+    assert fast == allocate(demands(), capacity) == {"api": 6, "batch": 5}
+
+
+def test_shortage_goes_to_the_critical_deployment_first():
+    alloc = allocate(demands(), Capacity(8))
+    assert alloc == {"api": 6, "batch": 2}
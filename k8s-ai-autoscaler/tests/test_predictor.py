@@ -0,0 +1,65 @@
+import os
+import time
+import pytest
+
+os.environ.setdefault("PREDICTOR_OFFLINE", "1")
+
+from fastapi.testclient import TestClient
+import predictor
+
+FEATURES = [40.0, 50.0, 80.0, 0.0, 100.0, 2.0, 100.0, 0.0, 0.0]
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(predictor.app) as client:
+        deadline = time.time() + 60
+        while client.get("/ready").status_code != 200:
+            assert predictor.load_error is None, predictor.load_error
+            assert time.time() < deadline, "predictor never became ready"
+            time.sleep(0.1)
+        yield client
+
+
+def test_wrong_length_features_are_a_422(client):
+    r = client.post("/predict", json={"deployment": "app", "features": FEATURES[:8]})
+    assert r.status_code == 422
+    assert predictor.history.get(("app", None)) is None
+
+    bad = {"features": FEATURES, "sequence": [FEATURES[:8]] * 10}
+    assert client.post("/predict", json=bad).status_code == 422
+    assert client.post("/predict", json={"features": ["high"] * 9}).status_code == 422
+
+
+def test_malformed_keys_and_items_are_a_422(client):
+    r = client.post("/predict", json={"deployment": ["x"], "features": FEATURES})
+    assert r.status_code == 422
+    r = client.post("/predict_batch", json={"items": [{"service": {"a": 1}, "features": FEATURES}]})
+    assert r.status_code == 422
+    assert client.post("/predict_batch", json={"items": 5}).status_code == 422
+
+
+def test_batch_with_a_bad_item_pushes_no_history(client):
+    items = [
+        {"deployment": "first", "features": FEATURES},
+        {"deployment": "second", "features": FEATURES + [1.0]},
+    ]
+    r = client.post("/predict_batch", json={"items": items})
+    assert r.status_code == 422
+    assert predictor.history.get(("first", None)) is None
+
+    r = client.post("/predict_batch", json={"items": items[:1]})
+    assert r.status_code == 200
+    assert predictor.history.get(("first", None)) is not None
+
+
+def test_batch_is_one_forward_pass(client, monkeypatch):
+    calls = []
+    score_jobs = predictor.batcher.fn
+    monkeypatch.setattr(predictor.batcher, "fn", lambda jobs: calls.append(len(jobs)) or score_jobs(jobs))
+
+    items = [{"features": FEATURES}] * 200
+    r = client.post("/predict_batch", json={"items": items})
+    assert r.status_code == 200
+    assert len(r.json()["predictions"]) == 200
+    assert calls == [200]
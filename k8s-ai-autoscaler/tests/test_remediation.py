@@ -0,0 +1,71 @@
+import asyncio
+from remediation import RemediationScheduler
+
+
+def test_key_runs_once_and_frees_itself():
+    async def scenario():
+        scheduler = RemediationScheduler()
+        ran = []
+
+        async def scale():
+            ran.append("scale")
+
+        assert scheduler.schedule(("scale", "api"), 0.01, scale, value=5)
+        assert not scheduler.schedule(("scale", "api"), 0.01, scale, value=6)
+        assert scheduler.value(("scale", "api")) == 5
+
+        await asyncio.sleep(0.05)
+        assert ran == ["scale"]
+        assert not scheduler.in_flight(("scale", "api"))
+        assert scheduler.value(("scale", "api"), default=0) == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancel_then_schedule_replaces_the_action():
+    async def scenario():
+        scheduler = RemediationScheduler()
+        ran = []
+        key = ("scale", "api")
+
+        def scale_to(n):
+            async def scale():
+                ran.append(n)
+            return scale
+
+        scheduler.schedule(key, 0.01, scale_to(5), value=5)
+        scheduler.cancel(key)
+        assert scheduler.schedule(key, 0.02, scale_to(7), value=7)
+
+        # the cancelled task finishing must not forget its successor
+        await asyncio.sleep(0)
+        assert scheduler.value(key) == 7
+
+        await asyncio.sleep(0.05)
+        assert ran == [7]
+        assert not scheduler.in_flight(key)
+
+    asyncio.run(scenario())
+
+
+def test_errors_are_contained_and_stop_cancels():
+    async def scenario():
+        scheduler = RemediationScheduler()
+        ran = []
+
+        async def broken():
+            raise RuntimeError("API down")
+
+        async def never():
+            ran.append("never")
+
+        scheduler.schedule(("drain", "api"), 0, broken)
+        scheduler.schedule(("drain", "db"), 10, never)
+        await asyncio.sleep(0.01)
+        assert not scheduler.in_flight(("drain", "api"))
+
+        await scheduler.stop()
+        assert ran == []
+        assert not scheduler.in_flight(("drain", "db"))
+
+    asyncio.run(scenario())
@@ -0,0 +1,85 @@
+from scaling_behavior import ScalingBehavior, Rules, Policy, STABLE, SCALING_UP, SCALING_DOWN, HOLDING
+
+UNLIMITED = [Policy("pods", 100, 15)]
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def behavior(up=None, down=None):
+    clock = Clock()
+    return ScalingBehavior(up or Rules(0, UNLIMITED), down or Rules(0, UNLIMITED), clock=clock), clock
+
+
+def test_scale_down_waits_out_its_window():
+    b, clock = behavior(down=Rules(60, UNLIMITED))
+    assert b.recommend(5, 5) == 5 and b.state == STABLE
+
+    for clock.now in (10, 30, 59):
+        assert b.recommend(5, 2) == 5
+        assert b.state == HOLDING
+
+    # the 5 from t = 0 has left the window
+    clock.now = 60
+    assert b.recommend(5, 2) == 2
+    assert b.state == SCALING_DOWN
+
+
+def test_scale_up_window_takes_the_lowest_recommendation():
+    b, clock = behavior(up=Rules(30, UNLIMITED))
+    b.recommend(2, 2)
+
+    clock.now = 10
+    assert b.recommend(2, 6) == 2 and b.state == HOLDING
+    clock.now = 20
+    assert b.recommend(2, 4) == 2
+    clock.now = 30
+    assert b.recommend(2, 6) == 4 and b.state == SCALING_UP
+
+
+def test_pods_policy_limits_each_period():
+    b, clock = behavior(up=Rules(0, [Policy("pods", 2, 60)]))
+    assert b.recommend(2, 10) == 4
+    b.record(2, 4)
+
+    clock.now = 30
+    assert b.recommend(4, 10) == 4 and b.state == HOLDING
+
+    # the first change is older than the period
+    clock.now = 60
+    assert b.recommend(4, 10) == 6
+
+
+def test_percent_policy_scales_with_the_size_at_period_start():
+    b, clock = behavior(up=Rules(0, [Policy("percent", 50, 60)]))
+    assert b.recommend(4, 10) == 6
+    b.record(4, 6)
+
+    clock.now = 30
+    # 50% of the 4 pods the period started with, already used
+    assert b.recommend(6, 10) == 6
+
+    down, clock = behavior(down=Rules(0, [Policy("percent", 50, 60)]))
+    assert down.recommend(8, 1) == 4
+
+
+def test_select_policy():
+    both = [Policy("pods", 1, 60), Policy("percent", 100, 60)]
+
+    assert behavior(up=Rules(0, both, "max"))[0].recommend(4, 10) == 8
+    assert behavior(up=Rules(0, both, "min"))[0].recommend(4, 10) == 5
+
+    disabled, _ = behavior(up=Rules(0, both, "disabled"))
+    assert disabled.recommend(4, 10) == 4
+    assert disabled.state == HOLDING
+
+    # scale-down: max still means the biggest change
+    halve = [Policy("pods", 1, 60), Policy("percent", 50, 60)]
+    assert behavior(down=Rules(0, halve, "max"))[0].recommend(8, 1) == 4
+    assert behavior(down=Rules(0, halve, "min"))[0].recommend(8, 1) == 7
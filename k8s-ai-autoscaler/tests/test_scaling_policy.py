@@ -0,0 +1,24 @@
+from scaling_policy import desired_replicas
+
+
+def test_repeated_scale_up_votes_do_not_ratchet_at_low_load():
+    replicas = 3
+    for _ in range(20):
+        # every tick the model says scale_up while the pods sit at ~40% CPU
+        cpu = 40 * 3 / replicas
+        replicas, _ = desired_replicas(replicas, cpu, "scale_up", 0.95, ceiling=7)
+    assert replicas < 7
+    assert replicas == 3
+
+
+def test_scale_up_with_idle_pods_scales_down():
+    desired, _ = desired_replicas(7, 19, "scale_up", 0.7, ceiling=7)
+    assert desired < 7
+
+
+def test_scale_up_headroom_grows_with_confidence():
+    # 52% on 4 pods is within the band for a plain load decision
+    assert desired_replicas(4, 52, "stable", 0.9)[0] == 4
+    assert desired_replicas(4, 52, "scale_up", 0.1)[0] == 4
+    assert desired_replicas(4, 52, "scale_up", 0.6)[0] == 5
+    assert desired_replicas(4, 52, "scale_up", 0.95)[0] == 6
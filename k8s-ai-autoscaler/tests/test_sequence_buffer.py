@@ -0,0 +1,31 @@
+import numpy as np
+from sequence_buffer import SequenceBuffer, SequenceStore
+
+
+def test_window_is_the_last_samples_oldest_first():
+    buf = SequenceBuffer(seq_len=3, n_features=1)
+    buf.push([1.0])
+    assert buf.window().ravel().tolist() == [1.0, 1.0, 1.0]
+
+    for x in (2.0, 3.0, 4.0, 5.0):
+        buf.push([x])
+    assert buf.window().ravel().tolist() == [3.0, 4.0, 5.0]
+    assert np.shares_memory(buf.window(), buf.data)
+
+
+def test_store_evicts_the_least_recently_pushed_key():
+    evicted = []
+    store = SequenceStore(seq_len=2, n_features=1, max_keys=2, on_evict=evicted.append)
+    store.push("a", [1.0])
+    store.push("b", [2.0])
+    store.push("a", [3.0])       # a is now the most recent
+
+    store.push("c", [4.0])
+    assert evicted == ["b"]
+    assert store.get("b") is None
+    assert store.get("a").ravel().tolist() == [1.0, 3.0]
+    assert len(store) == 2
+
+    store.drop("a")
+    assert evicted == ["b", "a"]
+    assert len(store) == 1
@@ -0,0 +1,34 @@
+import pytest
+from autoscaler_config import load_config
+from simulator import NoModel, Simulation, run_batch, segments, simulate, merge, synthetic_trace
+
+
+@pytest.fixture(scope="module")
+def config():
+    return load_config()
+
+
+def same(a, b):
+    assert a["slo_minutes"] == pytest.approx(b["slo_minutes"])
+    assert a["pod_hours"] == pytest.approx(b["pod_hours"])
+    assert a["actions"] == b["actions"]
+
+
+def test_lockstep_runs_match_separate_runs(config):
+    traces = [synthetic_trace(config.deployments, 2, 100.0, seed=seed) for seed in (1, 2)]
+    alone = [Simulation(config, trace, "sender", NoModel()).run() for trace in traces]
+    together = run_batch([Simulation(config, trace, "sender", NoModel()) for trace in traces])
+    for a, b in zip(alone, together):
+        same(a, b)
+
+
+def test_segments_tile_the_trace(config):
+    trace = synthetic_trace(config.deployments, 6, 100.0, seed=3)
+    whole = merge(simulate(config, "orchestrator", segments(trace, 0, 0)))
+    parts = segments(trace, 2, 0.5)
+    split = merge(simulate(config, "orchestrator", parts))
+
+    assert len(parts) == 3
+    assert split["hours"] == pytest.approx(whole["hours"])
+    # warm segments only differ from one run around their starts
+    assert split["pod_hours"] == pytest.approx(whole["pod_hours"], rel=0.02)
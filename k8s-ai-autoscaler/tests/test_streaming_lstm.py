@@ -0,0 +1,81 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+from conftest import MODEL_DIR
+from inference_engine import HealthcareLSTM
+from preprocess import load_preprocess
+from streaming_lstm import StreamingLSTM
+
+FEATURES = [
+    "cpu_percent", "memory_percent", "latency_ms", "error_count", "request_rate",
+    "active_pods", "predicted_load", "service", "service_type",
+]
+TICKS = 300
+
+
+@pytest.fixture(scope="module")
+def replay():
+    """Bundled model + the bundled CSV as one scaled time series per service."""
+    model = HealthcareLSTM()
+    model.load_state_dict(torch.load(os.path.join(MODEL_DIR, "best_lstm_model.pth"), map_location="cpu"))
+    model.eval()
+
+    prep = load_preprocess(os.path.join(MODEL_DIR, "preprocess.npz"))
+    df = pd.read_csv(os.path.join(MODEL_DIR, "k8s_autoscale_training_dataset.csv"))
+    for col in ("service", "service_type"):
+        df[col] = pd.Categorical(df[col], categories=prep.classes[col]).codes
+    X = prep.transform(df[FEATURES].to_numpy(np.float64))
+    streams = [X[df["service"].to_numpy() == code][:TICKS] for code in range(len(prep.classes["service"]))]
+    return model, streams
+
+
+def run(model, streams, resync_every):
+    """→ (streamed logits, full-window logits), one row per service per tick."""
+    streamer = StreamingLSTM(model, resync_every=resync_every)
+    keys = list(range(len(streams)))
+    streamed, full = [], []
+    for t in range(9, TICKS):
+        windows = torch.from_numpy(np.stack([s[t - 9:t + 1] for s in streams]))
+        streamed.append(streamer.step(keys, windows))
+        with torch.no_grad():
+            full.append(model(windows))
+    return torch.cat(streamed), torch.cat(full)
+
+
+def test_default_matches_full_window(replay):
+    model, streams = replay
+    assert StreamingLSTM(model).resync_every == 1
+
+    streamed, full = run(model, streams, resync_every=1)
+    assert torch.equal(streamed.argmax(dim=1), full.argmax(dim=1))
+    assert torch.allclose(streamed, full, atol=1e-5)
+
+
+def test_cached_state_drifts(replay):
+    # documents why the default is 1: the incremental path changes actions
+    model, streams = replay
+    streamed, full = run(model, streams, resync_every=10)
+    agree = (streamed.argmax(dim=1) == full.argmax(dim=1)).float().mean().item()
+    assert agree < 0.95
+
+
+def test_drop_is_applied_by_the_next_step(replay):
+    model, streams = replay
+    streamer = StreamingLSTM(model, resync_every=10)
+    window = torch.from_numpy(np.ascontiguousarray(streams[0][:10][None]))
+
+    streamer.step(["a"], window)
+    streamer.step(["a"], window)
+    assert streamer.cache["a"][1] == 1
+
+    # an eviction from another thread only queues the key ...
+    streamer.drop("a")
+    assert "a" in streamer.cache
+
+    # ... and the next step resyncs it from the full window
+    with torch.no_grad():
+        exact = model(window)
+    assert torch.allclose(streamer.step(["a"], window), exact, atol=1e-5)
+    assert streamer.cache["a"][1] == 0
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from timeseries_store import TimeSeriesStore
+
+
+def fill(store, seconds):
+    # one tick every 6 s; api CPU climbs by 1 per tick, db reports nothing
+    for i in range(seconds // 6):
+        store.append(i * 6.0, {"api": {"cpu": float(i), "replicas": 2}, "db": {}})
+
+
+def test_raw_ring_keeps_the_newest_rows():
+    store = TimeSeriesStore(["api", "db"], retention=5)
+    fill(store, 60)
+
+    times, values = store.series("api", "cpu")
+    assert times.tolist() == [30.0, 36.0, 42.0, 48.0, 54.0]
+    assert values.tolist() == [5.0, 6.0, 7.0, 8.0, 9.0]
+    assert store.mean("api", "cpu", n=2) == 8.5
+    assert store.rate("api", "cpu", seconds=12) == pytest.approx(1 / 6)
+    assert store.mean("db", "cpu") is None
+
+    block = store.block(["cpu", "replicas"], 2)
+    assert block.shape == (2, 2, 2)
+    assert block[:, 0].tolist() == [[8.0, 2.0], [9.0, 2.0]]
+
+
+def test_rollups_close_each_bucket_with_mean_and_max():
+    store = TimeSeriesStore(["api", "db"])
+    fill(store, 186)     # three full minutes, then the first tick of the fourth
+
+    times, means = store.series("api", "cpu", resolution="1m")
+    assert times.tolist() == [0.0, 60.0, 120.0]
+    assert means.tolist() == [4.5, 14.5, 24.5]
+    assert store.max("api", "cpu", resolution="1m") == 29.0
+    assert np.isnan(store.series("db", "cpu", resolution="1m")[1]).all()
+    # the 5m bucket is still open
+    assert len(store.series("api", "cpu", resolution="5m")[0]) == 0
+
+
+def test_history_survives_a_restart(tmp_path):
+    store = TimeSeriesStore(["api", "db"], retention=50, path=str(tmp_path))
+    fill(store, 120)
+    store.flush()
+    del store
+
+    reopened = TimeSeriesStore(["api", "db"], retention=50, path=str(tmp_path))
+    times, values = reopened.series("api", "cpu")
+    assert len(times) == 20 and values[-1] == 19.0
+    assert reopened.series("api", "cpu", resolution="1m")[1].tolist() == [4.5]
+
+    # a different layout starts fresh
+    other = TimeSeriesStore(["api"], retention=50, path=str(tmp_path))
+    assert len(other.series("api", "cpu")[0]) == 0